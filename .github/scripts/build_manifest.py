@@ -0,0 +1,17 @@
+# build_manifest.py
+# Generates the recipe manifest that ships inside the wheel, so installed
+# copies of the cookbook don't have to read every recipe on startup.
+# Run this before building the package (`just build` does it for you).
+import sys
+from pathlib import Path
+
+SRC_DIR = Path(__file__).resolve().parents[2] / "src"
+sys.path.insert(0, str(SRC_DIR))
+
+from textual_cookbook.recipe_index import MANIFEST_NAME, write_manifest
+
+recipes_dir = SRC_DIR / "textual_cookbook" / "recipes"
+manifest_path = SRC_DIR / "textual_cookbook" / MANIFEST_NAME
+
+count = write_manifest(recipes_dir, manifest_path)
+print(f"Wrote {count} recipes to {manifest_path.relative_to(SRC_DIR.parent)}")
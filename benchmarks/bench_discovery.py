@@ -0,0 +1,309 @@
+"""Benchmarks for recipe discovery and table population
+=====================================================
+
+Generates synthetic recipe trees (100, 10k and 100k recipes by default, spread
+over many categories, with docstrings and source sizes similar to the real
+recipes) and measures the browser hot paths:
+
+- `scan_cold_s`: `scan_recipes` with an empty index cache.
+- `scan_warm_s`: `scan_recipes` again, with the index cache from the cold scan.
+- `table_mount_s`: `CustomDataTable.on_mount` inserting every recipe.
+- `first_row_s`: headless `CookBookApp` (warm cache) until the screen has
+  refreshed with the first batch of recipe rows.
+- `full_index_s`: headless `CookBookApp` (warm cache) until the scan is done.
+
+Absolute timings depend on the machine, so every run also times a fixed
+CPU-bound workload (`calibration_s`: parsing and hashing a set of synthetic
+recipes) and records each metric relative to it under `relative`. Results
+are printed (or written with --output) as JSON. With --baseline, the relative
+results are compared against a stored baseline and the script exits with 1
+if any metric regressed by more than --tolerance.
+
+Usage:
+    just bench
+    uv run python benchmarks/bench_discovery.py --sizes 100 10000 --output results.json
+    uv run python benchmarks/bench_discovery.py --save-baseline benchmarks/baseline.json
+"""
+
+# python standard lib
+from __future__ import annotations
+from typing import Any
+from collections.abc import Callable
+import argparse
+import ast
+import asyncio
+import hashlib
+import json
+import os
+import platform
+import random
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+# Textual imports
+from textual.app import App, ComposeResult
+
+# Local imports
+from textual_cookbook import main as cookbook_main
+from textual_cookbook.main import CookBookApp, CustomDataTable
+from textual_cookbook.recipe_index import RecipeData, RecipeIndexCache, scan_recipes, CACHE_DIR_ENV
+
+BENCH_VERSION = 2
+DEFAULT_SIZES = [100, 10_000, 100_000]
+CATEGORY_COUNT = 60
+# Differences smaller than this are noise, whatever the ratio.
+NOISE_FLOOR_S = 0.005
+CALIBRATION_RECIPES = 200
+# Generous, the 100k app run takes tens of seconds on a slow machine.
+DEFAULT_TIMEOUT_S = 600.0
+
+WORDS = (
+    "widget screen message worker reactive timer binding layout container scroll "
+    "animate offset style color theme border focus event mount compose query "
+    "table column row cursor select option input button label static markdown "
+    "demonstrates shows how to use the a an with when that this can is in of "
+    "for and by your app textual example recipe pattern handle update refresh"
+).split()
+WIDGETS = ["Static", "Button", "Label", "Input", "DataTable", "TextArea", "Markdown", "Log", "Tree"]
+AUTHORS = [f"Author {n}" for n in range(40)]
+
+
+def _sentence(rng: random.Random) -> str:
+    words = rng.choices(WORDS, k=rng.randint(6, 16))
+    return " ".join(words).capitalize() + "."
+
+
+def make_recipe_source(rng: random.Random, index: int) -> str:
+    """A recipe shaped like the real ones: docstring, imports, an App subclass,
+    and a body padded out to a realistic size (~0.5 - 6 KB, median ~1.8 KB)."""
+
+    paragraphs = [" ".join(_sentence(rng) for _ in range(rng.randint(2, 6))) for _ in range(rng.randint(1, 3))]
+    widgets = sorted(set(rng.sample(WIDGETS, k=rng.randint(1, 4))))
+    target_size = int(min(6000, max(500, rng.lognormvariate(7.5, 0.5))))
+
+    lines = [
+        '"""' + "\n\n".join(paragraphs),
+        "",
+        f'Recipe by {rng.choice(AUTHORS)}"""',
+        "",
+        "import sys",
+        "from textual.app import App, ComposeResult",
+        f"from textual.widgets import {', '.join(widgets)}",
+        "",
+        "",
+        f"class Recipe{index}App(App[None]):",
+        "",
+        "    def compose(self) -> ComposeResult:",
+    ]
+    lines += [f"        yield {widget}()" for widget in widgets]
+    method = 0
+    while sum(len(line) + 1 for line in lines) < target_size:
+        lines += [
+            "",
+            f"    def helper_{method}(self) -> None:",
+            f"        # {_sentence(rng)}",
+            f"        self.notify({_sentence(rng)!r})",
+        ]
+        method += 1
+    lines += [
+        "",
+        "",
+        'if __name__ == "__main__":',
+        f"    app = Recipe{index}App()",
+        "    app.run()",
+        "    sys.exit(app.return_code)",
+        "",
+    ]
+    return "\n".join(lines)
+
+
+def generate_tree(root: Path, size: int, seed: int = 0) -> Path:
+
+    rng = random.Random(seed)
+    recipes_dir = root / "recipes"
+    for category in range(CATEGORY_COUNT):
+        (recipes_dir / f"category_{category:02d}").mkdir(parents=True)
+    for index in range(size):
+        category = f"category_{index % CATEGORY_COUNT:02d}"
+        recipe_file = recipes_dir / category / f"recipe_{index:06d}.py"
+        recipe_file.write_text(make_recipe_source(rng, index), encoding="utf-8")
+    return recipes_dir
+
+
+def _timed(func: Callable[[], Any]) -> float:
+    start = time.perf_counter()
+    func()
+    return time.perf_counter() - start
+
+
+def calibrate(rounds: int = 5) -> float:
+    """Time a fixed workload shaped like recipe discovery (parse and hash
+    synthetic recipes). Best of `rounds`, as the machine only gets slower."""
+
+    rng = random.Random(1)
+    sources = [make_recipe_source(rng, index) for index in range(CALIBRATION_RECIPES)]
+
+    def work() -> None:
+        for source in sources:
+            ast.parse(source)
+            hashlib.sha256(source.encode()).digest()
+
+    return min(_timed(work) for _ in range(rounds))
+
+
+async def measure_table_mount(recipe_data_dict: dict[str, RecipeData]) -> float:
+
+    timings: list[float] = []
+
+    class TimedDataTable(CustomDataTable):
+        def on_mount(self) -> None:
+            timings.append(_timed(super().on_mount))
+
+    class TableApp(App[None]):
+        def compose(self) -> ComposeResult:
+            yield TimedDataTable(recipe_data_dict)
+
+    app = TableApp()
+    async with app.run_test(size=(160, 50)) as pilot:
+        await pilot.pause()
+    return timings[0]
+
+
+async def measure_app(recipes_dir: Path, timeout: float = DEFAULT_TIMEOUT_S) -> tuple[float, float]:
+    """Returns the time to the first rendered rows (the first screen refresh
+    after the first batch was added), and the time until the scan finished.
+
+    Raises:
+        TimeoutError: If either mark hasn't been reached after `timeout` seconds.
+    """
+
+    start = time.perf_counter()
+    marks: dict[str, float] = {}
+
+    def mark(name: str) -> None:
+        marks.setdefault(name, time.perf_counter() - start)
+
+    class TimedCookBookApp(CookBookApp):
+        # CSS_PATH is relative to the module defining the class.
+        CSS_PATH = Path(cookbook_main.__file__).parent / "styles.tcss"
+
+        # These run alongside the @on handlers of CookBookApp.
+        def on_cook_book_app_recipes_discovered(self) -> None:
+            self.call_after_refresh(mark, "first_row")
+
+        def on_cook_book_app_worker_finished(self) -> None:
+            mark("full_index")
+
+    app = TimedCookBookApp(recipes_dir=recipes_dir)
+    deadline = start + timeout
+    async with app.run_test(size=(160, 50)) as pilot:
+        while len(marks) < 2:
+            if time.perf_counter() > deadline:
+                missing = {"first_row", "full_index"} - marks.keys()
+                raise TimeoutError(f"{', '.join(sorted(missing))} not reached after {timeout:.0f}s")
+            await pilot.pause(0.01)
+    return marks["first_row"], marks["full_index"]
+
+
+def run_size(size: int, timeout: float = DEFAULT_TIMEOUT_S) -> dict[str, float]:
+
+    with tempfile.TemporaryDirectory(prefix="cookbook-bench-") as tmp:
+        root = Path(tmp)
+        recipes_dir = generate_tree(root, size)
+        cache_dir = root / "cache"
+        os.environ[CACHE_DIR_ENV] = str(cache_dir)
+
+        results: dict[str, float] = {}
+        results["scan_cold_s"] = _timed(lambda: scan_recipes(recipes_dir, RecipeIndexCache(recipes_dir, cache_dir)))
+        recipe_data_dict: dict[str, RecipeData] = {}
+
+        def warm_scan() -> None:
+            recipe_data_dict.update(scan_recipes(recipes_dir, RecipeIndexCache(recipes_dir, cache_dir)))
+
+        results["scan_warm_s"] = _timed(warm_scan)
+        results["table_mount_s"] = asyncio.run(measure_table_mount(recipe_data_dict))
+        results["first_row_s"], results["full_index_s"] = asyncio.run(measure_app(recipes_dir, timeout))
+        return {key: round(value, 4) for key, value in results.items()}
+
+
+def relative(results: dict[str, Any]) -> dict[str, dict[str, float]]:
+    "Express every metric in units of the run's calibration workload."
+
+    calibration_s: float = results["calibration_s"]
+    return {
+        size: {metric: round(value / calibration_s, 3) for metric, value in metrics.items()}
+        for size, metrics in results["results"].items()
+    }
+
+
+def compare(results: dict[str, Any], baseline: dict[str, Any], tolerance: float) -> list[str]:
+    """Return a line for every metric that is slower than the baseline by more than
+    `tolerance`. Metrics are compared relative to each run's calibration time."""
+
+    regressions: list[str] = []
+    noise_floor = NOISE_FLOOR_S / results["calibration_s"]
+    for size, metrics in results["relative"].items():
+        baseline_metrics = baseline.get("relative", {}).get(size)
+        if baseline_metrics is None:
+            continue
+        for metric, value in metrics.items():
+            base_value = baseline_metrics.get(metric)
+            if base_value is None:
+                continue
+            if value - base_value > noise_floor and value > base_value * (1 + tolerance):
+                regressions.append(f"{size} recipes: {metric} {base_value:.1f}x -> {value:.1f}x calibration")
+    return regressions
+
+
+def main() -> int:
+
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=DEFAULT_SIZES)
+    parser.add_argument("--output", type=Path, help="Write the results JSON to this file.")
+    parser.add_argument("--baseline", type=Path, help="Compare against this baseline JSON.")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="Allowed slowdown (0.25 = 25%%).")
+    parser.add_argument("--save-baseline", type=Path, help="Write the results as a new baseline.")
+    parser.add_argument(
+        "--timeout", type=float, default=DEFAULT_TIMEOUT_S, help="Seconds to wait for the app to finish."
+    )
+    args = parser.parse_args()
+
+    results: dict[str, Any] = {
+        "version": BENCH_VERSION,
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+        "calibration_s": round(calibrate(), 4),
+        "results": {},
+    }
+    for size in args.sizes:
+        print(f"Benchmarking {size} recipes...", file=sys.stderr)
+        results["results"][str(size)] = run_size(size, args.timeout)
+    results["relative"] = relative(results)
+
+    output = json.dumps(results, indent=4)
+    if args.output:
+        args.output.write_text(output + "\n")
+    else:
+        print(output)
+    if args.save_baseline:
+        args.save_baseline.write_text(output + "\n")
+
+    if args.baseline:
+        baseline = json.loads(args.baseline.read_text())
+        if baseline.get("version") != BENCH_VERSION:
+            print(f"{args.baseline} is from another benchmark version, regenerate it.", file=sys.stderr)
+            return 1
+        regressions = compare(results, baseline, args.tolerance)
+        for line in regressions:
+            print(f"REGRESSION {line}", file=sys.stderr)
+        if regressions:
+            return 1
+        print("No regressions against baseline.", file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
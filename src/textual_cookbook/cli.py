@@ -8,16 +8,63 @@ import click
 @click.option(
     "--run", "-r", is_flag=True, default=False, help="Run recipe immediately"
 )
+@click.option(
+    "--source-cache-bytes",
+    type=click.IntRange(min=0),
+    default=None,
+    help="Maximum total size of recipe source kept in memory (default 8 MiB)",
+)
+@click.option(
+    "--highlight-cache-bytes",
+    type=click.IntRange(min=0),
+    default=None,
+    help="Maximum estimated size of parsed and highlighted recipes kept in memory (default 32 MiB)",
+)
+@click.option(
+    "--watch", "-w", is_flag=True, default=False, help="Watch the recipes directory and update live"
+)
+@click.option(
+    "--preview", "-p", is_flag=True, default=False, help="Show the highlighted recipe's code as the cursor moves"
+)
+@click.option(
+    "--launcher",
+    type=click.Choice(["fork", "subprocess", "inprocess"]),
+    default="subprocess",
+    help=(
+        "Run recipes in children of a pre-warmed fork server, in a new interpreter "
+        "each time (default), or inside the cookbook's own process for quick iteration"
+    ),
+)
 def cli(
     recipe: str | None,
     run: bool = False,
+    source_cache_bytes: int | None = None,
+    highlight_cache_bytes: int | None = None,
+    watch: bool = False,
+    preview: bool = False,
+    launcher: str = "subprocess",
 ) -> None:
     """
     Textual-Cookbook
     """
     from textual_cookbook.main import CookBookApp
+    from textual_cookbook.highlight_cache import DEFAULT_HIGHLIGHT_CACHE_BYTES
+    from textual_cookbook.recipe_index import DEFAULT_SOURCE_CACHE_BYTES
+
+    if source_cache_bytes is None:
+        source_cache_bytes = DEFAULT_SOURCE_CACHE_BYTES
+    if highlight_cache_bytes is None:
+        highlight_cache_bytes = DEFAULT_HIGHLIGHT_CACHE_BYTES
 
-    CookBookApp(starting_recipe=recipe, run=run).run()
+    CookBookApp(
+        starting_recipe=recipe,
+        run=run,
+        source_cache_bytes=source_cache_bytes,
+        highlight_cache_bytes=highlight_cache_bytes,
+        watch=watch,
+        preview=preview,
+        launcher=launcher,
+    ).run()
 
 
 
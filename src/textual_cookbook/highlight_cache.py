@@ -0,0 +1,275 @@
+"""Syntax highlight cache
+======================
+
+Parsing and highlighting a recipe with tree-sitter is the slow part of
+showing it in the code viewer. `HighlightCache` keeps recently parsed
+recipes, `parse_document` parses one without a widget (so the prefetcher
+can run it in a thread), and `CodeTextArea` shows cached documents.
+"""
+
+# python standard lib
+from __future__ import annotations
+from typing import Any, NamedTuple
+from collections import OrderedDict, defaultdict
+from functools import cache
+import hashlib
+import sys
+import threading
+
+# Textual imports
+from textual.widgets import TextArea
+from textual.widgets.text_area import (
+    DocumentBase,
+    DocumentNavigator,
+    Edit,
+    EditResult,
+    Highlight,
+    SyntaxAwareDocument,
+    WrappedDocument,
+)
+from textual.document._syntax_aware_document import SyntaxAwareDocumentError
+from textual._tree_sitter import TREE_SITTER, get_language
+
+# Local imports
+from textual_cookbook.textual_versions import textual_version
+
+DEFAULT_HIGHLIGHT_CACHE_BYTES = 32 * 1024 * 1024
+
+# Textual (major, minor) versions whose TextArea._set_document CodeTextArea was written against.
+CACHED_DOCUMENT_VERSIONS = {(5, 3)}
+CACHED_DOCUMENTS = textual_version() in CACHED_DOCUMENT_VERSIONS
+
+# A 3-tuple with two small ints and an interned name, plus its slot in the line's list.
+HIGHLIGHT_TUPLE_BYTES = sys.getsizeof((0, 0, "")) + 8
+
+
+class HighlightEntry(NamedTuple):
+    document: DocumentBase
+    highlights: defaultdict[int, list[Highlight]]
+    highlight_query: Any
+    nbytes: int
+
+
+@cache
+def _highlight_query_source(language: str) -> str:
+    return TextArea._get_builtin_highlight_query(language)  # pyright: ignore[reportPrivateUsage]
+
+
+def parse_document(text: str, language: str) -> tuple[DocumentBase, defaultdict[int, list[Highlight]], Any] | None:
+    """Parse and highlight `text` the way TextArea does for a built-in language,
+    but without a widget, so it can run in a thread.
+
+    Returns:
+        The document, its highlight map and the prepared highlight query, or
+        None if tree-sitter or the language isn't available.
+    """
+
+    document_language = get_language(language) if TREE_SITTER else None
+    if document_language is None:
+        return None
+    try:
+        document = SyntaxAwareDocument(text, document_language)
+    except SyntaxAwareDocumentError:
+        return None
+    highlight_query = document.prepare_query(_highlight_query_source(language))
+
+    # Same as TextArea._build_highlight_map.
+    highlights: defaultdict[int, list[Highlight]] = defaultdict(list)
+    if highlight_query is None:
+        return document, highlights, highlight_query
+    for highlight_name, nodes in document.query_syntax_tree(highlight_query).items():
+        for node in nodes:
+            start_row, start_column = node.start_point
+            end_row, end_column = node.end_point
+            if start_row == end_row:
+                highlights[start_row].append((start_column, end_column, highlight_name))
+            else:
+                highlights[start_row].append((start_column, None, highlight_name))
+                for row in range(start_row + 1, end_row):
+                    highlights[row].append((0, None, highlight_name))
+                highlights[end_row].append((0, end_column, highlight_name))
+    return document, highlights, highlight_query
+
+
+class HighlightCache:
+    """LRU cache of parsed documents and their highlight maps, keyed by a hash
+    of the text and the language, and bounded by an estimate of their size.
+
+    Parsing and highlighting a recipe with tree-sitter is the slow part of
+    showing it, so switching back to a recently viewed recipe just swaps the
+    cached document back in (see `CodeTextArea`).
+
+    The prefetcher fills the cache from a thread, so it's guarded by a lock.
+    Documents being parsed are tracked by key, so one that is being
+    prefetched isn't parsed a second time when it's asked for meanwhile.
+    Documents with different keys are parsed in parallel.
+    """
+
+    def __init__(self, max_bytes: int = DEFAULT_HIGHLIGHT_CACHE_BYTES) -> None:
+        self.max_bytes = max_bytes
+        self.current_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self._entries: OrderedDict[tuple[str, str], HighlightEntry] = OrderedDict()
+        self._lock = threading.Lock()
+        # Keys being parsed, and an event that's set once they're done.
+        self._in_flight: dict[tuple[str, str], threading.Event] = {}
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __contains__(self, key: object) -> bool:
+        return key in self._entries
+
+    @staticmethod
+    def make_key(text: str, language: str) -> tuple[str, str]:
+        return hashlib.sha1(text.encode("utf-8", "surrogatepass")).hexdigest(), language
+
+    def get(self, key: tuple[str, str]) -> HighlightEntry | None:
+
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+            self._entries.move_to_end(key)
+            return entry
+
+    def prepare(self, key: tuple[str, str], text: str, language: str) -> HighlightEntry | None:
+        "Parse `text` into the cache, unless it's there already. None if it can't be parsed."
+
+        while True:
+            with self._lock:
+                entry = self._entries.get(key)
+                if entry is not None:
+                    return entry
+                parsing = self._in_flight.get(key)
+                if parsing is None:
+                    parsing = self._in_flight[key] = threading.Event()
+                    break
+            # Another thread is parsing it. If that didn't end up cached
+            # (it can't be parsed, or it's too large), try again here.
+            parsing.wait()
+
+        try:
+            parsed = parse_document(text, language)
+            if parsed is None:
+                return None
+            return self.put(key, *parsed)
+        finally:
+            with self._lock:
+                del self._in_flight[key]
+            parsing.set()
+
+    def put(
+        self,
+        key: tuple[str, str],
+        document: DocumentBase,
+        highlights: defaultdict[int, list[Highlight]],
+        highlight_query: Any,
+    ) -> HighlightEntry:
+
+        entry = HighlightEntry(document, highlights, highlight_query, self.estimate_bytes(document, highlights))
+        if entry.nbytes > self.max_bytes:
+            return entry
+        with self._lock:
+            if key in self._entries:
+                self.current_bytes -= self._entries.pop(key).nbytes
+            self._entries[key] = entry
+            self.current_bytes += entry.nbytes
+            while self.current_bytes > self.max_bytes:
+                _, evicted = self._entries.popitem(last=False)
+                self.current_bytes -= evicted.nbytes
+        return entry
+
+    @staticmethod
+    def estimate_bytes(document: DocumentBase, highlights: dict[int, list[Highlight]]) -> int:
+        """A rough size estimate: the lines, the highlight tuples, and the
+        syntax tree, which is assumed to take about twice the text."""
+
+        text_bytes = sum(map(sys.getsizeof, document.lines))
+        highlight_count = sum(map(len, highlights.values()))
+        return text_bytes * 3 + highlight_count * HIGHLIGHT_TUPLE_BYTES
+
+    def describe(self) -> str:
+        return (
+            f"Highlight cache: {len(self)} documents, "
+            f"{self.current_bytes / 1024:.0f} of {self.max_bytes / 1024:.0f} KiB, "
+            f"{self.hits} hits / {self.misses} misses"
+        )
+
+
+class CodeTextArea(TextArea):
+    """A TextArea that reuses parsed documents from a HighlightCache while it's read-only.
+
+    TextArea has no public way to show a document that's already parsed, so
+    this replaces `TextArea._set_document`, but only with the Textual versions
+    it has been checked against (`CACHED_DOCUMENT_VERSIONS`). With any other
+    version every document is parsed by TextArea as usual.
+
+    The widget gets its own copy of the cached highlight map, since TextArea
+    clears it and adds to it in place. The document itself is only copied
+    (parsed again) before it's first edited, which a read-only TextArea only
+    does when it's told to.
+    """
+
+    def __init__(self, *args: Any, highlight_cache: HighlightCache | None = None, **kwargs: Any) -> None:
+        self.highlight_cache = highlight_cache
+        # Read here rather than at import, so tests can run both paths.
+        self.cached_documents = CACHED_DOCUMENTS
+        self._shared_document: DocumentBase | None = None
+        super().__init__(*args, **kwargs)
+
+    def _cached_entry(self, text: str, language: str | None) -> HighlightEntry | None:
+
+        cache = self.highlight_cache
+        if cache is None or not self.cached_documents or not language or not self.read_only:
+            return None
+        if language in self._languages:
+            return None
+        key = cache.make_key(text, language)
+        return cache.get(key) or cache.prepare(key, text, language)
+
+    def _set_document(self, text: str, language: str | None) -> None:
+
+        entry = self._cached_entry(text, language)
+        if entry is None:
+            self._shared_document = None
+            super()._set_document(text, language)
+            return
+
+        # The same steps as TextArea._set_document, minus parsing and highlighting.
+        self._highlight_query = entry.highlight_query
+        self.document = self._shared_document = entry.document
+        self.wrapped_document = WrappedDocument(entry.document, tab_width=self.indent_width)
+        self.navigator = DocumentNavigator(self.wrapped_document)
+        self._line_cache.clear()  # pyright: ignore[reportUnknownMemberType]
+        self._highlights = defaultdict(list, {row: spans.copy() for row, spans in entry.highlights.items()})
+        self.move_cursor((0, 0))
+        self._rewrap_and_refresh_virtual_size()
+
+    def _own_document(self) -> None:
+        "Swap a document shared with the cache for a copy of its own, before it's changed."
+
+        if self._shared_document is None or self.document is not self._shared_document:
+            return
+        self._shared_document = None
+        selection = self.selection
+        super()._set_document(self.text, self.language)
+        self.selection = selection
+
+    def edit(self, edit: Edit) -> EditResult:
+
+        self._own_document()
+        return super().edit(edit)
+
+    def undo(self) -> None:
+
+        self._own_document()
+        super().undo()
+
+    def redo(self) -> None:
+
+        self._own_document()
+        super().redo()
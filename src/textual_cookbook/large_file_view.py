@@ -0,0 +1,163 @@
+"""Large file viewer
+=================
+
+The code viewer shows recipes longer than `CodeContainer.LARGE_FILE_LINES`
+in `LargeFileView` instead of a TextArea, which would read, parse and
+highlight the whole file up front.
+"""
+
+# python standard lib
+from __future__ import annotations
+from typing import Any
+from itertools import accumulate
+from pathlib import Path
+import dataclasses
+
+# Textual imports
+from textual.widgets import TextArea
+from textual.widgets.text_area import Highlight, TextAreaTheme
+from textual.scroll_view import ScrollView
+from textual.strip import Strip
+from textual.cache import LRUCache
+from textual.geometry import Size
+from rich.text import Text
+
+# Local imports
+from textual_cookbook.highlight_cache import parse_document
+from textual_cookbook.mapped_file import MappedFile
+from textual_cookbook.textual_versions import textual_version
+
+# Textual (major, minor) versions whose TextArea keeps the theme it draws with in `_theme`.
+TEXT_AREA_THEME_VERSIONS = {(5, 3)}
+TEXT_AREA_THEME = textual_version() in TEXT_AREA_THEME_VERSIONS
+
+
+def text_area_theme(text_area: TextArea) -> TextAreaTheme:
+    """The theme `text_area` draws with, with its component styles applied,
+    which `TextArea.theme` (a name) isn't. With other Textual versions than
+    `TEXT_AREA_THEME_VERSIONS` it's built again from the name, which only
+    finds builtin themes."""
+
+    if TEXT_AREA_THEME:
+        return text_area._theme  # pyright: ignore[reportPrivateUsage]
+    theme = dataclasses.replace(TextAreaTheme.get_builtin_theme(text_area.theme) or TextAreaTheme("css"))
+    theme.apply_css(text_area)
+    return theme
+
+
+def _byte_to_codepoint(text: str) -> dict[int, int]:
+    "Map the UTF-8 byte offset of every character in `text`, and of its end, to its index."
+    return dict(zip(accumulate((len(char.encode()) for char in text), initial=0), range(len(text) + 1)))
+
+
+class LargeFileView(ScrollView, can_focus=True):
+    """Read-only viewer for recipes too large for a TextArea. The file is
+    memory-mapped (see `MappedFile`), and only the lines on screen are read
+    and drawn. Syntax highlighting comes from parsing just a window of lines
+    around the viewport, so the cost of drawing and scrolling doesn't grow
+    with the size of the file. A window can start inside a multi-line string,
+    which only the lines at its top can get wrong."""
+
+    DEFAULT_CSS = """
+    LargeFileView {
+        background: $surface;
+    }
+    """
+
+    # Lines parsed above and below the viewport when the highlight window moves.
+    HIGHLIGHT_MARGIN = 100
+
+    def __init__(self, **kwargs: Any) -> None:
+        super().__init__(**kwargs)
+        self.mapped_file: MappedFile | None = None
+        self.theme: TextAreaTheme = TextAreaTheme.get_builtin_theme("css") or TextAreaTheme("css")
+        self._gutter_width = 0
+        self._window = (0, 0)
+        self._window_highlights: dict[int, list[Highlight]] = {}
+        self._line_cache: LRUCache[tuple[int, int, int], Strip] = LRUCache(1024)
+
+    @property
+    def line_count(self) -> int:
+        return self.mapped_file.line_count if self.mapped_file is not None else 0
+
+    def load(self, path: Path) -> None:
+
+        self.close()
+        self.mapped_file = MappedFile(path)
+        self._gutter_width = len(str(self.mapped_file.line_count)) + 3
+        self.virtual_size = Size(self._gutter_width + self.mapped_file.max_line_length, self.mapped_file.line_count)
+        self.scroll_to(0, 0, animate=False)
+        self.refresh()
+
+    def close(self) -> None:
+
+        if self.mapped_file is not None:
+            self.mapped_file.close()
+            self.mapped_file = None
+        self._window = (0, 0)
+        self._window_highlights = {}
+        self._line_cache.clear()
+
+    def go_to_line(self, line: int) -> None:
+        "Scroll so that `line` (1-based) is in the middle of the view."
+
+        def scroll() -> None:
+            self.scroll_to(y=max(0, line - 1 - self.size.height // 2), animate=False)
+
+        # Straight after `load` the view may not have been laid out yet.
+        self.call_after_refresh(scroll)
+
+    def on_unmount(self) -> None:
+        self.close()
+
+    def _highlights_for(self, line_index: int) -> list[Highlight]:
+
+        start, end = self._window
+        if not start <= line_index < end:
+            assert self.mapped_file is not None
+            scroll_y = int(self.scroll_offset.y)
+            start = max(0, min(line_index, scroll_y) - self.HIGHLIGHT_MARGIN)
+            end = min(self.line_count, max(line_index, scroll_y + self.size.height) + self.HIGHLIGHT_MARGIN)
+            parsed = parse_document("\n".join(self.mapped_file.lines(start, end)), "python")
+            self._window = (start, end)
+            self._window_highlights = parsed[1] if parsed is not None else {}
+            self._line_cache.clear()
+        return self._window_highlights.get(line_index - start, [])
+
+    def render_line(self, y: int) -> Strip:
+
+        scroll_x, scroll_y = self.scroll_offset
+        line_index = scroll_y + y
+        width = self.size.width
+        theme = self.theme
+        if self.mapped_file is None or line_index >= self.line_count:
+            return Strip.blank(width, theme.base_style)
+
+        cache_key = (line_index, scroll_x, width)
+        cached = self._line_cache.get(cache_key)
+        if cached is not None:
+            return cached
+
+        line = Text(self.mapped_file.line(line_index), style=theme.base_style or "", end="")
+        highlights = self._highlights_for(line_index)
+        if highlights:
+            byte_to_codepoint = None if line.plain.isascii() else _byte_to_codepoint(line.plain)
+            get_style = theme.syntax_styles.get
+            for highlight_start, highlight_end, highlight_name in highlights:
+                style = get_style(highlight_name)
+                if style is None:
+                    continue
+                if byte_to_codepoint is not None:
+                    highlight_start = byte_to_codepoint.get(highlight_start, 0)
+                    highlight_end = byte_to_codepoint.get(highlight_end) if highlight_end else None
+                line.stylize(style, highlight_start, highlight_end)
+        line.expand_tabs(4)
+
+        gutter_width = self._gutter_width
+        gutter = Text(f"{line_index + 1:>{gutter_width - 2}}  ", style=theme.gutter_style or "", end="")
+        console = self.app.console
+        code_width = max(0, width - gutter_width)
+        code = Strip(line.render(console)).crop(scroll_x, scroll_x + code_width)
+        strip = Strip.join([Strip(gutter.render(console)), code.extend_cell_length(code_width, theme.base_style)])
+        self._line_cache[cache_key] = strip
+        return strip
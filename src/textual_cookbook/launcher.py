@@ -0,0 +1,641 @@
+"""Recipe launchers
+================
+
+The subprocess launcher (the default) starts a new interpreter for every
+recipe, which runs it the way `python <recipe>` would.
+
+Running a recipe that way means starting a new Python, which spends most of
+its startup importing Textual and Rich. With the fork server launcher
+(`--launcher fork`, where `os.fork` exists), a server process is started in
+the background when the cookbook starts. It imports Textual once, then forks
+a child for every recipe run. The child runs the recipe as `__main__`, so
+every recipe still gets a process of its own, it just starts warm.
+
+The server is started with the cookbook's terminal as its stdin, stdout and
+stderr, which the children inherit. Requests and results go over a separate
+socket, as JSON lines. Before every run the server is pinged, and a server
+that has died or doesn't answer within `PING_TIMEOUT` is shut down. That
+run and every later one fall back to the subprocess launcher. A server that
+dies while a recipe runs fails that run, since the recipe may already have
+done something.
+
+The in-process launcher (`--launcher inprocess`) is for quick iteration. It
+imports the recipe into the cookbook's own process, the way the recipe tests
+do, and runs its App with `App.run_async` on the cookbook's event loop while
+the cookbook is suspended. (Not in a thread: Textual's drivers install
+signal handlers, which only the main thread can do.) The cookbook holds off
+painting until it's resumed, since its own output thread is stopped meanwhile.
+Imported recipes are kept, and only imported again when the file's mtime
+changes. The price is isolation: a recipe shares the cookbook's interpreter,
+so anything it changes at module level stays changed for the next run.
+
+Every launcher measures what a run cost: wall time, time to the recipe's
+first frame, CPU time and peak RSS. CPU and memory come from `wait4` for
+child processes and `getrusage` for in-process runs (neither exists on
+Windows). The first frame is timed with an `auto_pilot` for
+`App.run_async`, which runs once the App is ready and asks to be called
+back after the next refresh. That needs Textual imported before the recipe
+runs, so subprocess runs don't report it.
+
+Every launcher also keeps the end of what a recipe writes to `sys.stdout`
+and `sys.stderr`, for the error screen. That's its tracebacks and prints,
+but not its UI, which Textual writes to the terminal through
+`sys.__stderr__`. Output is copied as it's written (through a pipe from
+child processes) into a ring buffer of the last `OUTPUT_TAIL_BYTES`, so a
+recipe that floods its output costs no more memory than one that doesn't.
+Subprocess runs start the recipe through this module
+(`python -m textual_cookbook.launcher --run`), which installs the copy
+first. On Windows they run `python <recipe>` as it is, and aren't captured.
+"""
+
+# python standard lib
+from __future__ import annotations
+from abc import ABC, abstractmethod
+from typing import Any, NamedTuple, TYPE_CHECKING
+from collections.abc import Callable, Coroutine
+from pathlib import Path
+import asyncio
+import gc
+import importlib.util
+import inspect
+import io
+import json
+import os
+import runpy
+import select
+import signal
+import socket
+import subprocess
+import sys
+import time
+import traceback
+
+resource: ModuleType | None
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+if TYPE_CHECKING:
+    from types import ModuleType
+    from textual.app import App
+    from textual.pilot import Pilot
+
+# Imported by the server before it forks, so recipes don't have to.
+WARM_MODULES = (
+    "asyncio",
+    "rich.console",
+    "rich.text",
+    "textual.app",
+    "textual.containers",
+    "textual.widgets",
+    "textual.widgets._static",
+    "textual.widgets._button",
+    "textual.widgets._label",
+    "textual.widgets._input",
+    "textual.widgets._data_table",
+)
+
+# What a broken recipe stops with: a missing import, a typo, a bad argument or
+# value. These fail the run with the recipe's traceback. Anything else
+# propagates, and ends the run (or, in process, the cookbook) like it would
+# end `python <recipe>`.
+RECIPE_ERRORS = (
+    ArithmeticError,
+    AssertionError,
+    AttributeError,
+    ImportError,
+    LookupError,
+    NameError,
+    OSError,
+    RuntimeError,
+    SyntaxError,
+    TypeError,
+    ValueError,
+)
+
+# ru_maxrss is in KiB, except on macOS where it's in bytes.
+RSS_SCALE = 1 if sys.platform == "darwin" else 1024
+OUTPUT_TAIL_BYTES = 64 * 1024
+
+
+class RunResult(NamedTuple):
+    "What a recipe run returned and cost. Times are in seconds, None where unknown."
+
+    returncode: int
+    wall_time: float
+    first_paint: float | None = None
+    user_time: float | None = None
+    system_time: float | None = None
+    max_rss: int | None = None  # bytes
+    output: str | None = None  # the end of stdout and stderr, None if not captured
+
+
+class OutputTail:
+    "A ring buffer that keeps the last `capacity` bytes written to it."
+
+    def __init__(self, capacity: int = OUTPUT_TAIL_BYTES) -> None:
+        self.capacity = capacity
+        self.buffer = bytearray()
+        self.dropped = 0
+
+    def write(self, data: bytes) -> None:
+
+        self.buffer += data[-self.capacity :]
+        excess = len(self.buffer) - self.capacity
+        self.dropped += max(excess, 0) + max(len(data) - self.capacity, 0)
+        if excess > 0:
+            # Deleting from the front of a bytearray doesn't move the rest.
+            del self.buffer[:excess]
+
+    def text(self) -> str:
+
+        if not self.dropped:
+            return self.buffer.decode("utf-8", "replace")
+        # Start at a whole line.
+        start = self.buffer.find(b"\n") + 1
+        text = self.buffer[start:].decode("utf-8", "replace")
+        return f"[{self.dropped + start} bytes of earlier output skipped]\n{text}"
+
+
+class _TeeStream:
+    "A text stream that copies everything written to it to `copy`, as UTF-8."
+
+    def __init__(self, stream: Any, copy: Callable[[bytes], object]) -> None:
+        self._stream = stream
+        self._copy = copy
+
+    def write(self, text: str) -> int:
+        self._copy(text.encode("utf-8", "replace"))
+        return self._stream.write(text)
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self._stream, name)
+
+
+def _tee_output(copy: Callable[[bytes], object]) -> tuple[Any, Any]:
+    """Copy everything written to `sys.stdout` and `sys.stderr` from now on.
+
+    Returns:
+        The streams they were, to put back.
+    """
+
+    streams = sys.stdout, sys.stderr
+    sys.stdout, sys.stderr = (_TeeStream(stream, copy) for stream in streams)
+    return streams
+
+
+def _usage(rusage: Any) -> dict[str, Any]:
+    "The RunResult fields for a `resource.struct_rusage`."
+
+    return {
+        "user_time": rusage.ru_utime,
+        "system_time": rusage.ru_stime,
+        "max_rss": rusage.ru_maxrss * RSS_SCALE,
+    }
+
+
+def _first_paint_pilot(
+    on_paint: Callable[[float], object]
+) -> Callable[[Pilot[Any]], Coroutine[Any, Any, None]]:
+    """Return an `auto_pilot` for `App.run_async` that calls `on_paint` with
+    the `time.monotonic()` of the App's first frame."""
+
+    async def auto_pilot(pilot: Pilot[Any]) -> None:
+        # Auto pilots start once the App is ready, just before it's first drawn.
+        pilot.app.call_after_refresh(lambda: on_paint(time.monotonic()))
+
+    return auto_pilot
+
+
+def _watch_first_paint(on_paint: Callable[[float], object]) -> None:
+    """Call `on_paint` with the `time.monotonic()` of the first frame of the
+    next App run in this process, however the recipe runs it.
+
+    For forked children, which run one recipe and exit. `App.run` and
+    `App.run_async` both start the App through `App.run_async`, so that's
+    wrapped to add the first paint pilot, once."""
+
+    try:
+        from textual.app import App
+    except ImportError:
+        return
+    run_async = App[Any].run_async
+    watch = _first_paint_pilot(on_paint)
+
+    async def run_async_watched(self: App[Any], *, auto_pilot: Any = None, **kwargs: Any) -> Any:
+
+        App.run_async = run_async  # type: ignore[method-assign]
+
+        async def pilots(pilot: Pilot[Any]) -> None:
+            await watch(pilot)
+            if auto_pilot is not None:
+                await auto_pilot(pilot)
+
+        return await run_async(self, auto_pilot=pilots, **kwargs)
+
+    App.run_async = run_async_watched  # type: ignore[method-assign]
+
+
+class RecipeLauncher(ABC):
+
+    def start(self) -> None:
+        "Get ready to run recipes. Called once, in the background, when the cookbook starts."
+
+    @abstractmethod
+    def run(self, recipe_path: Path) -> RunResult:
+        """Run a recipe with the terminal and block until it exits.
+
+        Returns:
+            The recipe's exit code and what the run cost.
+        """
+
+    async def run_async(self, recipe_path: Path) -> RunResult:
+        """Run a recipe from the cookbook's event loop. Launchers that run it
+        in another process block the loop until it exits, as `run` does."""
+        return self.run(recipe_path)
+
+    def close(self) -> None:
+        pass
+
+
+class SubprocessLauncher(RecipeLauncher):
+    "Runs every recipe in a new interpreter."
+
+    def run(self, recipe_path: Path) -> RunResult:
+
+        start = time.monotonic()
+        if not hasattr(os, "wait4"):
+            # Windows, where the output pipe couldn't be selected on. The recipe
+            # writes straight to the terminal.
+            returncode = subprocess.call([sys.executable, str(recipe_path)])
+            return RunResult(returncode, time.monotonic() - start)
+        output_read, output_write = os.pipe()
+        try:
+            process = subprocess.Popen(
+                [sys.executable, "-m", "textual_cookbook.launcher", "--run", str(output_write), str(recipe_path)],
+                pass_fds=(output_write,),
+            )
+        except OSError:
+            os.close(output_read)
+            raise
+        finally:
+            os.close(output_write)
+        response = _wait_for_recipe(process.pid, output_read)
+        # Reaped there, so tell Popen it doesn't have to.
+        process.returncode = response["returncode"]
+        return _run_result(start, response)
+
+
+class ForkServerLauncher(RecipeLauncher):
+    """Runs recipes in children forked from a server with Textual already
+    imported. Falls back to a SubprocessLauncher if the server isn't running."""
+
+    # Seconds the server has to answer a ping. It's longer than the server
+    # takes to import WARM_MODULES, since a run can come before that's done.
+    PING_TIMEOUT = 10.0
+
+    def __init__(self) -> None:
+        self.fallback = SubprocessLauncher()
+        self.server: subprocess.Popen[bytes] | None = None
+        self._socket: socket.socket | None = None
+        self._reader: io.BufferedReader | None = None
+
+    def start(self) -> None:
+
+        parent_socket, child_socket = socket.socketpair()
+        try:
+            self.server = subprocess.Popen(
+                [sys.executable, "-m", "textual_cookbook.launcher", str(child_socket.fileno())],
+                pass_fds=(child_socket.fileno(),),
+            )
+        except OSError:
+            parent_socket.close()
+            return
+        finally:
+            child_socket.close()
+        # `run` may be called from another thread meanwhile. It checks
+        # `_socket`, so that's set last.
+        self._reader = parent_socket.makefile("rb")
+        self._socket = parent_socket
+
+    def _request(self, request: dict[str, Any], timeout: float | None = None) -> dict[str, Any] | None:
+        """Send a request to the server and wait up to `timeout` seconds for
+        the reply (forever if None). Returns None, and closes the launcher, if
+        the server has died or doesn't reply in time."""
+
+        if self._socket is None or self._reader is None:
+            return None
+        response = b""
+        if self.server is not None and self.server.poll() is None:
+            try:
+                self._socket.settimeout(timeout)
+                self._socket.sendall(json.dumps(request).encode() + b"\n")
+                response = self._reader.readline()
+            except OSError:  # including socket.timeout
+                pass
+        if not response:
+            self.close()
+            return None
+        return json.loads(response)
+
+    def run(self, recipe_path: Path) -> RunResult:
+
+        start = time.monotonic()
+        # Nothing has been forked if the ping fails, so the fallback can't run the recipe twice.
+        if self._request({"ping": True}, timeout=self.PING_TIMEOUT) is None:
+            return self.fallback.run(recipe_path)
+        response = self._request({"path": str(recipe_path), "cwd": os.getcwd(), "env": dict(os.environ)})
+        if response is None:
+            output = "The fork server exited while the recipe was running.\n"
+            return RunResult(1, time.monotonic() - start, output=output)
+        return _run_result(start, response)
+
+    def close(self) -> None:
+
+        if self._socket is not None:
+            if self._reader is not None:
+                self._reader.close()
+            # The server exits when it reads EOF.
+            self._socket.close()
+            self._socket = self._reader = None
+        if self.server is not None:
+            try:
+                self.server.wait(timeout=0.2)
+            except subprocess.TimeoutExpired:
+                # Still warming up. It has no state to lose.
+                self.server.kill()
+                self.server.wait()
+            self.server = None
+
+
+class LoadedRecipe(NamedTuple):
+    mtime_ns: int
+    app_class: type[App[Any]]
+
+
+class InProcessLauncher(RecipeLauncher):
+    """Runs the App of each recipe in the cookbook's own process. The recipe
+    is imported once and run again from the cached module until it changes."""
+
+    def __init__(self, headless: bool = False) -> None:
+        # Headless runs are for the tests.
+        self.headless = headless
+        self.loaded: dict[Path, LoadedRecipe] = {}
+
+    def load(self, recipe_path: Path) -> type[App[Any]]:
+        """Return the App subclass defined by a recipe, importing it only if
+        it has changed since it was last loaded.
+
+        Raises:
+            Whatever importing the recipe raises, or LookupError if it doesn't
+            define an App.
+        """
+        from textual.app import App
+
+        mtime_ns = recipe_path.stat().st_mtime_ns
+        loaded = self.loaded.get(recipe_path)
+        if loaded is not None and loaded.mtime_ns == mtime_ns:
+            return loaded.app_class
+
+        # Not __main__, so the recipe's own `app.run()` at the bottom is skipped.
+        module_name = f"textual_cookbook.recipe:{recipe_path}"
+        spec = importlib.util.spec_from_file_location(module_name, recipe_path)
+        if spec is None or spec.loader is None:
+            raise ImportError(f"Can't import {recipe_path}")
+        module = importlib.util.module_from_spec(spec)
+        # Registered while it runs, for anything that looks itself up by __module__.
+        sys.modules[module_name] = module
+        try:
+            spec.loader.exec_module(module)
+        except BaseException:
+            del sys.modules[module_name]
+            raise
+
+        # Prefer an App defined by the recipe over one it imported.
+        apps: list[type[App[Any]]] = [
+            obj for obj in vars(module).values()
+            if inspect.isclass(obj) and issubclass(obj, App) and obj is not App
+        ]
+        apps.sort(key=lambda app_class: app_class.__module__ != module_name)
+        if not apps:
+            raise LookupError(f"{recipe_path.name} doesn't define an App")
+        self.loaded[recipe_path] = LoadedRecipe(mtime_ns, apps[0])
+        return apps[0]
+
+    def run(self, recipe_path: Path) -> RunResult:
+        "Run a recipe outside of an event loop. From a running loop, use `run_async`."
+        return asyncio.run(self.run_async(recipe_path))
+
+    async def run_async(self, recipe_path: Path) -> RunResult:
+
+        start = time.monotonic()
+        usage_before = resource.getrusage(resource.RUSAGE_SELF) if resource else None
+        output = OutputTail()
+        streams = _tee_output(output.write)
+        try:
+            app_class = self.load(recipe_path)
+        except RECIPE_ERRORS:
+            traceback.print_exc()
+            returncode = 1
+            first_paint = None
+        else:
+            # A task of its own runs in a copy of the context, so the recipe
+            # never becomes the active app of the task that's waiting for it.
+            returncode, first_paint = await asyncio.create_task(self._run_app(app_class))
+        finally:
+            sys.stdout, sys.stderr = streams
+        if first_paint is not None:
+            first_paint -= start
+        result = RunResult(returncode, time.monotonic() - start, first_paint, output=output.text())
+        if usage_before is None or resource is None:
+            return result
+        # Peak RSS is the cookbook's own, which now includes the recipe's.
+        usage = _usage(resource.getrusage(resource.RUSAGE_SELF))
+        usage["user_time"] -= usage_before.ru_utime
+        usage["system_time"] -= usage_before.ru_stime
+        return result._replace(**usage)
+
+    async def _run_app(self, app_class: type[App[Any]]) -> tuple[int, float | None]:
+
+        painted: list[float] = []
+        try:
+            app = app_class()
+            await app.run_async(headless=self.headless, auto_pilot=_first_paint_pilot(painted.append))
+        except RECIPE_ERRORS:
+            traceback.print_exc()
+            return 1, None
+        return app.return_code or 0, painted[0] if painted else None
+
+
+def create_launcher(kind: str = "subprocess") -> RecipeLauncher:
+    "Return a launcher of the given kind. The fork server needs `os.fork`."
+
+    if kind == "inprocess":
+        return InProcessLauncher()
+    if kind == "fork" and hasattr(os, "fork"):
+        return ForkServerLauncher()
+    return SubprocessLauncher()
+
+
+def _write_all(fd: int, data: bytes) -> None:
+
+    view = memoryview(data)
+    while view:
+        view = view[os.write(fd, view) :]
+
+
+def _run_recipe(path: str, output_fd: int, paint_fd: int | None = None) -> int:
+    """Run a recipe as `__main__` in this process, like `python <recipe>` would.
+    A copy of its output is written to `output_fd`, and the time of its first
+    frame to `paint_fd`, if given. Subprocess runs don't give one, since that
+    would import Textual before the recipe does."""
+
+    if paint_fd is not None:
+        _watch_first_paint(lambda when: os.write(paint_fd, repr(when).encode()))
+    _tee_output(lambda data: _write_all(output_fd, data))
+    sys.argv = [path]
+    sys.path[0] = os.path.dirname(os.path.abspath(path))
+    signal.signal(signal.SIGINT, signal.default_int_handler)
+    try:
+        runpy.run_path(path, run_name="__main__")
+    except SystemExit as exc:
+        if exc.code is None or isinstance(exc.code, int):
+            return exc.code or 0
+        print(exc.code, file=sys.stderr)
+        return 1
+    except RECIPE_ERRORS as exc:
+        # Leave this module and runpy out of the traceback, like `python <recipe>` would.
+        # (The recipe's frames can't be found by path, it may be a .pyc.)
+        tb = exc.__traceback__
+        while tb is not None and tb.tb_frame.f_code.co_filename in (__file__, runpy.__file__):
+            tb = tb.tb_next
+        traceback.print_exception(type(exc), exc, tb or exc.__traceback__)
+        return 1
+    return 0
+
+
+def _wait_reading_output(pid: int, output_fd: int, output: OutputTail) -> tuple[int, Any]:
+    """Wait for a child to exit, reading its output into `output` as it
+    arrives so the child never blocks on a full pipe.
+
+    Returns:
+        The child's wait status and resource usage.
+    """
+
+    while True:
+        readable, _, _ = select.select([output_fd], [], [], 0.1)
+        if readable:
+            data = os.read(output_fd, 65536)
+            if data:
+                output.write(data)
+                continue
+            # End of file, everything that could write to it has exited.
+            _, status, rusage = os.wait4(pid, 0)
+            return status, rusage
+        # Still open, but that might only be something the recipe started.
+        exited, status, rusage = os.wait4(pid, os.WNOHANG)
+        if exited:
+            os.set_blocking(output_fd, False)
+            try:
+                while data := os.read(output_fd, 65536):
+                    output.write(data)
+            except BlockingIOError:
+                pass
+            return status, rusage
+
+
+def _wait_for_recipe(pid: int, output_fd: int, paint_fd: int | None = None) -> dict[str, Any]:
+    """Wait for a child running `_run_recipe` to exit, and close its pipes.
+
+    Returns:
+        The RunResult fields it reported, except `wall_time`. `first_paint` is
+        the `time.monotonic()` of its first frame, or None.
+    """
+
+    output = OutputTail()
+    try:
+        status, rusage = _wait_reading_output(pid, output_fd, output)
+    finally:
+        os.close(output_fd)
+    first_paint = None
+    if paint_fd is not None:
+        # Anything the recipe started itself could still hold the pipe open.
+        os.set_blocking(paint_fd, False)
+        try:
+            first_paint = float(os.read(paint_fd, 64))
+        except (BlockingIOError, ValueError):
+            pass
+        finally:
+            os.close(paint_fd)
+    return {
+        "returncode": os.waitstatus_to_exitcode(status),
+        "first_paint": first_paint,
+        **_usage(rusage),
+        "output": output.text(),
+    }
+
+
+def _run_result(start: float, response: dict[str, Any]) -> RunResult:
+    "The RunResult of a run that started at `start`, from what `_wait_for_recipe` returned."
+
+    # The child's clock is the same monotonic clock.
+    first_paint = response.pop("first_paint")
+    return RunResult(
+        wall_time=time.monotonic() - start,
+        first_paint=None if first_paint is None else first_paint - start,
+        **response,
+    )
+
+
+def serve(control_fd: int) -> int | None:
+    """The fork server loop. Reads run requests from `control_fd` and forks a
+    child for each one, replying with the child's exit code and usage.
+
+    Returns:
+        In a forked child, the recipe's exit code. In the server, None once
+        the cookbook has closed the socket.
+    """
+
+    # Ctrl+C goes to the whole process group, it's meant for the recipe.
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    for module in WARM_MODULES:
+        try:
+            __import__(module)
+        except ImportError:
+            pass
+    # Leave everything imported so far out of garbage collection. Children
+    # don't copy the pages just to walk them, and exit a lot faster.
+    gc.freeze()
+
+    control = socket.socket(fileno=control_fd)
+    with control, control.makefile("rb") as reader:
+        for line in reader:
+            request = json.loads(line)
+            if request.get("ping"):
+                control.sendall(b'{"pong": true}\n')
+                continue
+            paint_read, paint_write = os.pipe()
+            output_read, output_write = os.pipe()
+            pid = os.fork()
+            if pid == 0:
+                reader.close()
+                control.close()
+                os.close(paint_read)
+                os.close(output_read)
+                os.chdir(request["cwd"])
+                os.environ.clear()
+                os.environ.update(request["env"])
+                return _run_recipe(request["path"], output_write, paint_write)
+            os.close(paint_write)
+            os.close(output_write)
+            response = _wait_for_recipe(pid, output_read, paint_read)
+            control.sendall(json.dumps(response).encode() + b"\n")
+    return None
+
+
+if __name__ == "__main__":
+    if sys.argv[1] == "--run":
+        # From SubprocessLauncher: `--run <output fd> <recipe>`.
+        sys.exit(_run_recipe(sys.argv[3], int(sys.argv[2])))
+    sys.exit(serve(int(sys.argv[1])))
@@ -8,11 +8,16 @@
 
 # python standard lib
 from __future__ import annotations
-from typing import TypedDict, Any
+from typing import Any, ClassVar, Literal, TYPE_CHECKING, cast
+from collections.abc import Callable, Generator, Iterable
+from itertools import chain
+from pathlib import Path
+import asyncio
 import subprocess
 import sys
-import re
-from pathlib import Path
+import time
+import gc
+from contextlib import contextmanager
 from importlib import resources
 # from importlib.abc import Traversable
 # import importlib
@@ -20,31 +25,99 @@ from enum import Enum
 
 # Textual imports
 from textual import on, work, events
+from textual.worker import Worker, get_current_worker  # pyright: ignore[reportUnknownVariableType]
 from textual.app import App, ComposeResult
 from textual.widget import Widget
-from textual.widgets import Static, DataTable, Button, Markdown, TextArea
+from textual.widgets import Static, DataTable, Button, Markdown, TextArea, Input, OptionList, Tree, Log
+from textual.widgets.option_list import Option
 from textual.widgets.data_table import ColumnKey, Column, RowDoesNotExist
 from textual.screen import Screen, ModalScreen
+from textual.constants import MAX_FPS
 from textual.message import Message
 from textual.containers import Horizontal, Vertical
 from textual.binding import Binding
+from textual.coordinate import Coordinate
 from textual.geometry import clamp
+from textual.content import Content
 from rich.text import Text
+from rich.cells import cell_len
 
 # Textual library imports
 from textual_pyfiglet import FigletWidget
 
-class RecipeData(TypedDict):
-    name: str
-    category: str
-    author: str
-    description: str
-    text_blob: str
-
-
-class SortableText(Text):
+# Local imports
+from textual_cookbook.recipe_index import (
+    RecipeCatalog,
+    RecipeData,
+    RecipeIndexCache,
+    RecipeSourceCache,
+    DEFAULT_SOURCE_CACHE_BYTES,
+    MANIFEST_NAME,
+    iter_recipe_batches,
+    rescan_recipes,
+    get_recipes_dir,
+    path_to_key,
+    recipe_key,
+)
+from textual_cookbook.search_index import SearchIndex, SearchHit
+from textual_cookbook.watcher import create_watcher
+from textual_cookbook.launcher import RunResult, create_launcher
+from textual_cookbook.run_history import RunHistory
+from textual_cookbook.recipe_files import RecipeFileCache
+from textual_cookbook.highlight_cache import (
+    CodeTextArea,
+    HighlightCache,
+    DEFAULT_HIGHLIGHT_CACHE_BYTES,
+)
+from textual_cookbook.large_file_view import LargeFileView, text_area_theme
+from textual_cookbook.recipe_filter import RecipeFilter
+from textual_cookbook.recipe_finder import RecipeFinder
+from textual_cookbook.recipe_tree import RecipeTree
+from textual_cookbook.table_rows import RowViewTable
+
+if TYPE_CHECKING:
+    from importlib.abc import Traversable
+
+
+@contextmanager
+def _gc_paused() -> Generator[None, None, None]:
+
+    enabled = gc.isenabled()
+    gc.disable()
+    try:
+        yield
+    finally:
+        if enabled:
+            gc.enable()
+
+
+def _cell_width(text: str) -> int:
+    # Nearly every name, category and author is ASCII, where len() is the width.
+    return len(text) if text.isascii() else cell_len(text)
+
+
+class RecipeCell:
+    """A table cell that only holds its plain string. The Text is built when the
+    row is drawn, and the DataTable only draws the rows that are on screen, so
+    a table of 100k recipes never creates more than a screenful of them."""
+
+    __slots__ = ("plain",)
+
+    def __init__(self, plain: str) -> None:
+        self.plain = plain
+
+    def __rich__(self) -> Text:
+        return Text(self.plain, overflow="ellipsis", no_wrap=True, end="")
+
+    def __str__(self) -> str:
+        return self.plain
+
+    def __repr__(self) -> str:
+        return f"RecipeCell({self.plain!r})"
 
     def __lt__(self, other: object) -> bool:
+        if isinstance(other, RecipeCell):
+            return self.plain < other.plain
         if isinstance(other, str):
             return self.plain < other
         if isinstance(other, Text):
@@ -101,15 +174,34 @@ class ErrorScreen(ModalScreen[bool]):
 
     def compose(self) -> ComposeResult:
 
-        with Vertical(classes="description_container"):
+        # The launchers that can capture output put its tail in `error.output`.
+        if not self.error.output:
+            with Vertical(classes="description_container"):
+                yield Static(
+                    "[$accent]Recipe failed to run[/$accent] \n\n"
+                    "Close the cookbook to view the error output.\n",
+                    markup=True
+                )
+                with Horizontal(classes="button_container modal"):
+                    yield Button("Close", id="close_button", compact=True)
+            return
+
+        with Vertical(classes="description_container with_output"):
             yield Static(
-                "[$accent]Recipe failed to run[/$accent] \n\n"
-                "Close the cookbook to view the error output.\n",
+                f"[$accent]Recipe failed to run[/$accent] (exit code {self.error.returncode})\n",
                 markup=True
             )
+            # Log only renders the lines that are on screen.
+            yield Log(id="error_output")
             with Horizontal(classes="button_container modal"):
                 yield Button("Close", id="close_button", compact=True)
 
+    def on_mount(self) -> None:
+
+        if self.error.output:
+            # Tracebacks printed by Rich are in colour. The Log shows plain text.
+            self.query_one(Log).write(Text.from_ansi(self.error.output).plain)
+
     @on(Button.Pressed, "#close_button")
     def close_button_pressed(self) -> None:
         self.dismiss(False)
@@ -123,7 +215,193 @@ class ErrorScreen(ModalScreen[bool]):
         self.dismiss()
 
 
+class SourceSearchScreen(ModalScreen[SearchHit | None]):
+    "Full-text search over the recipe source. Dismisses with the chosen hit."
+
+    BINDINGS = [
+        Binding("escape", "close_screen", description="Close the search window."),
+        Binding("down", "cursor_down", show=False),
+        Binding("up", "cursor_up", show=False),
+    ]
+
+    SEARCH_DEBOUNCE = 0.05
+    MAX_RESULTS = 50
+
+    def __init__(self, search_index: SearchIndex, query: str = "") -> None:
+        super().__init__()
+        self.search_index = search_index
+        self.initial_query = query
+        self.hits: list[SearchHit] = []
+
+    def compose(self) -> ComposeResult:
+
+        with Vertical(classes="description_container"):
+            yield Input(self.initial_query, placeholder="Search recipe source", id="source_search_input", compact=True)
+            yield OptionList(id="source_search_results")
+            yield Static(id="source_search_status")
+
+    def on_mount(self) -> None:
+        self.search(self.initial_query)
+
+    @on(Input.Changed, "#source_search_input")
+    def search_changed(self, event: Input.Changed) -> None:
+        self.search(event.value)
+
+    @work(exclusive=True, group="source_search")
+    async def search(self, query: str) -> None:
+
+        await asyncio.sleep(self.SEARCH_DEBOUNCE)
+        status = self.query_one("#source_search_status", Static)
+        if not self.search_index.ready:
+            status.update("Indexing recipe source...")
+            self.set_timer(0.5, lambda: self.search(self.query_one(Input).value))
+            return
+        self.hits = self.search_index.search(query, limit=self.MAX_RESULTS) if query.strip() else []
+        results = self.query_one(OptionList)
+        results.clear_options()
+        results.add_options([self._format_hit(hit) for hit in self.hits])
+        if self.hits:
+            results.highlighted = 0
+        status.update(f"{len(self.hits)} recipes" if query.strip() else "")
+
+    def _format_hit(self, hit: SearchHit) -> Option:
+
+        lines = ", ".join(map(str, hit.lines[:5])) + (", ..." if len(hit.lines) > 5 else "")
+        prompt = Text.assemble((hit.name, "bold"), "  ", (f"{hit.path}:{lines}", "dim"))
+        return Option(prompt, id=hit.path)
+
+    @on(Input.Submitted, "#source_search_input")
+    def search_submitted(self) -> None:
+
+        results = self.query_one(OptionList)
+        if results.highlighted is not None:
+            self.dismiss(self.hits[results.highlighted])
+
+    @on(OptionList.OptionSelected)
+    def hit_selected(self, event: OptionList.OptionSelected) -> None:
+        self.dismiss(self.hits[event.option_index])
+
+    def action_cursor_down(self) -> None:
+        self.query_one(OptionList).action_cursor_down()
+
+    def action_cursor_up(self) -> None:
+        self.query_one(OptionList).action_cursor_up()
+
+    def on_click(self, event: events.Click) -> None:
+
+        if isinstance(event.control, SourceSearchScreen):
+            self.dismiss(None)
+
+    def action_close_screen(self) -> None:
+        self.dismiss(None)
+
+
+class RecipeFinderScreen(ModalScreen[str | None]):
+    "Fuzzy search over recipe keys (`category/name`). Dismisses with the chosen key."
+
+    BINDINGS = [
+        Binding("escape", "close_screen", description="Close the finder."),
+        Binding("down", "cursor_down", show=False),
+        Binding("up", "cursor_up", show=False),
+    ]
+
+    FIND_DEBOUNCE = 0.03
+    MAX_RESULTS = 100
+
+    def __init__(self, recipe_finder: RecipeFinder) -> None:
+        super().__init__()
+        self.recipe_finder = recipe_finder
+        self.matches: list[str] = []
+
+    def compose(self) -> ComposeResult:
+
+        with Vertical(classes="description_container"):
+            yield Input(placeholder="Find a recipe", id="finder_input", compact=True)
+            yield OptionList(id="finder_results")
+            yield Static(id="finder_status")
+
+    @on(Input.Changed, "#finder_input")
+    def query_changed(self, event: Input.Changed) -> None:
+        self.find(event.value)
+
+    @work(thread=True, exclusive=True, group="finder")
+    def find(self, query: str) -> None:
+        """Narrowing and scoring run in a thread, so typing in the finder never
+        waits for them. A newer keystroke cancels this worker."""
+
+        worker = cast("Worker[None]", get_current_worker())
+        time.sleep(self.FIND_DEBOUNCE)
+        if worker.is_cancelled:
+            return
+        matches, total = self.recipe_finder.find(query, limit=self.MAX_RESULTS)
+        if not worker.is_cancelled:
+            self.app.call_from_thread(self.show_matches, query, matches, total)
+
+    def show_matches(self, query: str, matches: list[tuple[float, str, Content]], total: int) -> None:
+
+        if not self.is_attached:  # dismissed while the worker ran
+            return
+        results = self.query_one(OptionList)
+        results.clear_options()
+        self.matches = [key for _, key, _ in matches]
+        results.add_options([Option(highlighted) for _, _, highlighted in matches])
+        if matches:
+            results.highlighted = 0
+        if not query.strip():
+            status = ""
+        elif total > len(matches):
+            status = f"{len(matches)} of {total} recipes"
+        else:
+            status = f"{total} recipes"
+        self.query_one("#finder_status", Static).update(status)
+
+    @on(Input.Submitted, "#finder_input")
+    def query_submitted(self) -> None:
+
+        results = self.query_one(OptionList)
+        if results.highlighted is not None:
+            self.dismiss(self.matches[results.highlighted])
+
+    @on(OptionList.OptionSelected)
+    def match_selected(self, event: OptionList.OptionSelected) -> None:
+        self.dismiss(self.matches[event.option_index])
+
+    def action_cursor_down(self) -> None:
+        self.query_one(OptionList).action_cursor_down()
+
+    def action_cursor_up(self) -> None:
+        self.query_one(OptionList).action_cursor_up()
+
+    def on_click(self, event: events.Click) -> None:
+
+        if isinstance(event.control, RecipeFinderScreen):
+            self.dismiss(None)
+
+    def action_close_screen(self) -> None:
+        self.dismiss(None)
+
+
+class ResizeGhost(Widget):
+    """The divider drawn where a ResizeBar is being dragged to. It floats over
+    the screen, so moving it doesn't resize anything else."""
+
+    DEFAULT_CSS = """
+    ResizeGhost {
+        position: absolute;
+        overlay: screen;
+        width: 1;
+        height: 100%;
+        display: none;
+        border-left: outer $primary-lighten-1;
+    }
+    """
+
+
 class ResizeBar(Static):
+    """Drag to resize the connected container. While dragging, only the screen's
+    ResizeGhost moves (at most once per frame), and the container is resized
+    once on mouse up. Without a ghost on the screen the container follows the
+    mouse directly."""
 
     DEFAULT_CSS = """
     ResizeBar {
@@ -135,12 +413,17 @@ class ResizeBar(Static):
     }
     """
 
+    FRAME_INTERVAL = 1 / MAX_FPS
+
     def __init__(self, parent: Widget, **kwargs: Any) -> None:
         super().__init__(**kwargs)
         self.connected_container = parent
         self.min_width = 25    # adjust as needed
         self.max_width = 80
         self.tooltip = "<-- Drag to resize -->"
+        self.ghost: ResizeGhost | None = None
+        self.drag_width: int | None = None
+        self._frame_pending = False
 
     def on_mouse_move(self, event: events.MouseMove) -> None:
 
@@ -149,14 +432,29 @@ class ResizeBar(Static):
 
             total_delta = event.screen_offset - self.position_on_down
             new_size = self.size_on_down - total_delta
-        
-            self.connected_container.styles.width = clamp(new_size.width, self.min_width, self.max_width)
+            self.drag_width = clamp(new_size.width, self.min_width, self.max_width)
+
+            if self.ghost is None:
+                self.connected_container.styles.width = self.drag_width
+            elif not self._frame_pending:
+                self._frame_pending = True
+                self.set_timer(self.FRAME_INTERVAL, self.move_ghost)
+
+    def move_ghost(self) -> None:
+
+        self._frame_pending = False
+        if self.ghost is not None and self.drag_width is not None:
+            self.ghost.styles.offset = (self.connected_container.region.right - self.drag_width, 0)
+            self.ghost.display = True
 
     def on_mouse_down(self, event: events.MouseDown) -> None:
 
         self.max_width = self.app.screen.size.width - 10
         self.position_on_down = event.screen_offset
         self.size_on_down = self.connected_container.size
+        self.drag_width = None
+        ghosts = self.screen.query(ResizeGhost)
+        self.ghost = ghosts.first() if ghosts else None
 
         self.add_class("pressed")    # this requires a "pressed" class to exist
         self.capture_mouse()
@@ -165,10 +463,22 @@ class ResizeBar(Static):
 
         self.remove_class("pressed")
         self.release_mouse()
+        if self.ghost is not None:
+            self.ghost.display = False
+            self.ghost = None
+            if self.drag_width is not None:
+                self.connected_container.styles.width = self.drag_width
 
 
 class CodeContainer(Horizontal):
 
+    # Recipes longer than this are shown in a LargeFileView instead of the TextArea.
+    LARGE_FILE_LINES = 5000
+
+    def __init__(self, highlight_cache: HighlightCache | None = None, **kwargs: Any) -> None:
+        super().__init__(**kwargs)
+        self.highlight_cache = highlight_cache
+
     def compose(self) -> ComposeResult:
         yield ResizeBar(self)
         with Vertical():
@@ -177,7 +487,7 @@ class CodeContainer(Horizontal):
                 yield Static(id="current_category")
                 with Button("Run", id="run_button", compact=True) as butt:
                     butt.can_focus = False
-            yield TextArea(
+            yield CodeTextArea(
                 "Select a recipe \n"
                 "Hint: You can resize this area by dragging \n"
                 "<-- this Resize bar with your mouse.",
@@ -185,18 +495,80 @@ class CodeContainer(Horizontal):
                 read_only=True,
                 show_line_numbers=True,
                 soft_wrap=False,
-                tab_behavior="indent"
+                tab_behavior="indent",
+                highlight_cache=self.highlight_cache,
             )
+            large_file_view = LargeFileView()
+            large_file_view.display = False
+            yield large_file_view
 
-    def update(self, recipe_data: RecipeData):
+    @classmethod
+    def is_large(cls, recipe_data: RecipeData) -> bool:
+        return recipe_data["line_count"] > cls.LARGE_FILE_LINES
+
+    def update(self, recipe_data: RecipeData, text_blob: str) -> None:
         self.query_one("#current_recipe", Static).update(f"📄 {recipe_data['name']}.py  │")
         self.query_one("#current_category", Static).update(f"📁 {recipe_data['category']}")
+        large_file_view = self.query_one(LargeFileView)
+        large_file_view.close()
+        large_file_view.display = False
         text_area = self.query_one(TextArea)
-        text_area.language = "python"
-        text_area.text = recipe_data['text_blob']
+        text_area.display = True
+        if text_area.language != "python":
+            # Setting the reactive would parse the old text first, only to replace it.
+            text_area.set_reactive(TextArea.language, "python")
+        text_area.text = text_blob
+        if self.highlight_cache is not None:
+            self.query_one("#current_recipe", Static).tooltip = self.highlight_cache.describe()
+
+    def update_large(self, recipe_data: RecipeData, recipe_file: Path) -> None:
+        "Show a large recipe straight from the file, without loading it into the TextArea."
+
+        self.query_one("#current_recipe", Static).update(f"📄 {recipe_data['name']}.py  │")
+        self.query_one("#current_category", Static).update(
+            f"📁 {recipe_data['category']}  │  {recipe_data['line_count']:,} lines"
+        )
+        text_area = self.query_one(CodeTextArea)
+        large_file_view = self.query_one(LargeFileView)
+        large_file_view.theme = text_area_theme(text_area)
+        large_file_view.load(recipe_file)
+        if not large_file_view.display:
+            # Don't keep the last small recipe's document around.
+            text_area.text = ""
+            text_area.display = False
+            large_file_view.display = True
+
+    def go_to_line(self, line: int) -> None:
+        "Scroll the code to `line` (1-based)."
+
+        large_file_view = self.query_one(LargeFileView)
+        if large_file_view.display:
+            large_file_view.go_to_line(line)
+        else:
+            self.query_one(TextArea).move_cursor((line - 1, 0), center=True)
+
+
+def _format_seconds(seconds: float) -> str:
+    return f"{seconds * 1000:.0f}ms" if seconds < 1 else f"{seconds:.2f}s"
 
 
-class CustomDataTable(DataTable[Any]):
+def _format_bytes(size: int) -> str:
+    return f"{size / 2**20:.1f}M"
+
+
+class CustomDataTable(RowViewTable):
+
+    RECIPE_COLUMNS: ClassVar[tuple[Literal["name", "category", "author"], ...]] = ("name", "category", "author")
+    # The optional columns with the cost of each recipe's latest run:
+    # column key -> (RunResult field, formatter).
+    STAT_COLUMNS: ClassVar[dict[str, tuple[str, Callable[[Any], str]]]] = {
+        "wall": ("wall_time", _format_seconds),
+        "paint": ("first_paint", _format_seconds),
+        "user": ("user_time", _format_seconds),
+        "sys": ("system_time", _format_seconds),
+        "rss": ("max_rss", _format_bytes),
+    }
+    STAT_WIDTH = 8
 
     class TableInitialized(Message):
         pass
@@ -214,26 +586,254 @@ class CustomDataTable(DataTable[Any]):
         super().__init__(zebra_stripes=True, show_cursor=True, cursor_type="row")
         self.recipe_data_dict = recipe_data_dict
         self.initialized = False
+        # Column key -> {recipe key: rank of the row's case-folded value}. Built the
+        # first time a column is sorted, dropped whenever rows change.
+        self._sort_ranks: dict[str, dict[str, int]] = {}
+        # The rows of the last single-column sort, bucketed by rank: (column, buckets).
+        # Dropped with the ranks, and by any other sort.
+        self._sort_buckets: tuple[str, list[list[str]]] | None = None
+        # Latest run of each recipe, by recipe key. Only kept up to date while shown.
+        self.run_stats: dict[str, RunResult] = {}
+        self.show_run_stats = False
 
         self.sort_status: dict[str, CustomDataTable.SortingStatus] = {
-            "name": CustomDataTable.SortingStatus.UNSORTED,
-            "category": CustomDataTable.SortingStatus.UNSORTED,
-            "author": CustomDataTable.SortingStatus.UNSORTED,
+            key: CustomDataTable.SortingStatus.UNSORTED for key in self.RECIPE_COLUMNS
         }
 
         for key in self.sort_status:
             self.add_column(f"{key} [dark_orange]-[/]", key=key)
 
     def on_mount(self) -> None:
-
-        for recipe_data in self.recipe_data_dict.values():
-
-            self.add_row(
-                SortableText(recipe_data["name"], overflow="ellipsis"),
-                SortableText(recipe_data["category"], overflow="ellipsis"),
-                SortableText(recipe_data["author"], overflow="ellipsis"),
-                key= recipe_data["name"],
-            )        
+        self.add_recipes(self.recipe_data_dict.values())
+
+    def add_recipes(self, recipes: Iterable[RecipeData]) -> None:
+        """Append rows for recipes that aren't in the table yet. Recipes arrive in
+        batches while the scan is running, so this keeps any active sort order."""
+
+        if self._add_rows(recipes):
+            self.reapply_sort()
+
+    def _add_rows(self, recipes: Iterable[RecipeData]) -> bool:
+        """Bulk insert: the rows are built in one pass and added with a single
+        `append_rows`, which invalidates the layout once instead of once per
+        `add_row` call. Column widths are worked out from the plain strings
+        here, so the table doesn't have to measure every new cell on idle.
+
+        While a filter is active, new rows are added hidden. It's up to the
+        caller to filter again."""
+
+        column_keys = [ColumnKey(key) for key in self.RECIPE_COLUMNS]
+        keys = self.RECIPE_COLUMNS
+        show_run_stats = self.show_run_stats
+        row_cells = self.row_cells
+        new_cells: dict[str, dict[ColumnKey, Any]] = {}
+        new_recipes: list[RecipeData] = []
+        # Every object made here lives as long as the table does, so there is
+        # nothing for the garbage collector to find while they're being made.
+        with _gc_paused():
+            for recipe_data in recipes:
+                key = recipe_key(recipe_data)
+                if key in row_cells or key in new_cells:
+                    continue
+                cells = new_cells[key] = dict(zip(column_keys, [RecipeCell(recipe_data[column]) for column in keys]))
+                if show_run_stats:
+                    cells.update(self._stat_cells(key))
+                new_recipes.append(recipe_data)
+
+            if not new_cells:
+                return False
+            self._sort_ranks.clear()
+            self._sort_buckets = None
+            for key in self.RECIPE_COLUMNS:
+                column = self.columns[ColumnKey(key)]
+                new_width = max(map(_cell_width, {recipe_data[key] for recipe_data in new_recipes}))
+                column.content_width = max(column.content_width, new_width)
+            self.append_rows(new_cells)
+        return True
+
+    def key_at(self, row_index: int) -> str:
+        "Return the recipe key of the row shown at `row_index`."
+        return str(self.coordinate_to_cell_key(Coordinate(row_index, 0)).row_key.value)
+
+    @property
+    def is_filtered(self) -> bool:
+        return self.row_filter is not None
+
+    def filter_rows(self, keys: set[str] | None) -> None:
+        """Only show the rows of the recipes in `keys` (None shows every row). Hidden
+        rows keep their data and their place in the sort order. The cursor stays
+        on the same recipe if it's still shown."""
+
+        cursor_key = self.key_at(self.cursor_row) if self.is_valid_row_index(self.cursor_row) else None
+        self.set_row_filter(keys)
+        if cursor_key is not None and (keys is None or cursor_key in keys):
+            self.move_cursor(row=self.get_row_index(cursor_key), animate=False)
+        else:
+            self.move_cursor(row=0, animate=False)
+
+    def apply_changes(self, updated: list[RecipeData], removed: list[str]) -> None:
+        """Apply the result of a live rescan. Existing rows (shown or hidden) are
+        updated in place, the table is never rebuilt."""
+
+        self.discard_rows(removed)
+        new_recipes: list[RecipeData] = []
+        for recipe_data in updated:
+            cells = self.row_cells.get(recipe_key(recipe_data))
+            if cells is None:
+                new_recipes.append(recipe_data)
+                continue
+            for key in self.RECIPE_COLUMNS:
+                cells[ColumnKey(key)] = RecipeCell(recipe_data[key])
+                column = self.columns[ColumnKey(key)]
+                column.content_width = max(column.content_width, _cell_width(recipe_data[key]))
+        self._sort_ranks.clear()
+        self._sort_buckets = None
+        self.cells_changed()
+        self._add_rows(new_recipes)
+        self.reapply_sort()
+
+    def discard_rows(self, keys: Iterable[str]) -> None:
+
+        self._sort_ranks.clear()
+        self._sort_buckets = None
+        super().discard_rows(keys)
+
+    def clear(self, columns: bool = False) -> CustomDataTable:
+
+        super().clear(columns)
+        self._sort_ranks.clear()
+        self._sort_buckets = None
+        return self
+
+    def sort(
+        self,
+        *columns: ColumnKey | str,
+        key: Callable[[Any], Any] | None = None,
+        reverse: bool = False,
+    ) -> CustomDataTable:
+        """Sorting by a single column uses the cached ranks for that column. The
+        rows are dealt into one bucket per rank in their current order, which is
+        a linear pass, and read back from the first bucket or the last. So the
+        sort is stable (ties keep the order of the previous sort, whichever
+        column that was on) and never compares two values. The buckets are kept
+        until the rows change or another column is sorted, so flipping the
+        direction of the sorted column only reads them back the other way.
+        Hidden rows are sorted too, so they're in the right place when the
+        filter is cleared. Anything else goes to RowViewTable."""
+
+        if len(columns) != 1 or key is not None:
+            self._sort_buckets = None
+            super().sort(*columns, key=key, reverse=reverse)
+            return self
+
+        column = str(getattr(columns[0], "value", columns[0]))
+        if self._sort_buckets is None or self._sort_buckets[0] != column:
+            ranks = self._get_sort_ranks(column)
+            buckets: list[list[str]] = [[] for _ in range(max(ranks.values(), default=-1) + 1)]
+            for row_key in self.row_order:
+                buckets[ranks[row_key]].append(row_key)
+            self._sort_buckets = (column, buckets)
+        buckets = self._sort_buckets[1]
+        self.set_row_order(list(chain.from_iterable(reversed(buckets) if reverse else buckets)))
+        return self
+
+    def _stat_cells(self, key: str | None) -> dict[ColumnKey, RecipeCell]:
+
+        stats = self.run_stats.get(key) if key is not None else None
+        cells: dict[ColumnKey, RecipeCell] = {}
+        for column, (field, format_value) in self.STAT_COLUMNS.items():
+            value = getattr(stats, field, None)
+            plain = "" if value is None else format_value(value)
+            cells[ColumnKey(column)] = RecipeCell(plain.rjust(self.STAT_WIDTH))
+        return cells
+
+    def toggle_run_stats(self, run_stats: dict[str, RunResult]) -> None:
+        """Show or hide the run stat columns. `run_stats` is the latest run of
+        every recipe, it's only used when the columns are shown.
+
+        The columns are added with `add_fixed_column`, which doesn't mark every
+        cell of the table to be measured again like `add_column` does."""
+
+        self.show_run_stats = not self.show_run_stats
+        self._sort_ranks.clear()
+        self._sort_buckets = None
+        if self.show_run_stats:
+            self.run_stats = dict(run_stats)
+            for key in self.STAT_COLUMNS:
+                self.add_fixed_column(Text.from_markup(f"{key} [dark_orange]-[/]"), self.STAT_WIDTH, key)
+                self.sort_status[key] = self.SortingStatus.UNSORTED
+            for key, cells in self.row_cells.items():
+                cells.update(self._stat_cells(key))
+        else:
+            for key in self.STAT_COLUMNS:
+                self.drop_column(key)
+                del self.sort_status[key]
+            column_keys = [ColumnKey(key) for key in self.STAT_COLUMNS]
+            for cells in self.row_cells.values():
+                for column_key in column_keys:
+                    del cells[column_key]
+            self.run_stats = {}
+        self.cells_changed()
+
+    def update_run_stats(self, run_stats: dict[str, RunResult]) -> None:
+        "Show the results of new runs, if the run stat columns are shown."
+
+        if not self.show_run_stats:
+            return
+        self.run_stats.update(run_stats)
+        for key in run_stats:
+            cells = self.row_cells.get(key)
+            if cells is not None:
+                cells.update(self._stat_cells(key))
+        for column in self.STAT_COLUMNS:
+            self._sort_ranks.pop(column, None)
+        self._sort_buckets = None
+        self.cells_changed()
+        self.reapply_sort()
+
+    def _get_sort_ranks(self, column: str) -> dict[str, int]:
+
+        if column in self.STAT_COLUMNS:
+            return self._get_stat_ranks(column)
+        ranks = self._sort_ranks.get(column)
+        if ranks is None:
+            column_key = ColumnKey(column)
+            values = {key: str(cells[column_key]) for key, cells in self.row_cells.items()}
+            # Only the distinct values are case-folded and sorted. Values that
+            # only differ in case share a rank.
+            folded = {value: value.casefold() for value in set(values.values())}
+            folded_rank = {key: rank for rank, key in enumerate(sorted(set(folded.values())))}
+            value_rank = {value: folded_rank[key] for value, key in folded.items()}
+            ranks = {key: value_rank[value] for key, value in values.items()}
+            self._sort_ranks[column] = ranks
+        return ranks
+
+    def _get_stat_ranks(self, column: str) -> dict[str, int]:
+        "Stat columns rank by value. Recipes that haven't been run rank below all others."
+
+        ranks = self._sort_ranks.get(column)
+        if ranks is None:
+            field = self.STAT_COLUMNS[column][0]
+            values = {key: getattr(self.run_stats.get(key), field, None) for key in self.row_cells}
+            ordered = sorted({value for value in values.values() if value is not None})
+            value_rank = {value: rank for rank, value in enumerate(ordered, start=1)}
+            ranks = {key: value_rank.get(value, 0) for key, value in values.items()}
+            self._sort_ranks[column] = ranks
+        return ranks
+
+    def reapply_sort(self) -> None:
+        "Sort again by the active sort column (if any), keeping the cursor on the same recipe."
+
+        for key, status in self.sort_status.items():
+            if status == self.SortingStatus.UNSORTED:
+                continue
+            cursor_row_key = None
+            if self.is_valid_row_index(self.cursor_row):
+                cursor_row_key = self.coordinate_to_cell_key(self.cursor_coordinate).row_key
+            self.sort(key, reverse=status == self.SortingStatus.ASCENDING)
+            if cursor_row_key is not None:
+                self.move_cursor(row=self.get_row_index(cursor_row_key))
+            return
 
     @on(DataTable.HeaderSelected)
     def header_selected(self, event: DataTable.HeaderSelected) -> None:
@@ -289,19 +889,45 @@ class TableScreen(Screen[None]):
         Binding("2", "sort_column(1)", "Sort Column 2"),
         Binding("3", "sort_column(2)", "Sort Column 3"),
         Binding("d", "show_description", "Show Description"),
+        Binding("slash", "focus_search", "Search"),
+        Binding("s", "search_source", "Search Source"),
+        Binding("f", "find_recipe", "Find Recipe"),
+        Binding("p", "toggle_preview", "Toggle Preview"),
+        Binding("g", "toggle_grouped", "Toggle Grouped"),
+        Binding("t", "toggle_run_stats", "Toggle Run Stats"),
+        Binding("escape", "clear_search", "Clear Search", show=False),
     ]
 
+    AUTO_FOCUS = "CustomDataTable"
+    FILTER_DEBOUNCE = 0.05
+    # The cursor has to rest this long before neighbouring recipes are prefetched.
+    PREFETCH_DELAY = 0.15
+    PREFETCH_NEIGHBOURS = 2
+    PREFETCH_FILTER_RESULTS = 3
+    # Preview mode: how long the cursor has to rest on a row before it's shown.
+    PREVIEW_DEBOUNCE = 0.1
+
     def __init__(
         self, 
-        recipe_data_dict: dict[str, RecipeData],
+        recipe_data_dict: RecipeCatalog,
         starting_selection: str | None = None,
         run_immediately: bool = False,
+        preview_mode: bool = False,
     ) -> None:
         super().__init__()
         self.recipe_data_dict = recipe_data_dict
-        self.selected_recipe = None
+        self.preview_mode = preview_mode
+        self.selected_recipe: str | None = None  # recipe key
         self.starting_selection = starting_selection
         self.run_immediately = run_immediately
+        self.scan_complete = False
+        self.recipe_filter = RecipeFilter(recipe_data_dict)
+        self.recipe_finder = RecipeFinder()
+
+    @property
+    def cookbook(self) -> CookBookApp:
+        "The app, typed as the cookbook, which holds the caches, indexes and launcher."
+        return cast("CookBookApp", self.app)
 
     def compose(self) -> ComposeResult:
 
@@ -320,35 +946,314 @@ class TableScreen(Screen[None]):
                     id="header_text",
                 )
             with Vertical(id="table_container"):
+                yield Input(
+                    placeholder="Filter by name, category, author or description",
+                    id="search_input",
+                    compact=True,
+                )
                 self.table = CustomDataTable(self.recipe_data_dict)
                 yield self.table
+                self.recipe_tree = RecipeTree()
+                self.recipe_tree.display = False
+                yield self.recipe_tree
             with Vertical(id="bottom_container"):
                 yield Static(
                     "[$accent]Up/Down[/] Navigate │ "
                     "[$accent]Enter[/]/[$accent]Click[/] Select │ "
                     "[$accent]1-3[/] Sort │ "
+                    "[$accent]/[/] Search │ "
+                    "[$accent]s[/] Source │ "
+                    "[$accent]f[/] Find │ "
+                    "[$accent]p[/] Preview │ "
+                    "[$accent]g[/] Group │ "
+                    "[$accent]t[/] Stats │ "
                     "[$accent]d[/] Description",
                     id="controls_bar",
                 )
                 with Horizontal(classes="button_container"):
                     yield Button("Quit", id="quit_button", compact=True)
-        yield CodeContainer()
+        yield CodeContainer(self.cookbook.highlight_cache)
+        yield ResizeGhost()
         
-    async def on_mount(self):
-        if self.starting_selection:
-            try:
-                row_index = self.table.get_row_index(self.starting_selection)
-            except RowDoesNotExist:
-                self.notify(
-                    f"Recipe '{self.starting_selection}' not found in table."
-                )
+    def on_mount(self) -> None:
+        self.check_starting_selection()
+
+    def add_recipes(self, recipes: list[RecipeData]) -> None:
+        self.table.add_recipes(recipes)
+        self.recipe_tree.add_recipes(recipes)
+        self.recipe_filter.update(recipes)
+        self.recipe_finder.update(map(recipe_key, recipes))
+        self.refilter()
+        self.check_starting_selection()
+
+    def scan_finished(self) -> None:
+        self.scan_complete = True
+        self.check_starting_selection()
+
+    def apply_changes(self, updated: list[RecipeData], removed: list[str]) -> None:
+
+        self.table.apply_changes(updated, removed)
+        self.recipe_tree.apply_changes(updated, removed)
+        self.recipe_filter.remove(removed)
+        self.recipe_filter.update(updated)
+        self.recipe_finder.remove(removed)
+        self.recipe_finder.update(map(recipe_key, updated))
+        self.refilter()
+        if self.selected_recipe in removed:
+            self.notify(f"Recipe '{self.selected_recipe}' was removed.", timeout=3)
+            self.selected_recipe = None
+            return
+        for recipe_data in updated:
+            if recipe_key(recipe_data) == self.selected_recipe:
+                # Keep the code viewer in sync with the file being edited.
+                self.show_code(recipe_data)
+
+    def check_starting_selection(self) -> None:
+        """The starting recipe can only be selected once its row has been
+        streamed in. It is only reported missing after the scan is done.
+        It can be a key (`category/name`) or a name, which has to be unique."""
+
+        if self.starting_selection is None:
+            return
+        keys = self.recipe_data_dict.resolve(self.starting_selection)
+        if len(keys) > 1:
+            self.notify(
+                f"Recipe '{self.starting_selection}' is in more than one category: {', '.join(keys)}",
+                severity="warning",
+            )
+            self.starting_selection = None
+        elif keys and keys[0] in self.table.row_cells:
+            self.select_starting_recipe(keys[0])
+            self.starting_selection = None
+        elif self.scan_complete:
+            self.notify(f"Recipe '{self.starting_selection}' not found in table.")
+            self.starting_selection = None
+
+    @work
+    async def select_starting_recipe(self, key: str) -> None:
+
+        row_index = self.table.get_row_index(key)
+        self.table.move_cursor(row=row_index)
+        await self.table.run_action("select_cursor")
+        if self.run_immediately:
+            # This will trigger the recipe_selected event
+            await self.table.run_action("select_cursor")
+
+    @on(Input.Changed, "#search_input")
+    def search_changed(self, event: Input.Changed) -> None:
+        self.filter_recipes(event.value)
+
+    @on(Input.Submitted, "#search_input")
+    def search_submitted(self) -> None:
+        self.recipe_view.focus()
+
+    def refilter(self) -> None:
+        "Filter again after recipes were added or changed, if there is a query."
+
+        query = self.query_one("#search_input", Input).value
+        if query.strip():
+            self.filter_recipes(query)
+
+    @work(exclusive=True, group="filter")
+    async def filter_recipes(self, query: str) -> None:
+
+        # Debounce: a newer keystroke cancels this worker while it sleeps.
+        await asyncio.sleep(self.FILTER_DEBOUNCE)
+        matches = self.recipe_filter.match(query)
+        self.table.filter_rows(matches)
+        self.recipe_tree.filter_recipes(matches)
+        self.schedule_prefetch()
+
+    @property
+    def recipe_view(self) -> CustomDataTable | RecipeTree:
+        "The table, or the tree in grouped mode."
+        return self.recipe_tree if self.recipe_tree.display else self.table
+
+    def cursor_recipe(self) -> str | None:
+        "Return the key of the recipe under the cursor of the current view."
+
+        if self.recipe_tree.display:
+            node = self.recipe_tree.cursor_node
+            if node is None or self.recipe_tree.is_category(node) or node.is_root:
+                return None
+            return node.data
+        if not self.table.is_valid_row_index(self.table.cursor_row):
+            return None
+        return self.table.key_at(self.table.cursor_row)
+
+    def action_toggle_grouped(self) -> None:
+
+        grouped = not self.recipe_tree.display
+        self.recipe_tree.display = grouped
+        self.table.display = not grouped
+        if grouped and self.selected_recipe is not None:
+            self.recipe_tree.reveal(self.selected_recipe)
+        elif grouped and self.recipe_tree.cursor_line < 0:
+            self.recipe_tree.cursor_line = 0
+        self.recipe_view.focus()
+
+    def action_toggle_run_stats(self) -> None:
+
+        run_stats = {} if self.table.show_run_stats else self.cookbook.run_history.latest()
+        self.table.toggle_run_stats(run_stats)
+
+    @on(Tree.NodeHighlighted)
+    def node_highlighted(self, event: Tree.NodeHighlighted[str]) -> None:
+
+        if self.preview_mode and not self.recipe_tree.is_category(event.node) and event.node.data is not None:
+            self.preview_recipe(event.node.data)
+
+    @on(Tree.NodeSelected)
+    def node_selected(self, event: Tree.NodeSelected[str]) -> None:
+
+        # Selecting a category only expands or collapses it.
+        if not self.recipe_tree.is_category(event.node) and event.node.data is not None:
+            self.choose_recipe(event.node.data)
+
+    @on(DataTable.RowHighlighted)
+    def row_highlighted(self, event: DataTable.RowHighlighted) -> None:
+
+        self.schedule_prefetch()
+        if self.preview_mode and event.row_key.value is not None:
+            self.preview_recipe(event.row_key.value)
+
+    @work(exclusive=True, group="preview")
+    async def preview_recipe(self, key: str) -> None:
+        """Preview mode: show the recipe under the cursor once the cursor rests
+        on it. Each move cancels the previous preview, so scrolling past rows
+        never loads or parses them. Loading and parsing run in a thread, and
+        the code pane is only updated with the finished document."""
+
+        await asyncio.sleep(self.PREVIEW_DEBOUNCE)
+        recipe_data = self.recipe_data_dict.get(key)
+        if recipe_data is None or key == self.selected_recipe:
+            return
+        if CodeContainer.is_large(recipe_data):
+            # Opening the view only indexes line offsets, nothing to prepare.
+            self.selected_recipe = key
+            self.show_code(recipe_data)
+            return
+        try:
+            text_blob = await asyncio.to_thread(self.cookbook.source_cache.get, recipe_data)
+        except OSError:
+            return
+        highlight_cache = self.cookbook.highlight_cache
+        cache_key = highlight_cache.make_key(text_blob, "python")
+        await asyncio.to_thread(highlight_cache.prepare, cache_key, text_blob, "python")
+        # Previewing counts as the first selection, so Enter runs the recipe.
+        self.selected_recipe = key
+        self.show_code(recipe_data, text_blob)
+
+    def action_toggle_preview(self) -> None:
+
+        self.preview_mode = not self.preview_mode
+        self.notify(f"Preview mode {'on' if self.preview_mode else 'off'}", timeout=2)
+        key = self.cursor_recipe()
+        if self.preview_mode and key is not None:
+            self.preview_recipe(key)
+
+    def schedule_prefetch(self) -> None:
+        """Prefetch the recipe under the cursor and its neighbours, and the top
+        filter results while a filter is active, nearest first."""
+
+        table = self.table
+        cursor_row = table.cursor_row
+        row_indices = [cursor_row]
+        for distance in range(1, self.PREFETCH_NEIGHBOURS + 1):
+            row_indices += [cursor_row + distance, cursor_row - distance]
+        if table.is_filtered:
+            row_indices += range(self.PREFETCH_FILTER_RESULTS)
+
+        keys = dict.fromkeys(table.key_at(row_index) for row_index in row_indices if table.is_valid_row_index(row_index))
+        # Large recipes aren't parsed as a whole, so there's nothing to warm up.
+        recipes = [
+            self.recipe_data_dict[key]
+            for key in keys
+            if key in self.recipe_data_dict and not CodeContainer.is_large(self.recipe_data_dict[key])
+        ]
+        if recipes:
+            self.prefetch_recipes(recipes)
+
+    @work(thread=True, exclusive=True, group="prefetch", exit_on_error=False)
+    def prefetch_recipes(self, recipes: list[RecipeData]) -> None:
+        """Warm the source and highlight caches for `recipes`, so selecting one
+        of them shows it straight away. Moving the cursor again starts a new
+        prefetch, which cancels this one."""
+
+        worker = cast("Worker[None]", get_current_worker())
+        # Wait until the cursor rests, so scrolling through rows doesn't parse them all.
+        resume_at = time.monotonic() + self.PREFETCH_DELAY
+        while time.monotonic() < resume_at:
+            time.sleep(0.02)
+            if worker.is_cancelled:
+                return
+
+        source_cache, highlight_cache = self.cookbook.source_cache, self.cookbook.highlight_cache
+        for recipe_data in recipes:
+            if worker.is_cancelled:
                 return
-            else:
-                self.table.move_cursor(row=row_index)
-                await self.table.run_action("select_cursor")
-                if self.run_immediately:
-                    # This will trigger the recipe_selected event
-                    await self.table.run_action("select_cursor")
+            try:
+                text_blob = source_cache.get(recipe_data)
+            except OSError:  # removed since, watch mode will catch up
+                continue
+            highlight_cache.prepare(highlight_cache.make_key(text_blob, "python"), text_blob, "python")
+
+    def action_focus_search(self) -> None:
+        self.query_one("#search_input", Input).focus()
+
+    def action_clear_search(self) -> None:
+
+        search_input = self.query_one("#search_input", Input)
+        if search_input.value:
+            search_input.value = ""
+        self.recipe_view.focus()
+
+    @work
+    async def action_search_source(self) -> None:
+
+        hit = await self.app.push_screen(SourceSearchScreen(self.cookbook.search_index), wait_for_dismiss=True)
+        if hit is not None and path_to_key(hit.path) in self.recipe_data_dict:
+            self.show_recipe(path_to_key(hit.path), line=hit.lines[0] if hit.lines else None)
+
+    @work
+    async def action_find_recipe(self) -> None:
+
+        key = await self.app.push_screen(RecipeFinderScreen(self.recipe_finder), wait_for_dismiss=True)
+        if key is not None and key in self.recipe_data_dict:
+            self.show_recipe(key)
+
+    def show_recipe(self, key: str, line: int | None = None) -> None:
+        """Move the cursor to a recipe and show its code, scrolled to `line` (1-based).
+        The filter is cleared if it hides the recipe."""
+
+        try:
+            row_index = self.table.get_row_index(key)
+        except RowDoesNotExist:
+            self.query_one("#search_input", Input).value = ""
+            self.table.filter_rows(None)
+            self.recipe_tree.filter_recipes(None)
+            row_index = self.table.get_row_index(key)
+        self.table.move_cursor(row=row_index)
+        if self.recipe_tree.display:
+            self.recipe_tree.reveal(key)
+        recipe_data = self.recipe_data_dict[key]
+        self.selected_recipe = key
+        self.show_code(recipe_data)
+        if line is not None:
+            self.query_one(CodeContainer).go_to_line(line)
+
+    def show_code(self, recipe_data: RecipeData, text_blob: str | None = None) -> None:
+        """Show a recipe in the code viewer. Large recipes are viewed straight
+        from the file, others are loaded (or pulled from the LRU) unless
+        `text_blob` is given."""
+
+        code_container = self.query_one(CodeContainer)
+        if CodeContainer.is_large(recipe_data):
+            code_container.update_large(recipe_data, self.cookbook.recipes_dir / recipe_data["path"])
+        else:
+            if text_blob is None:
+                text_blob = self.cookbook.source_cache.get(recipe_data)
+            code_container.update(recipe_data, text_blob)
 
     def action_sort_column(self, column_index: int) -> None:
 
@@ -365,53 +1270,72 @@ class TableScreen(Screen[None]):
         if self.selected_recipe is None:
             self.notify("No recipe selected", timeout=3)
         else:
-            category = self.recipe_data_dict[self.selected_recipe]["category"]
-            self.run_recipe(self.selected_recipe, category)        
+            self.run_recipe(self.selected_recipe)
 
     @on(DataTable.RowSelected)
     @work
     async def recipe_selected(self, event: DataTable.RowSelected) -> None:
 
-        row_data: list[str] = self.table.get_row(event.row_key)
-        recipe_name = str(row_data[0])
-        recipe_data = self.recipe_data_dict[recipe_name]
-        category = self.recipe_data_dict[recipe_name]["category"]
-        code_container = self.query_one(CodeContainer)
+        self.choose_recipe(str(event.row_key.value))
+
+    def choose_recipe(self, key: str) -> None:
+        "Show a recipe's code the first time it's selected, run it the second time."
 
-        if recipe_name == self.selected_recipe:
-            self.run_recipe(recipe_name, category)
+        if key == self.selected_recipe:
+            self.run_recipe(key)
         else:
-            self.selected_recipe = recipe_name
-            code_container.update(recipe_data)
+            self.selected_recipe = key
+            # Source isn't kept in the index, it's loaded (or pulled from the LRU) here.
+            self.show_code(self.recipe_data_dict[key])
 
     @work
     async def action_show_description(self) -> None:
 
-        cursor_index = self.table.cursor_row
-        row_data: list[str] = self.table.get_row_at(cursor_index)
-        recipe_name = str(row_data[0])
-        description = self.recipe_data_dict[recipe_name]["description"]
+        key = self.cursor_recipe()
+        if key is None:
+            return
+        description = self.recipe_data_dict[key]["description"]
         result = await self.app.push_screen(DescriptionScreen(description), wait_for_dismiss=True)
         if result:
-            category = self.recipe_data_dict[recipe_name]["category"]
-            self.run_recipe(recipe_name, category)
-
-    def run_recipe(self, recipe_name: str, category: str) -> None:
+            self.run_recipe(key)
 
-        with self.app.suspend():
-
-            cookbook = resources.files("textual_cookbook")
-            recipe_traversable = cookbook.joinpath(f"recipes/{category}/{recipe_name}.py")
-
-            # as_file gives a real filesystem Path (extracts to a temp file if inside a zip/wheel)
-            with resources.as_file(recipe_traversable) as recipe_path:
-                try:
-                    subprocess.run([sys.executable, str(recipe_path)], check=True)
-                except subprocess.CalledProcessError as e:
-                    self.app.push_screen(ErrorScreen(e))
-                except Exception as e:
-                    raise e
+    @work(group="run_recipe")
+    async def run_recipe(self, key: str) -> None:
 
+        # The in-process launcher runs the recipe's App on this event loop, so the
+        # cookbook's timers keep firing while it's suspended. Its writer thread is
+        # stopped meanwhile, and enough frames would fill the queue and block the
+        # loop for good. So nothing is painted, or animated, until it's resumed.
+        figlet = self.query_one(FigletWidget)
+        figlet.animated = False
+        try:
+            with self.app.batch_update(), self.app.suspend():
+                await self._run_recipe(key)
+        finally:
+            figlet.animated = True
+
+    async def _run_recipe(self, key: str) -> None:
+
+        recipes_dir = self.cookbook.recipes_dir
+        recipe_file = self.recipe_data_dict[key]["path"]
+        recipe_traversable: Traversable
+        if recipes_dir.is_dir():
+            recipe_traversable = recipes_dir / recipe_file
+        else:
+            # Installed as a zip/wheel.
+            recipe_traversable = resources.files("textual_cookbook").joinpath(f"recipes/{recipe_file}")
+
+        # A real filesystem Path. Inside a zip/wheel, that's an extracted and
+        # compiled copy that's reused for as long as the recipe doesn't change.
+        with self.cookbook.recipe_files.open(recipe_traversable) as recipe_path:
+            result = await self.cookbook.launcher.run_async(recipe_path)
+            self.cookbook.run_history.record(key, result)
+            self.table.update_run_stats({key: result})
+            if result.returncode != 0:
+                error = subprocess.CalledProcessError(
+                    result.returncode, [sys.executable, str(recipe_path)], output=result.output
+                )
+                self.app.push_screen(ErrorScreen(error))
 
     @on(Button.Pressed, "#quit_button")
     def quit_button_pressed(self) -> None:
@@ -426,66 +1350,128 @@ class CookBookApp(App[None]):
         self,
         starting_recipe: str | None = None,
         run: bool = False,
+        source_cache_bytes: int = DEFAULT_SOURCE_CACHE_BYTES,
+        highlight_cache_bytes: int = DEFAULT_HIGHLIGHT_CACHE_BYTES,
+        watch: bool = False,
+        preview: bool = False,
+        recipes_dir: Path | None = None,
+        launcher: str = "subprocess",
     ) -> None:
         super().__init__()
         self.starting_recipe = starting_recipe
         self.run_immediately = run
+        self.watch_mode = watch
+        self.preview_mode = preview
+        self.recipe_data_dict = RecipeCatalog()
+        # The recipes directory can be swapped out for the benchmarks.
+        self.recipes_dir = recipes_dir if recipes_dir is not None else get_recipes_dir()
+        self.source_cache = RecipeSourceCache(self.recipes_dir, source_cache_bytes)
+        self.highlight_cache = HighlightCache(highlight_cache_bytes)
+        self.search_index = SearchIndex(self.recipes_dir)
+        self.launcher = create_launcher(launcher)
+        self.run_history = RunHistory()
+        self.recipe_files = RecipeFileCache()
+        # Names that became ambiguous since they were last reported.
+        self.duplicate_names: list[str] = []
+
+    class RecipesDiscovered(Message):
+        def __init__(self, recipes: list[RecipeData]) -> None:
+            super().__init__()
+            self.recipes = recipes
 
     class WorkerFinished(Message):
-        def __init__(self, recipe_data_dict: dict[str, RecipeData]) -> None:
+        pass
+
+    class RecipesChanged(Message):
+        def __init__(self, updated: list[RecipeData], removed: list[str]) -> None:
             super().__init__()
-            self.recipe_data_dict = recipe_data_dict
+            self.updated = updated
+            self.removed = removed
+
+    async def on_mount(self) -> None:
+
+        # The table screen is shown straight away, recipes are streamed
+        # into it in batches as the scan finds them.
+        self.table_screen = TableScreen(
+            self.recipe_data_dict,
+            starting_selection=self.starting_recipe,
+            run_immediately=self.run_immediately,
+            preview_mode=self.preview_mode,
+        )
+        await self.push_screen(self.table_screen)
 
-    def on_mount(self) -> None:
-        self.run_worker(self.scan_for_recipes)
+        # The scan does blocking file IO (and may start a process pool),
+        # so it runs in a thread to keep the UI and the figlet animation alive.
+        self.run_worker(self.scan_for_recipes, thread=True)
 
-    async def scan_for_recipes(self) -> None:
+    def scan_for_recipes(self) -> None:
 
-        recipe_data_dict: dict[str, RecipeData] = {}
-        
-        # NEW: Start with Traversable then convert to Path for easier handling
-        recipes_traversable = resources.files("textual_cookbook").joinpath("recipes")
-        recipes_dir = Path(str(recipes_traversable))
-
-        # Simple one-level scan - categories are subdirectories, no files in root
-        for recipe_file in recipes_dir.rglob("*.py"):
-            with open(recipe_file, "r", encoding="utf-8") as f:
-                text_blob = f.read()
-                author_match = re.search(r"Recipe by (.+)", text_blob)
-                if author_match:
-                    author = author_match.group(1).strip()
-                    author = author.replace('"', "")
-                else:
-                    author = "Unknown"
-
-            description_match = re.match(r'"""(.*?)"""', text_blob, re.DOTALL)
-            if description_match:
-                description = description_match.group(1).strip()
-            else:
-                description = "No description available."
-
-            recipe_data: RecipeData = {
-                "name": recipe_file.stem,
-                "category": recipe_file.parent.name,
-                "author": author,
-                "description": description,
-                "text_blob": text_blob
-            }
-            recipe_data_dict[recipe_file.stem] = recipe_data
-
-        self.post_message(CookBookApp.WorkerFinished(recipe_data_dict))
+        recipes_dir = self.recipes_dir
+        batches = iter_recipe_batches(
+            recipes_dir,
+            RecipeIndexCache(recipes_dir),
+            manifest_path=recipes_dir.parent / MANIFEST_NAME,
+        )
+        recipes: list[RecipeData] = []
+        for batch in batches:
+            recipes.extend(batch)
+            self.post_message(CookBookApp.RecipesDiscovered(batch))
+        self.post_message(CookBookApp.WorkerFinished())
+        # The table is usable by now. The search index only has to read
+        # recipes that changed since it was last saved.
+        self.search_index.refresh(recipes)
 
+    @on(RecipesDiscovered)
+    def recipes_discovered(self, message: RecipesDiscovered) -> None:
 
-    @on(WorkerFinished)
-    async def worker_finished(self, message: WorkerFinished) -> None:
+        self.duplicate_names.extend(self.recipe_data_dict.add(message.recipes))
+        self.table_screen.add_recipes(message.recipes)
 
-        await self.push_screen(
-            TableScreen(
-                message.recipe_data_dict, 
-                starting_selection=self.starting_recipe,
-                run_immediately=self.run_immediately,
-            )
-        )
+    def report_duplicates(self) -> None:
+        "Warn about recipe names used in more than one category, which can only be run by their key."
+
+        if not self.duplicate_names:
+            return
+        duplicates = self.recipe_data_dict.duplicates()
+        names = [", ".join(duplicates[name]) for name in self.duplicate_names if name in duplicates]
+        self.duplicate_names = []
+        if names:
+            self.notify("\n".join(names), title="Duplicate recipe names", severity="warning", timeout=8)
+
+    @on(WorkerFinished)
+    def worker_finished(self) -> None:
+        self.report_duplicates()
+        self.table_screen.scan_finished()
+        # Started once the scan is done, so warming it up doesn't slow the scan down.
+        self.run_worker(self.launcher.start, thread=True, group="launcher")
+        if self.watch_mode:
+            self.run_worker(self.watch_for_changes, thread=True, group="watch", exclusive=True)
+
+    def watch_for_changes(self) -> None:
+        "Watch mode: rescan only the recipes that changed on disk."
+
+        worker = cast("Worker[None]", get_current_worker())
+        watcher = create_watcher(self.recipes_dir)
+        cache = RecipeIndexCache(self.recipes_dir)
+        try:
+            for changed in watcher.watch(lambda: worker.is_cancelled):
+                updated, removed = rescan_recipes(self.recipes_dir, changed, cache)
+                self.search_index.update(updated, removed)
+                self.post_message(CookBookApp.RecipesChanged(updated, list(map(path_to_key, removed))))
+        finally:
+            watcher.close()
+
+    def on_unmount(self) -> None:
+        self.launcher.close()
+        self.run_history.close()
+
+    @on(RecipesChanged)
+    def recipes_changed(self, message: RecipesChanged) -> None:
+
+        self.recipe_data_dict.remove(message.removed)
+        self.duplicate_names.extend(self.recipe_data_dict.add(message.updated))
+        self.table_screen.apply_changes(message.updated, message.removed)
+        self.report_duplicates()
 
 def run_main() -> None:
     CookBookApp().run()
@@ -0,0 +1,90 @@
+"""Memory-mapped recipe files
+==========================
+
+Used by the code viewer for recipes too large to load into a TextArea.
+The file is memory-mapped and the start offset of every line is indexed
+once, so any line can be read without reading the lines before it. Only
+the pages that are actually viewed are ever read from disk.
+
+Editors that save by writing a new file and renaming it over the old one
+leave the mapping intact. Reading the mapping past the end of a file that
+was truncated in place would raise SIGBUS, so every read checks the file's
+current size first, and lines that are gone read as empty. Watch mode
+reopens the file when it changes.
+"""
+
+# python standard lib
+from __future__ import annotations
+from array import array
+from itertools import islice
+from operator import sub
+from pathlib import Path
+from typing import final
+import mmap
+import re
+
+NEWLINE = re.compile(b"\n")
+
+
+@final
+class MappedFile:
+    """A read-only memory-mapped text file with an index of line offsets.
+
+    Usage:
+        with MappedFile(path) as mapped:
+            mapped.line_count
+            mapped.lines(100, 150)
+    """
+
+    def __init__(self, path: Path) -> None:
+        self.path = path
+        with open(path, "rb") as f:
+            size = f.seek(0, 2)
+            # An empty file can't be mapped.
+            self._map: mmap.mmap | bytes = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) if size else b""
+
+        # offsets[i] is where line i starts, the last entry is the end of the file.
+        self.offsets = array("Q", [0])
+        self.offsets.extend(match.end() for match in NEWLINE.finditer(self._map))
+        if self.offsets[-1] != len(self._map):
+            self.offsets.append(len(self._map))
+        self.line_count = len(self.offsets) - 1
+        # Widest line in bytes (newline included), which is the width for ASCII.
+        self.max_line_length = max(map(sub, islice(self.offsets, 1, None), self.offsets), default=0)
+
+    def __enter__(self) -> MappedFile:
+        return self
+
+    def __exit__(self, *args: object) -> None:
+        self.close()
+
+    def line(self, line_index: int) -> str:
+        "Return line `line_index` (0-based) without its line ending."
+
+        end = self._readable(self.offsets[line_index + 1])
+        start = min(self.offsets[line_index], end)
+        return self._map[start:end].decode("utf-8", "replace").rstrip("\r\n")
+
+    def lines(self, start: int, end: int) -> list[str]:
+        "Return lines `start` to `end` (exclusive) without their line endings."
+
+        end = min(end, self.line_count)
+        if start >= end:
+            return []
+        end_offset = self._readable(self.offsets[end])
+        text = self._map[min(self.offsets[start], end_offset) : end_offset].decode("utf-8", "replace")
+        lines = [line.rstrip("\r") for line in text.split("\n")[: end - start]]
+        # Fewer if the file was truncated.
+        lines.extend([""] * (end - start - len(lines)))
+        return lines
+
+    def _readable(self, offset: int) -> int:
+        "`offset`, or the file's current size if it has been truncated to less since it was mapped."
+
+        if isinstance(self._map, mmap.mmap):
+            return min(offset, self._map.size())
+        return offset
+
+    def close(self) -> None:
+        if isinstance(self._map, mmap.mmap):
+            self._map.close()
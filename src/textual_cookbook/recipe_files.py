@@ -0,0 +1,128 @@
+"""Runnable recipe files
+=====================
+
+Recipes have to be run from a real file. Installed normally, that's the
+recipe in the package and it's used as is. When the cookbook is installed as
+a zip (a zipapp, or a zipped wheel on `sys.path`), `resources.as_file` would
+extract the recipe to a new temporary file on every run, which Python then
+compiles from scratch.
+
+Instead, each recipe is extracted once into the user cache directory, in a
+directory named after the hash of its content, and compiled to a `.pyc`
+next to it. Running the same recipe again finds both already there and runs
+the `.pyc`. A recipe that changes gets a new hash, so an entry never has to
+be checked against its source.
+
+Every run marks its entry as used. Entries that haven't been used for
+`PRUNE_AFTER_SECONDS` (old versions of changed recipes, recipes from older
+installs) are removed the first time a recipe is run in a session.
+"""
+
+# python standard lib
+from __future__ import annotations
+from typing import TYPE_CHECKING
+from collections.abc import Generator
+from contextlib import contextmanager
+from importlib import resources
+from pathlib import Path
+import hashlib
+import os
+import py_compile
+import shutil
+import sys
+import time
+
+# Local imports
+from textual_cookbook.recipe_index import get_cache_dir
+
+if TYPE_CHECKING:
+    from importlib.abc import Traversable
+
+PRUNE_AFTER_SECONDS = 14 * 24 * 60 * 60
+
+
+class RecipeFileCache:
+    """Content-addressed extraction and bytecode cache for recipes that aren't
+    files on disk.
+
+    Usage:
+        with cache.open(resources.files("textual_cookbook") / "recipes/...") as recipe_path:
+            launcher.run(recipe_path)
+    """
+
+    def __init__(self, cache_dir: Path | None = None) -> None:
+        cache_dir = cache_dir if cache_dir is not None else get_cache_dir()
+        self.root = cache_dir / "recipe_files"
+        self.pruned = False
+
+    @contextmanager
+    def open(self, recipe: Traversable) -> Generator[Path, None, None]:
+        """Give a real file to run `recipe` from. If the cache can't be written,
+        it falls back to `resources.as_file`."""
+
+        if isinstance(recipe, Path):
+            yield recipe
+            return
+        try:
+            recipe_path = self.extract(recipe)
+        except OSError:
+            with resources.as_file(recipe) as recipe_path:
+                yield recipe_path
+            return
+        yield recipe_path
+
+    def extract(self, recipe: Traversable) -> Path:
+        """Return the cached `.pyc` for `recipe`, extracting and compiling it if
+        this content hasn't been seen before. A recipe that doesn't compile
+        is returned as source, so running it shows the error as usual."""
+
+        if not self.pruned:
+            self.prune()
+        source = recipe.read_bytes()
+        entry = self.root / hashlib.sha256(source).hexdigest()[:32]
+        source_path = entry / recipe.name
+        # None on implementations without a bytecode cache (the stub says always a str).
+        cache_tag: str | None = getattr(sys.implementation, "cache_tag", None)
+        if cache_tag is None:
+            compiled_path = None
+        else:
+            compiled_path = entry / f"{source_path.stem}.{cache_tag}.pyc"
+            if compiled_path.exists():
+                os.utime(entry)
+                return compiled_path
+
+        if not source_path.exists():
+            entry.mkdir(parents=True, exist_ok=True)
+            tmp_path = source_path.with_suffix(f".{os.getpid()}.tmp")
+            tmp_path.write_bytes(source)
+            os.replace(tmp_path, source_path)
+        os.utime(entry)
+        if compiled_path is None:
+            return source_path
+        try:
+            # The source can't change under the same hash, so it's never checked.
+            py_compile.compile(
+                str(source_path),
+                cfile=str(compiled_path),
+                doraise=True,
+                invalidation_mode=py_compile.PycInvalidationMode.UNCHECKED_HASH,
+            )
+        except py_compile.PyCompileError:
+            return source_path
+        return compiled_path
+
+    def prune(self, max_age: float = PRUNE_AFTER_SECONDS) -> None:
+        "Remove entries that haven't been used for `max_age` seconds."
+
+        self.pruned = True
+        cutoff = time.time() - max_age
+        try:
+            entries = list(os.scandir(self.root))
+        except OSError:
+            return
+        for entry in entries:
+            try:
+                if entry.is_dir() and entry.stat().st_mtime < cutoff:
+                    shutil.rmtree(entry.path, ignore_errors=True)
+            except OSError:
+                pass
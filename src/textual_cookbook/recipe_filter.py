@@ -0,0 +1,199 @@
+"""Recipe filter
+=============
+
+The index behind the filter bar above the recipe table (`/` in the
+cookbook). It's updated as recipes are discovered or change, and answers
+each keystroke with the keys of the matching recipes.
+"""
+
+# python standard lib
+from __future__ import annotations
+from collections.abc import Iterable
+from bisect import bisect_right
+from collections import defaultdict, deque
+from functools import reduce
+from itertools import compress, repeat
+from operator import contains, sub
+
+# Local imports
+from textual_cookbook.recipe_index import RecipeCatalog, RecipeData, recipe_key
+
+
+class RecipeFilter:
+    """Case-insensitive filter over recipe name, category, author and description.
+    Every whitespace-separated term in the query has to match.
+
+    Scanning every description for every term costs ~15ms at 50k recipes, so
+    the filter keeps an index instead. A term has no whitespace, so it's in a
+    recipe's text exactly when it's in one of the recipe's whitespace-separated
+    tokens. Tokens in at least `COMMON_TOKEN_RECIPES` recipes (words like
+    "widget" or "the") get a bitset of their recipes, held in a Python int,
+    and a term is matched against those tokens only. The other tokens of a
+    recipe (its name, rare words) are kept in one short string per recipe.
+    A term that's in only a few of those is found in them joined together,
+    otherwise they're all checked in one pass. The results are combined with
+    int operations, so neither part has a Python loop over recipes. Typing
+    only changes one term, so the others are taken from the last query.
+
+    With a catalog, `category:<name>` and `author:<name>` terms match the
+    category or author exactly, through the catalog's lookups. Underscores
+    in an author term also match spaces."""
+
+    COMMON_TOKEN_RECIPES = 64
+    # New ids of common tokens are merged into their bitsets every this many
+    # recipes, or when a query needs them.
+    MERGE_EVERY = 4096
+    # Rare token matches found one by one in the joined rare strings, up to
+    # this many. Past it every recipe's rare string is checked in one pass.
+    RARE_FIND_LIMIT = 1000
+
+    def __init__(self, catalog: RecipeCatalog | None = None) -> None:
+        self._lookups = {"category": catalog.by_category, "author": catalog.by_author} if catalog is not None else {}
+        # By id. Removed and replaced ids are left out of _live.
+        self._keys: list[str] = []
+        self._rare_tokens: list[str] = []
+        self._ids: dict[str, int] = {}
+        self._live = 0
+        # Common token -> bitset of ids, and the ids it got since. Rare token -> ids,
+        # until it becomes common.
+        self._common: dict[str, int] = {}
+        self._pending: dict[str, list[int]] = defaultdict(list)
+        self._pending_from = 0
+        self._rare: dict[str, list[int]] = defaultdict(list)
+        # The rare strings joined by newlines, built by the first query after a
+        # change, and where each one starts in it (plus where the next one will).
+        self._rare_text: str | None = None
+        self._rare_starts = [0]
+        # Term -> bitset of its matches, for the terms of the last query.
+        self._last_terms: dict[str, int] = {}
+
+    def update(self, recipes: Iterable[RecipeData]) -> None:
+
+        first_id = len(self._keys)
+        common, pending, rare = self._common, self._pending, self._rare
+        batch_tokens: list[set[str]] = []
+        batch_rare: set[str] = set()
+        replaced: list[int] = []
+        for recipe_data in recipes:
+            key = recipe_key(recipe_data)
+            if key in self._ids:
+                replaced.append(self._ids[key])
+            recipe_id = self._ids[key] = len(self._keys)
+            fields = (recipe_data["name"], recipe_data["category"], recipe_data["author"], recipe_data["description"])
+            tokens = set(" ".join(fields).casefold().split())
+            rare_tokens = tokens.difference(common)
+            for token in tokens - rare_tokens:
+                pending[token].append(recipe_id)
+            for token in rare_tokens:
+                rare[token].append(recipe_id)
+            self._keys.append(key)
+            batch_tokens.append(tokens)
+            batch_rare |= rare_tokens
+        if not batch_tokens:
+            return
+        self._live |= self._bitset(range(first_id, len(self._keys)), first_id)
+        deque(map(self._drop, replaced), maxlen=0)
+        # Merging costs a pass over the token's bitset, so it's done for every
+        # token at once, and a query only ever merges the last few thousand ids.
+        if len(self._keys) - self._pending_from >= self.MERGE_EVERY:
+            deque(map(self._merge, list(pending)), maxlen=0)
+            self._pending_from = len(self._keys)
+        for token in batch_rare:
+            if len(rare[token]) >= self.COMMON_TOKEN_RECIPES:
+                common[token] = self._bitset(rare.pop(token))
+        # A token that just became common stays in the rare strings of earlier
+        # recipes, which only finds those recipes twice.
+        start = self._rare_starts[-1]
+        for tokens in batch_tokens:
+            rare_string = " ".join(tokens.difference(common))
+            self._rare_tokens.append(rare_string)
+            start += len(rare_string) + 1
+            self._rare_starts.append(start)
+        self._rare_text = None
+        self._last_terms = {}
+
+    def remove(self, keys: Iterable[str]) -> None:
+
+        for key in keys:
+            recipe_id = self._ids.pop(key, None)
+            if recipe_id is not None:
+                self._drop(recipe_id)
+        self._last_terms = {}
+
+    def _drop(self, recipe_id: int) -> None:
+        # The id stays in the index, it's never in _live again.
+        self._live &= ~(1 << recipe_id)
+
+    def _merge(self, token: str) -> None:
+
+        recipe_ids = self._pending.pop(token)
+        self._common[token] |= self._bitset(recipe_ids, recipe_ids[0])
+
+    def _bitset(self, recipe_ids: Iterable[int], first_id: int = 0) -> int:
+        "Return the bitset of `recipe_ids`, which are all at least `first_id`."
+
+        flags = bytearray(len(self._keys) - first_id)
+        if first_id:
+            recipe_ids = map(sub, recipe_ids, repeat(first_id))
+        deque(map(flags.__setitem__, recipe_ids, repeat(1)), maxlen=0)
+        return self._flags_bitset(flags) << first_id
+
+    @staticmethod
+    def _flags_bitset(flags: bytes | bytearray) -> int:
+        "Return the bitset of a sequence of 0 / 1 bytes, one per id."
+        return int(flags[::-1].translate(_FLAG_DIGITS), 2) if flags else 0
+
+    def _search(self, term: str) -> int:
+        "Return the bitset of the recipes that have `term` in one of their tokens."
+
+        common = self._common
+        tokens = list(compress(common, map(contains, common, repeat(term))))
+        deque(map(self._merge, filter(self._pending.__contains__, tokens)), maxlen=0)
+        bitset = reduce(int.__or__, map(common.__getitem__, tokens), 0)
+        return bitset | self._search_rare(term)
+
+    def _search_rare(self, term: str) -> int:
+
+        if self._rare_text is None:
+            self._rare_text = "\n".join(self._rare_tokens)
+        text, starts = self._rare_text, self._rare_starts
+        if text.count(term) > self.RARE_FIND_LIMIT:
+            return self._flags_bitset(bytes(map(contains, self._rare_tokens, repeat(term))))
+        recipe_ids: list[int] = []
+        position = text.find(term)
+        while position >= 0:
+            recipe_id = bisect_right(starts, position) - 1
+            recipe_ids.append(recipe_id)
+            # A term can't span lines, so go on from the next recipe's line.
+            position = text.find(term, starts[recipe_id + 1])
+        return self._bitset(recipe_ids)
+
+    def _lookup(self, term: str) -> int:
+
+        field, _, value = term.partition(":")
+        lookup = self._lookups[field]
+        keys = lookup.get(value, set()) | lookup.get(value.replace("_", " "), set())
+        return self._bitset([self._ids[key] for key in keys if key in self._ids])
+
+    def match(self, query: str) -> set[str] | None:
+        "Return the keys of the matching recipes, or None if the query is empty."
+
+        terms = query.casefold().split()
+        if not terms:
+            return None
+
+        last_terms, self._last_terms = self._last_terms, {}
+        matches = self._live
+        for term in set(terms):
+            bitset = last_terms.get(term)
+            if bitset is None:
+                bitset = self._lookup(term) if term.partition(":")[0] in self._lookups else self._search(term)
+            self._last_terms[term] = bitset
+            matches &= bitset
+        # One byte per id, 1 for a match, so compress can pick the keys.
+        flags = bin(matches)[:1:-1].encode().translate(_DIGIT_FLAGS)
+        return set(compress(self._keys, flags))
+
+
+_FLAG_DIGITS = bytes.maketrans(b"\x00\x01", b"01")
+_DIGIT_FLAGS = bytes.maketrans(b"01", b"\x00\x01")
@@ -0,0 +1,140 @@
+"""Fuzzy recipe finder
+===================
+
+The index behind the fuzzy finder (`f` in the cookbook), which matches
+recipe keys against any characters of them typed in order. Queries are
+answered from a thread worker, while the scan adds recipes.
+"""
+
+# python standard lib
+from __future__ import annotations
+from collections.abc import Iterable
+from itertools import compress, filterfalse, islice, repeat
+from collections import Counter, defaultdict
+from heapq import nlargest
+import re
+import threading
+
+# Textual imports
+from textual.fuzzy import Matcher
+from textual.content import Content
+from textual.style import Style
+
+
+def _trigrams(text: str) -> set[str]:
+    return {text[i : i + 3] for i in range(len(text) - 2)}
+
+
+def _char_mask(text: str) -> int:
+    # One bit per character. Anything that isn't a lowercase letter, digit
+    # or underscore shares a bit with others, which only lets more names through.
+    return sum(1 << bit for bit in {_CHAR_BITS.get(char, 37) for char in text})
+
+
+_CHAR_BITS = {char: bit for bit, char in enumerate("abcdefghijklmnopqrstuvwxyz0123456789_")}
+
+
+class RecipeFinder:
+    """Fuzzy search over recipe keys (`category/name`), scored and highlighted
+    by `textual.fuzzy.Matcher`.
+
+    Matcher is too slow to run over every name on every keystroke, so the
+    names are narrowed first. A bitmask of each name's characters rules out
+    names missing a character of the query, and a compiled regex keeps the
+    names that contain the query as a subsequence, which are exactly the
+    ones Matcher would match. If there are still more than `max_candidates`,
+    the ones sharing the most trigrams with the query are scored. When a
+    query extends the previous one only the previous matches are checked.
+    The finder can be queried from a thread while recipes are added.
+    """
+
+    def __init__(self, max_candidates: int = 200) -> None:
+        self.max_candidates = max_candidates
+        self._names: list[str] = []
+        self._masks: list[int] = []  # 0 for removed names, which no query matches
+        self._ids: dict[str, int] = {}
+        self._trigrams: dict[str, list[int]] = defaultdict(list)
+        self._last_query = ""
+        self._last_candidates: list[int] | None = None
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._ids)
+
+    def update(self, recipe_names: Iterable[str]) -> None:
+
+        postings = self._trigrams
+        with self._lock:
+            for recipe_name in recipe_names:
+                if recipe_name in self._ids:
+                    continue
+                recipe_id = self._ids[recipe_name] = len(self._names)
+                folded = recipe_name.casefold()
+                self._names.append(recipe_name)
+                self._masks.append(_char_mask(folded))
+                for trigram in _trigrams(folded):
+                    postings[trigram].append(recipe_id)
+            self._last_candidates = None
+
+    def remove(self, recipe_names: Iterable[str]) -> None:
+
+        # The trigram postings keep the stale ids, they never pass the mask check.
+        with self._lock:
+            for recipe_name in recipe_names:
+                recipe_id = self._ids.pop(recipe_name, None)
+                if recipe_id is not None:
+                    self._masks[recipe_id] = 0
+            self._last_candidates = None
+
+    def candidates(self, query: str) -> list[str]:
+        "Return the names that match `query`, likeliest first, at most `max_candidates` of them."
+
+        with self._lock:
+            return self._candidates(query)[0]
+
+    def _candidates(self, query: str) -> tuple[list[str], int]:
+        # Also returns how many names match in all, before the cut to max_candidates.
+
+        query = query.casefold()
+        query_mask = _char_mask(query)
+        if self._last_candidates is not None and self._last_query and query.startswith(self._last_query):
+            ids: Iterable[int] = self._last_candidates
+            masks: Iterable[int] = map(self._masks.__getitem__, self._last_candidates)
+        else:
+            ids, masks = range(len(self._masks)), self._masks
+        ids = list(compress(ids, map(int.__eq__, map(int.__and__, masks, repeat(query_mask)), repeat(query_mask))))
+        # The same test FuzzySearch bails out with, compiled once instead of per name.
+        pattern = re.compile(".*?".join(map(re.escape, query)), re.IGNORECASE)
+        ids = list(compress(ids, map(pattern.search, map(self._names.__getitem__, ids))))
+        self._last_query, self._last_candidates = query, ids
+        total = len(ids)
+
+        limit = self.max_candidates
+        query_trigrams = _trigrams(query)
+        if query_trigrams and len(ids) > limit:
+            shared: Counter[int] = Counter()
+            for trigram in query_trigrams:
+                shared.update(self._trigrams.get(trigram, ()))
+            likely = sorted(shared.keys() & set(ids), key=shared.__getitem__, reverse=True)[:limit]
+            if len(likely) < limit:
+                likely_set = set(likely)
+                likely.extend(islice(filterfalse(likely_set.__contains__, ids), limit - len(likely)))
+            ids = likely
+        return [self._names[recipe_id] for recipe_id in ids[:limit]], total
+
+    def match(self, query: str, limit: int = 100) -> list[tuple[float, str, Content]]:
+        "Return up to `limit` (score, name, highlighted name) tuples, best first."
+        return self.find(query, limit)[0]
+
+    def find(self, query: str, limit: int = 100) -> tuple[list[tuple[float, str, Content]], int]:
+        "Like `match`, and also return how many names match in all."
+
+        if not query.strip():
+            return [], 0
+        with self._lock:
+            candidates, total = self._candidates(query)
+        matcher = Matcher(query, match_style=Style(underline=True))
+        scored = [(score, name) for score, name in zip(map(matcher.match, candidates), candidates) if score]
+        top = nlargest(limit, scored, key=lambda item: item[0])
+        top.sort(key=lambda item: (-item[0], item[1]))
+        return [(score, recipe_name, matcher.highlight(recipe_name)) for score, recipe_name in top], total
@@ -0,0 +1,687 @@
+"""Recipe discovery and the persistent recipe index
+=================================================
+
+Scanning the recipes directory means reading every recipe and parsing it with
+`ast` to pull out its docstring, author, Textual imports, App subclass and
+the widgets it uses. Only that metadata is kept,
+recipe source is loaded on demand through `RecipeSourceCache`.
+
+Metadata comes from three places, cheapest first:
+
+1. The index file in the user cache directory, keyed by the recipe path and
+   validated against its mtime, size and content hash.
+2. The recipe manifest, generated at build time and shipped inside the wheel.
+   Installed files don't keep their build mtime, so a manifest entry is only
+   used once the file's content hash matches it. The file is read to hash it,
+   but not parsed, and the index remembers it from then on.
+3. Reading and parsing the file. Files that do need to be read are spread
+   over a process pool when there are enough of them.
+
+When nothing changed, a start only has to `stat` the recipe files.
+
+Recipes are the `.py` files in the category directories, one level below the
+recipes directory (see `list_recipe_files`). Files further down, or in the
+recipes directory itself, aren't recipes. Recipes are keyed by
+`category/name` (see `recipe_key`), as two categories can each have a recipe
+with the same file name. `RecipeCatalog` holds the
+scanned recipes with lookups by name, category and author.
+"""
+
+# python standard lib
+from __future__ import annotations
+from typing import TypedDict, Any
+from collections.abc import Iterable, Iterator
+from collections import OrderedDict, defaultdict
+from concurrent.futures import ProcessPoolExecutor
+import ast
+import hashlib
+import json
+import math
+import multiprocessing
+import os
+import re
+import threading
+from pathlib import Path
+from importlib import resources
+
+# Third party
+from platformdirs import user_cache_dir
+
+INDEX_VERSION = 4
+WIDGET_MODULES = ("textual.widgets", "textual.containers")
+CACHE_DIR_ENV = "TEXTUAL_COOKBOOK_CACHE_DIR"
+MANIFEST_NAME = "recipes_manifest.json"
+
+# Below this many files to read, starting worker processes costs more than it saves.
+PARALLEL_THRESHOLD = 200
+# Recipes per streamed batch. Small enough that the first rows show up quickly.
+BATCH_SIZE = 100
+DEFAULT_SOURCE_CACHE_BYTES = 8 * 1024 * 1024
+
+
+class RecipeData(TypedDict):
+    name: str
+    category: str
+    author: str
+    description: str
+    path: str  # relative to the recipes directory
+    line_count: int
+    app_class: str  # empty if no App subclass was found
+    textual_apis: list[str]  # e.g. "textual.widgets.DataTable"
+    widgets: list[str]  # widget and container classes the recipe uses
+
+
+class IndexEntry(TypedDict):
+    mtime_ns: int
+    size: int
+    sha256: str
+    recipe: RecipeData
+
+
+class ManifestEntry(TypedDict):
+    size: int
+    sha256: str
+    recipe: RecipeData
+
+
+def get_cache_dir() -> Path:
+    """Return the cookbook cache directory. Can be overridden with the
+    `TEXTUAL_COOKBOOK_CACHE_DIR` environment variable."""
+
+    override = os.environ.get(CACHE_DIR_ENV)
+    if override:
+        return Path(override)
+    return Path(user_cache_dir("textual-cookbook", appauthor=False))
+
+
+def get_recipes_dir() -> Path:
+
+    # Start with Traversable then convert to Path for easier handling
+    recipes_traversable = resources.files("textual_cookbook").joinpath("recipes")
+    return Path(str(recipes_traversable))
+
+
+class _RecipeVisitor(ast.NodeVisitor):
+    "Collects the Textual imports, referenced names and App subclass of a recipe in a single walk."
+
+    def __init__(self) -> None:
+        self.textual_apis: list[str] = []
+        self.widget_imports: list[str] = []
+        self.names: set[str] = set()
+        self.app_class = ""
+        self.app_bases = {"App"}
+
+    def visit_Import(self, node: ast.Import) -> None:
+
+        for alias in node.names:
+            if alias.name.split(".")[0] == "textual":
+                self.textual_apis.append(alias.name)
+
+    def visit_ImportFrom(self, node: ast.ImportFrom) -> None:
+
+        module = node.module or ""
+        if module.split(".")[0] != "textual":
+            return
+        for alias in node.names:
+            self.textual_apis.append(f"{module}.{alias.name}")
+            if module.startswith(WIDGET_MODULES):
+                self.widget_imports.append(alias.asname or alias.name)
+
+    def visit_ClassDef(self, node: ast.ClassDef) -> None:
+
+        base_names = {_base_name(base) for base in node.bases}
+        # Also catches an App subclass that inherits from another App subclass in the same file.
+        if base_names & self.app_bases:
+            self.app_bases.add(node.name)
+            if not self.app_class:
+                self.app_class = node.name
+        self.generic_visit(node)
+
+    def visit_Name(self, node: ast.Name) -> None:
+        self.names.add(node.id)
+
+    def visit_Attribute(self, node: ast.Attribute) -> None:
+        # `widgets.Button` style access counts as using the widget.
+        self.names.add(node.attr)
+        self.generic_visit(node)
+
+
+def _base_name(node: ast.expr) -> str:
+
+    if isinstance(node, ast.Name):
+        return node.id
+    if isinstance(node, ast.Attribute):
+        return node.attr
+    if isinstance(node, ast.Subscript):  # App[None]
+        return _base_name(node.value)
+    return ""
+
+
+def _find_author(text: str) -> str | None:
+
+    author_match = re.search(r"Recipe by (.+)", text)
+    if author_match:
+        return author_match.group(1).strip().replace('"', "")
+    return None
+
+
+def extract_recipe_data(recipe_file: Path, text_blob: str) -> RecipeData:
+    """Parse a recipe once with `ast` and pull out its metadata.
+
+    The description is the module docstring (any quote style), and the author
+    comes from the `Recipe by ...` line in it. Recipes that don't parse fall
+    back to searching the raw text.
+    """
+
+    try:
+        tree = ast.parse(text_blob, filename=str(recipe_file))
+    except (SyntaxError, ValueError):
+        return _extract_recipe_data_from_text(recipe_file, text_blob)
+
+    docstring = ast.get_docstring(tree)
+    visitor = _RecipeVisitor()
+    visitor.visit(tree)
+
+    return {
+        "name": recipe_file.stem,
+        "category": recipe_file.parent.name,
+        "author": (docstring and _find_author(docstring)) or _find_author(text_blob) or "Unknown",
+        "description": docstring.strip() if docstring else "No description available.",
+        "path": f"{recipe_file.parent.name}/{recipe_file.name}",
+        "line_count": len(text_blob.splitlines()),
+        "app_class": visitor.app_class,
+        "textual_apis": visitor.textual_apis,
+        "widgets": [name for name in visitor.widget_imports if name in visitor.names],
+    }
+
+
+def _extract_recipe_data_from_text(recipe_file: Path, text_blob: str) -> RecipeData:
+
+    description_match = re.match(r'"""(.*?)"""', text_blob, re.DOTALL)
+    if description_match:
+        description = description_match.group(1).strip()
+    else:
+        description = "No description available."
+
+    return {
+        "name": recipe_file.stem,
+        "category": recipe_file.parent.name,
+        "author": _find_author(text_blob) or "Unknown",
+        "description": description,
+        "path": f"{recipe_file.parent.name}/{recipe_file.name}",
+        "line_count": len(text_blob.splitlines()),
+        "app_class": "",
+        "textual_apis": [],
+        "widgets": [],
+    }
+
+
+def read_recipe(recipe_file: Path) -> bytes:
+    "Return the raw bytes of a recipe file, for hashing before it's decoded."
+    with open(recipe_file, "rb") as f:
+        return f.read()
+
+
+def decode_recipe(raw: bytes) -> str:
+    "Decode a recipe read by `read_recipe`, with the newline handling of text mode."
+    return raw.decode("utf-8").replace("\r\n", "\n").replace("\r", "\n")
+
+
+def list_recipe_files(recipes_dir: Path) -> Iterator[Path]:
+    "Every recipe file: the `.py` files in the category directories, and no deeper."
+    return recipes_dir.glob("*/*.py")
+
+
+def recipe_key(recipe_data: RecipeData) -> str:
+    "Return the recipe's key, `category/name`. Unlike the name, it's unique."
+    return f"{recipe_data['category']}/{recipe_data['name']}"
+
+
+def path_to_key(rel_path: str) -> str:
+    "Return the key of the recipe at `rel_path` (relative to the recipes directory)."
+    return rel_path.removesuffix(".py")
+
+
+class RecipeCatalog(dict[str, RecipeData]):
+    """The scanned recipes keyed by `recipe_key`, with lookups by name (the
+    file stem), category and author. Category and author lookups are
+    case-insensitive. Use `add` and `remove` to change it, which keep the
+    lookups in sync.
+
+    Usage:
+        catalog = RecipeCatalog()
+        catalog.add(recipes)
+        catalog.resolve("spin")      # ["animation_effects/spin"]
+        catalog.by_author["test author"]
+    """
+
+    def __init__(self) -> None:
+        super().__init__()
+        self.by_name: defaultdict[str, set[str]] = defaultdict(set)
+        self.by_category: defaultdict[str, set[str]] = defaultdict(set)
+        self.by_author: defaultdict[str, set[str]] = defaultdict(set)
+
+    def _lookups(self, recipe_data: RecipeData) -> list[tuple[defaultdict[str, set[str]], str]]:
+        return [
+            (self.by_name, recipe_data["name"]),
+            (self.by_category, recipe_data["category"].casefold()),
+            (self.by_author, recipe_data["author"].casefold()),
+        ]
+
+    def add(self, recipes: Iterable[RecipeData]) -> list[str]:
+        """Add or replace recipes.
+
+        Returns:
+            The names that are now used by more than one recipe and weren't before.
+        """
+
+        duplicates: list[str] = []
+        for recipe_data in recipes:
+            key = recipe_key(recipe_data)
+            replacing = key in self
+            if replacing:
+                self.remove([key])
+            self[key] = recipe_data
+            for lookup, value in self._lookups(recipe_data):
+                lookup[value].add(key)
+            if not replacing and len(self.by_name[recipe_data["name"]]) == 2:
+                duplicates.append(recipe_data["name"])
+        return duplicates
+
+    def remove(self, keys: Iterable[str]) -> None:
+
+        for key in keys:
+            recipe_data = self.pop(key, None)
+            if recipe_data is None:
+                continue
+            for lookup, value in self._lookups(recipe_data):
+                lookup[value].discard(key)
+                if not lookup[value]:
+                    del lookup[value]
+
+    def resolve(self, name: str) -> list[str]:
+        "Return the keys of the recipes `name` refers to, either a key or a bare recipe name."
+
+        if name in self:
+            return [name]
+        return sorted(self.by_name.get(name, ()))
+
+    def duplicates(self) -> dict[str, list[str]]:
+        "Return the names used by more than one recipe, with their keys."
+        return {name: sorted(keys) for name, keys in self.by_name.items() if len(keys) > 1}
+
+
+class RecipeSourceCache:
+    """Loads recipe source on demand and keeps recently viewed recipes in an
+    LRU cache bounded by their total size in bytes.
+
+    Entries are checked against the file's mtime and size, so an edited
+    recipe is never served stale. The code viewer's prefetcher loads
+    sources from a thread, so the cache is guarded by a lock.
+    """
+
+    def __init__(self, recipes_dir: Path, max_bytes: int = DEFAULT_SOURCE_CACHE_BYTES) -> None:
+        self.recipes_dir = recipes_dir
+        self.max_bytes = max_bytes
+        self.current_bytes = 0
+        self._entries: OrderedDict[str, tuple[int, int, str]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, recipe_data: RecipeData) -> str:
+
+        rel_path = recipe_data["path"]
+        recipe_file = self.recipes_dir / rel_path
+        stat = recipe_file.stat()
+        with self._lock:
+            entry = self._entries.get(rel_path)
+            if entry is not None:
+                mtime_ns, size, text_blob = entry
+                if mtime_ns == stat.st_mtime_ns and size == stat.st_size:
+                    self._entries.move_to_end(rel_path)
+                    return text_blob
+                self._discard(rel_path)
+
+        text_blob = decode_recipe(read_recipe(recipe_file))
+        if stat.st_size <= self.max_bytes:
+            with self._lock:
+                if rel_path in self._entries:
+                    self._discard(rel_path)
+                self._entries[rel_path] = (stat.st_mtime_ns, stat.st_size, text_blob)
+                self.current_bytes += stat.st_size
+                while self.current_bytes > self.max_bytes:
+                    self._discard(next(iter(self._entries)))
+        return text_blob
+
+    def _discard(self, rel_path: str) -> None:
+
+        _, size, _ = self._entries.pop(rel_path)
+        self.current_bytes -= size
+
+
+class RecipeIndexCache:
+    """Persistent index of recipe metadata for one recipes directory.
+
+    Entries are keyed by the recipe path relative to the recipes directory.
+    An entry is reused without reading the file when the mtime and size
+    still match. If those changed but the content hash did not (e.g. the
+    file was touched or re-installed), the metadata is reused as well.
+    """
+
+    def __init__(self, recipes_dir: Path, cache_dir: Path | None = None) -> None:
+        self.recipes_dir = recipes_dir
+        cache_dir = cache_dir if cache_dir is not None else get_cache_dir()
+        # One index file per recipes directory, so several installs
+        # (or a dev checkout next to an installed copy) don't fight.
+        dir_hash = hashlib.sha1(str(recipes_dir.resolve()).encode()).hexdigest()[:12]
+        self.cache_path = cache_dir / f"recipe_index-{dir_hash}.json"
+        self.entries: dict[str, IndexEntry] = {}
+        self.loaded = False
+        self.dirty = False
+
+    def load(self) -> None:
+        "Read the index file. Called on first use."
+
+        if self.loaded:
+            return
+        self.loaded = True
+        try:
+            with open(self.cache_path, "r", encoding="utf-8") as f:
+                data: dict[str, Any] = json.load(f)
+        except (OSError, ValueError):
+            return
+        if data.get("version") != INDEX_VERSION:
+            self.dirty = True
+            return
+        self.entries = data.get("entries", {})
+
+    def save(self) -> None:
+        """Write the index atomically. Does nothing if no entry changed.
+        A cache that can't be written is not an error, the next start
+        will simply scan again."""
+
+        if not self.dirty:
+            return
+        data = {"version": INDEX_VERSION, "entries": self.entries}
+        tmp_path = self.cache_path.with_suffix(f".{os.getpid()}.tmp")
+        try:
+            self.cache_path.parent.mkdir(parents=True, exist_ok=True)
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(data, f, separators=(",", ":"))
+            os.replace(tmp_path, self.cache_path)
+        except OSError:
+            tmp_path.unlink(missing_ok=True)
+            return
+        self.dirty = False
+
+    def lookup(self, rel_path: str, stat: os.stat_result) -> RecipeData | None:
+        "Return the indexed recipe data if the file's mtime and size still match."
+
+        self.load()
+        entry = self.entries.get(rel_path)
+        if entry and entry["mtime_ns"] == stat.st_mtime_ns and entry["size"] == stat.st_size:
+            return entry["recipe"]
+        return None
+
+    def known(self, rel_path: str) -> tuple[str, RecipeData] | None:
+        "Return the last known content hash of a recipe and its metadata, whatever its mtime."
+
+        self.load()
+        entry = self.entries.get(rel_path)
+        return (entry["sha256"], entry["recipe"]) if entry else None
+
+    def store(
+        self,
+        rel_path: str,
+        stat: os.stat_result,
+        sha256: str,
+        recipe_data: RecipeData | None,
+    ) -> RecipeData:
+        """Record a freshly read recipe. If `recipe_data` is None the content
+        hash matched the existing entry and its metadata is kept."""
+
+        if recipe_data is None:
+            recipe_data = self.entries[rel_path]["recipe"]
+        self.entries[rel_path] = {
+            "mtime_ns": stat.st_mtime_ns,
+            "size": stat.st_size,
+            "sha256": sha256,
+            "recipe": recipe_data,
+        }
+        self.dirty = True
+        return recipe_data
+
+    def discard(self, rel_path: str) -> None:
+
+        self.load()
+        if self.entries.pop(rel_path, None) is not None:
+            self.dirty = True
+
+    def prune(self, seen: set[str]) -> None:
+        "Drop entries for recipes that no longer exist."
+
+        if not self.loaded:
+            return
+        stale = self.entries.keys() - seen
+        for rel_path in stale:
+            del self.entries[rel_path]
+        if stale:
+            self.dirty = True
+
+
+def _load_recipe_batch(batch: list[tuple[Path, str | None]]) -> list[tuple[str, RecipeData | None]]:
+    """Read and extract a batch of recipes. Runs inside the worker processes.
+
+    Returns the content hash of each file, and its recipe data. The recipe data
+    is None when the hash matches the known hash, as there is nothing to extract.
+    """
+
+    results: list[tuple[str, RecipeData | None]] = []
+    for recipe_file, known_sha256 in batch:
+        raw = read_recipe(recipe_file)
+        sha256 = hashlib.sha256(raw).hexdigest()
+        if sha256 == known_sha256:
+            results.append((sha256, None))
+        else:
+            results.append((sha256, extract_recipe_data(recipe_file, decode_recipe(raw))))
+    return results
+
+
+def load_recipes(
+    pending: list[tuple[Path, str | None]],
+    max_workers: int | None = None,
+) -> Iterator[tuple[str, RecipeData | None]]:
+    """Read and extract recipes, fanned out over a process pool when there are
+    enough of them to be worth the pool startup cost. Results are yielded in
+    the same order as `pending`.
+
+    Args:
+        pending: Recipe files to load, with their last known content hash (if any).
+        max_workers: Number of worker processes. Defaults to the number of CPUs.
+            1 or less loads everything in the calling thread.
+    """
+
+    workers = max_workers if max_workers is not None else (os.cpu_count() or 1)
+    if workers <= 1 or len(pending) < PARALLEL_THRESHOLD:
+        yield from _load_recipe_batch(pending)
+        return
+
+    # Several batches per worker keeps the pool busy when file sizes are uneven.
+    batch_size = max(1, math.ceil(len(pending) / (workers * 4)))
+    batches = [pending[i : i + batch_size] for i in range(0, len(pending), batch_size)]
+
+    # Spawn rather than fork: the scan runs in a thread of a live Textual app.
+    context = multiprocessing.get_context("spawn")
+    with ProcessPoolExecutor(max_workers=workers, mp_context=context) as executor:
+        for results in executor.map(_load_recipe_batch, batches):
+            yield from results
+
+
+def build_manifest(recipes_dir: Path, max_workers: int | None = None) -> dict[str, ManifestEntry]:
+    "Read every recipe and return the manifest entries, keyed by path relative to `recipes_dir`."
+
+    recipe_files = sorted(list_recipe_files(recipes_dir))
+    loaded = load_recipes([(recipe_file, None) for recipe_file in recipe_files], max_workers)
+    manifest: dict[str, ManifestEntry] = {}
+    for recipe_file, (sha256, recipe_data) in zip(recipe_files, loaded):
+        assert recipe_data is not None
+        manifest[recipe_file.relative_to(recipes_dir).as_posix()] = {
+            "size": recipe_file.stat().st_size,
+            "sha256": sha256,
+            "recipe": recipe_data,
+        }
+    return manifest
+
+
+def write_manifest(recipes_dir: Path, manifest_path: Path) -> int:
+    """Generate the recipe manifest and write it to `manifest_path`. This runs at
+    build time (see `just manifest`), the file then ships as package data.
+
+    Returns:
+        The number of recipes in the manifest.
+    """
+
+    manifest = build_manifest(recipes_dir)
+    with open(manifest_path, "w", encoding="utf-8") as f:
+        json.dump({"version": INDEX_VERSION, "entries": manifest}, f, separators=(",", ":"))
+    return len(manifest)
+
+
+def load_manifest(manifest_path: Path) -> dict[str, ManifestEntry]:
+    "Load a recipe manifest. Missing or outdated manifests are treated as empty."
+
+    try:
+        with open(manifest_path, "r", encoding="utf-8") as f:
+            data: dict[str, Any] = json.load(f)
+    except (OSError, ValueError):
+        return {}
+    if data.get("version") != INDEX_VERSION:
+        return {}
+    return data.get("entries", {})
+
+
+def iter_recipe_batches(
+    recipes_dir: Path,
+    cache: RecipeIndexCache | None = None,
+    max_workers: int | None = None,
+    batch_size: int = BATCH_SIZE,
+    manifest_path: Path | None = None,
+) -> Iterator[list[RecipeData]]:
+    """Scan the recipes directory, yielding recipe data in batches as it is found.
+
+    Recipes still valid in the index are yielded while the tree is being
+    walked. Recipes that have to be read follow once they come back from
+    `load_recipes`: those whose hash matches the manifest (or the index) are
+    only hashed, those added or changed since the manifest was built are
+    parsed as well. The index is pruned and saved after the last batch.
+    This is blocking, the app runs it in a thread worker.
+
+    Args:
+        recipes_dir: The directory containing the recipe categories.
+        cache: Index cache to validate against. If None, every file is read.
+        max_workers: Passed on to `load_recipes` for the files that need reading.
+        batch_size: Maximum number of recipes per batch.
+        manifest_path: Build-time manifest to serve recipes from, if it exists.
+    """
+
+    manifest = load_manifest(manifest_path) if manifest_path is not None else {}
+
+    batch: list[RecipeData] = []
+    # The recipe data that goes with the known hash of each file to load, if any.
+    pending: list[tuple[str, os.stat_result, RecipeData | None]] = []
+    to_load: list[tuple[Path, str | None]] = []
+    seen: set[str] = set()
+
+    for recipe_file in list_recipe_files(recipes_dir):
+        rel_path = recipe_file.relative_to(recipes_dir).as_posix()
+        stat = recipe_file.stat()
+        seen.add(rel_path)
+        recipe_data = cache.lookup(rel_path, stat) if cache is not None else None
+        if recipe_data is None:
+            manifest_entry = manifest.get(rel_path)
+            known: tuple[str, RecipeData] | None
+            if manifest_entry is not None and manifest_entry["size"] == stat.st_size:
+                known = (manifest_entry["sha256"], manifest_entry["recipe"])
+            else:
+                known = cache.known(rel_path) if cache is not None else None
+            pending.append((rel_path, stat, known[1] if known else None))
+            to_load.append((recipe_file, known[0] if known else None))
+            continue
+        batch.append(recipe_data)
+        if len(batch) >= batch_size:
+            yield batch
+            batch = []
+
+    loaded = load_recipes(to_load, max_workers)
+    for (rel_path, stat, known_recipe), (sha256, recipe_data) in zip(pending, loaded):
+        # No recipe data means the hash matched, so the known metadata still holds.
+        recipe_data = recipe_data if recipe_data is not None else known_recipe
+        assert recipe_data is not None
+        if cache is not None:
+            cache.store(rel_path, stat, sha256, recipe_data)
+        batch.append(recipe_data)
+        if len(batch) >= batch_size:
+            yield batch
+            batch = []
+
+    if batch:
+        yield batch
+
+    if cache is not None:
+        cache.prune(seen)
+        cache.save()
+
+
+def scan_recipes(
+    recipes_dir: Path,
+    cache: RecipeIndexCache | None = None,
+    max_workers: int | None = None,
+    manifest_path: Path | None = None,
+) -> RecipeCatalog:
+    """Scan the whole recipes directory and return the recipes in a catalog.
+    Names used in more than one category are in `catalog.duplicates()`.
+    See `iter_recipe_batches` for the arguments."""
+
+    catalog = RecipeCatalog()
+    for batch in iter_recipe_batches(recipes_dir, cache, max_workers, manifest_path=manifest_path):
+        catalog.add(batch)
+    return catalog
+
+
+def rescan_recipes(
+    recipes_dir: Path,
+    rel_paths: Iterable[str],
+    cache: RecipeIndexCache,
+) -> tuple[list[RecipeData], list[str]]:
+    """Re-check only the given recipes, e.g. the ones a watcher reported.
+
+    A recipe that can't be read (usually because it was deleted again before
+    it was read) or isn't UTF-8 is reported as removed, since it can't be
+    shown or run. It comes back once it can be read.
+
+    Returns:
+        The recipe data of recipes that were added or changed, and the paths
+        (relative to `recipes_dir`) of recipes that no longer exist.
+    """
+
+    updated: list[RecipeData] = []
+    removed: list[str] = []
+    for rel_path in sorted(rel_paths):
+        recipe_file = recipes_dir / rel_path
+        try:
+            stat = recipe_file.stat()
+            recipe_data = cache.lookup(rel_path, stat)
+            if recipe_data is None:
+                known = cache.known(rel_path)
+                [(sha256, loaded)] = _load_recipe_batch([(recipe_file, known[0] if known else None)])
+                recipe_data = cache.store(rel_path, stat, sha256, loaded)
+        except (OSError, UnicodeDecodeError):
+            removed.append(rel_path)
+            cache.discard(rel_path)
+            continue
+        updated.append(recipe_data)
+
+    cache.save()
+    return updated, removed
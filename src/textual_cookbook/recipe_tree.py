@@ -0,0 +1,134 @@
+"""Grouped recipe view
+===================
+
+`RecipeTree` shows the recipes grouped by category (`g` in the cookbook).
+TableScreen keeps it in step with the table: the same recipes, the same
+filter, and the same live changes in watch mode.
+"""
+
+# python standard lib
+from __future__ import annotations
+from typing import Any
+from collections.abc import Iterable
+from collections import defaultdict
+
+# Textual imports
+from textual import on
+from textual.widgets import Tree
+from textual.widgets.tree import TreeNode
+from rich.text import Text
+
+# Local imports
+from textual_cookbook.recipe_index import RecipeData, recipe_key
+
+
+class RecipeTree(Tree[str]):
+    """The recipes grouped by category, shown instead of the table in grouped
+    mode. Categories are collapsible nodes labelled with their recipe count.
+    A category's recipe nodes are only created when it's expanded and are
+    removed again when it collapses, so the size of the tree follows what's
+    open, not the number of recipes. Category nodes hold the category name
+    as their data, recipe nodes the recipe key."""
+
+    def __init__(self, **kwargs: Any) -> None:
+        super().__init__("Recipes", **kwargs)
+        self.show_root = False
+        self.guide_depth = 2
+        self.category_members: defaultdict[str, set[str]] = defaultdict(set)
+        self.recipe_categories: dict[str, str] = {}
+        self.category_nodes: dict[str, TreeNode[str]] = {}
+        # Categories that currently have their recipe nodes.
+        self.materialized: set[str] = set()
+        self.shown_recipes: set[str] | None = None
+
+    def add_recipes(self, recipes: Iterable[RecipeData]) -> None:
+        self.apply_changes(recipes, [])
+
+    def apply_changes(self, updated: Iterable[RecipeData], removed: Iterable[str]) -> None:
+
+        changed: set[str] = set()
+        for key in removed:
+            category = self.recipe_categories.pop(key, None)
+            if category is not None:
+                self.category_members[category].discard(key)
+                changed.add(category)
+        for recipe_data in updated:
+            key, category = recipe_key(recipe_data), recipe_data["category"]
+            if key not in self.recipe_categories:
+                self.recipe_categories[key] = category
+                self.category_members[category].add(key)
+                changed.add(category)
+        self._update_categories(changed)
+
+    def filter_recipes(self, keys: set[str] | None) -> None:
+        "Only show the recipes in `keys`, or every recipe if None. Categories without matches are hidden."
+
+        self.shown_recipes = keys
+        self._update_categories(set(self.category_members))
+
+    def members(self, category: str) -> set[str]:
+        members = self.category_members.get(category, set())
+        return members if self.shown_recipes is None else members & self.shown_recipes
+
+    def _update_categories(self, categories: set[str]) -> None:
+
+        for category in sorted(categories):
+            count = len(self.members(category))
+            node = self.category_nodes.get(category)
+            if not count:
+                if node is not None:
+                    node.remove()
+                    del self.category_nodes[category]
+                    self.materialized.discard(category)
+                if category in self.category_members and not self.category_members[category]:
+                    del self.category_members[category]
+                continue
+            label = Text.assemble(category, (f" ({count})", "dim"))
+            if node is None:
+                # Keep the categories in alphabetical order.
+                following = min((name for name in self.category_nodes if name > category), default=None)
+                before = self.category_nodes[following] if following is not None else None
+                node = self.root.add(label, data=category, before=before)
+                self.category_nodes[category] = node
+            else:
+                node.set_label(label)
+            if category in self.materialized:
+                self._materialize(node)
+
+    def _materialize(self, node: TreeNode[str]) -> None:
+
+        assert node.data is not None
+        node.remove_children()
+        # Keys in a category only differ by name.
+        for key in sorted(self.members(node.data), key=str.casefold):
+            node.add_leaf(key.rpartition("/")[2], data=key)
+        self.materialized.add(node.data)
+
+    def is_category(self, node: TreeNode[str]) -> bool:
+        return node.parent is self.root
+
+    @on(Tree.NodeExpanded)
+    def category_expanded(self, event: Tree.NodeExpanded[str]) -> None:
+        if self.is_category(event.node) and event.node.data not in self.materialized:
+            self._materialize(event.node)
+
+    @on(Tree.NodeCollapsed)
+    def category_collapsed(self, event: Tree.NodeCollapsed[str]) -> None:
+        if self.is_category(event.node):
+            event.node.remove_children()
+            self.materialized.discard(event.node.data)
+
+    def reveal(self, key: str) -> None:
+        "Expand the recipe's category and move the cursor to it."
+
+        node = self.category_nodes.get(self.recipe_categories.get(key, ""))
+        if node is None:
+            return
+        if node.data not in self.materialized:
+            self._materialize(node)
+        node.expand()
+        for leaf in node.children:
+            if leaf.data == key:
+                # Line numbers are assigned when the tree is next built.
+                self.call_after_refresh(self.move_cursor, leaf)
+                return
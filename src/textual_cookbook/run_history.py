@@ -0,0 +1,108 @@
+"""Recipe run history
+==================
+
+Every recipe run is recorded with what it cost (see `launcher.RunResult`)
+in a small SQLite database in the user cache directory, next to the recipe
+index. The recipe table shows the latest run of each recipe as optional
+columns (`t` in the cookbook).
+
+The database is only opened on first use, so a session that never runs a
+recipe or shows the columns never touches it. A history that can't be
+opened or written is not an error, runs just go unrecorded.
+"""
+
+# python standard lib
+from __future__ import annotations
+from pathlib import Path
+import sqlite3
+import time
+
+# Local imports
+from textual_cookbook.launcher import RunResult
+from textual_cookbook.recipe_index import get_cache_dir
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS runs (
+    id INTEGER PRIMARY KEY,
+    recipe TEXT NOT NULL,
+    started REAL NOT NULL,
+    returncode INTEGER NOT NULL,
+    wall_time REAL NOT NULL,
+    first_paint REAL,
+    user_time REAL,
+    system_time REAL,
+    max_rss INTEGER
+);
+CREATE INDEX IF NOT EXISTS runs_by_recipe ON runs (recipe, id);
+"""
+# Everything in a RunResult but the output.
+RESULT_FIELDS = RunResult._fields[: RunResult._fields.index("output")]
+RESULT_COLUMNS = ", ".join(RESULT_FIELDS)
+
+
+class RunHistory:
+    "Recorded recipe runs, keyed by recipe key (`category/name`)."
+
+    def __init__(self, db_path: Path | None = None) -> None:
+        self.db_path = db_path if db_path is not None else get_cache_dir() / "run_history.sqlite3"
+        self._db: sqlite3.Connection | None = None
+        self.available = True
+
+    def _connect(self) -> sqlite3.Connection | None:
+
+        if self._db is None and self.available:
+            try:
+                self.db_path.parent.mkdir(parents=True, exist_ok=True)
+                self._db = sqlite3.connect(self.db_path)
+                self._db.executescript(SCHEMA)
+            except (OSError, sqlite3.Error):
+                self.available = False
+                self.close()
+        return self._db
+
+    def record(self, key: str, result: RunResult) -> None:
+
+        db = self._connect()
+        if db is None:
+            return
+        try:
+            with db:
+                db.execute(
+                    f"INSERT INTO runs (recipe, started, {RESULT_COLUMNS}) "
+                    f"VALUES (?, ?, {', '.join('?' * len(RESULT_FIELDS))})",
+                    (key, time.time() - result.wall_time, *result[: len(RESULT_FIELDS)]),
+                )
+        except sqlite3.Error:
+            pass
+
+    def latest(self) -> dict[str, RunResult]:
+        "Return the most recent run of every recipe that has been run."
+
+        db = self._connect()
+        if db is None:
+            return {}
+        try:
+            rows = db.execute(
+                f"SELECT recipe, {RESULT_COLUMNS} FROM runs "
+                "WHERE id IN (SELECT MAX(id) FROM runs GROUP BY recipe)"
+            ).fetchall()
+        except sqlite3.Error:
+            return {}
+        return {key: RunResult(*values) for key, *values in rows}
+
+    def runs(self, key: str) -> list[RunResult]:
+        "Return every recorded run of a recipe, oldest first."
+
+        db = self._connect()
+        if db is None:
+            return []
+        try:
+            rows = db.execute(f"SELECT {RESULT_COLUMNS} FROM runs WHERE recipe = ? ORDER BY id", (key,))
+            return [RunResult(*values) for values in rows]
+        except sqlite3.Error:
+            return []
+
+    def close(self) -> None:
+        if self._db is not None:
+            self._db.close()
+            self._db = None
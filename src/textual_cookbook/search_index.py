@@ -0,0 +1,262 @@
+"""Full-text search over recipe source
+===================================
+
+An inverted index from identifier tokens (`call_from_thread`, `capture_mouse`,
+`signal`...) to the recipes and lines they appear on. The description is the
+recipe's module docstring, so it's covered by indexing the source.
+
+For every recipe the index keeps its tokens and the lines they are on. That
+is persisted in the user cache directory next to the recipe index, and
+checked against each file's mtime and size, so only recipes that were added or
+changed are read and tokenized again. The token -> recipes mapping is built
+in memory from it.
+
+The index is built and updated from worker threads while the UI queries it,
+so every access goes through a lock. Files are read outside of it.
+"""
+
+# python standard lib
+from __future__ import annotations
+from typing import TypedDict, Any, NamedTuple
+from collections.abc import Iterable
+from collections import defaultdict
+from heapq import nlargest
+from operator import itemgetter
+import hashlib
+import json
+import math
+import os
+import re
+import threading
+from pathlib import Path
+
+# Local imports
+from textual_cookbook.recipe_index import RecipeData, get_cache_dir, read_recipe, decode_recipe
+
+SEARCH_INDEX_VERSION = 1
+# Identifiers of two characters or more.
+TOKEN_PATTERN = re.compile(r"[A-Za-z_][A-Za-z0-9_]+")
+# Line hits kept per token per recipe. The first few are all the UI shows.
+MAX_LINE_HITS = 20
+# A query term is matched against every token that contains it. Past this
+# many tokens the term is too vague to be worth scoring all of them.
+MAX_EXPANSIONS = 200
+# Term frequency weights, indexed by the number of line hits.
+TERM_WEIGHTS = [0.0] + [1 + math.log(hits) for hits in range(1, MAX_LINE_HITS + 1)]
+
+
+class SearchEntry(TypedDict):
+    mtime_ns: int
+    size: int
+    name: str
+    tokens: dict[str, list[int]]  # token -> line numbers (1-based)
+
+
+class SearchHit(NamedTuple):
+    name: str
+    path: str  # relative to the recipes directory
+    score: float
+    lines: list[int]  # lines with a hit, ascending
+    tokens: list[str]  # the indexed tokens that matched
+
+
+def tokenize_source(text_blob: str) -> dict[str, list[int]]:
+    "Return the case-folded identifier tokens of `text_blob` with the lines they appear on."
+
+    tokens: dict[str, list[int]] = {}
+    for line_number, line in enumerate(text_blob.splitlines(), start=1):
+        for token in set(TOKEN_PATTERN.findall(line)):
+            lines = tokens.setdefault(token.casefold(), [])
+            if len(lines) < MAX_LINE_HITS and (not lines or lines[-1] != line_number):
+                lines.append(line_number)
+    return tokens
+
+
+def _tokenize_file(recipe_file: Path, name: str) -> SearchEntry | None:
+
+    try:
+        stat = recipe_file.stat()
+        text_blob = decode_recipe(read_recipe(recipe_file))
+    except (OSError, UnicodeDecodeError):
+        return None
+    return {"mtime_ns": stat.st_mtime_ns, "size": stat.st_size, "name": name, "tokens": tokenize_source(text_blob)}
+
+
+class SearchIndex:
+    """Inverted token index over the recipes in one recipes directory.
+
+    Usage:
+        index = SearchIndex(recipes_dir)
+        index.refresh(recipes)         # blocking, run it in a thread
+        index.search("call_from_thread")
+    """
+
+    def __init__(self, recipes_dir: Path, cache_dir: Path | None = None) -> None:
+        self.recipes_dir = recipes_dir
+        cache_dir = cache_dir if cache_dir is not None else get_cache_dir()
+        dir_hash = hashlib.sha1(str(recipes_dir.resolve()).encode()).hexdigest()[:12]
+        self.cache_path = cache_dir / f"search_index-{dir_hash}.json"
+        self.entries: dict[str, SearchEntry] = {}
+        self.ready = False
+        # token -> {recipe path: term weight}. The weight is 1 + log(hits).
+        self._postings: dict[str, dict[str, float]] = defaultdict(dict)
+        # Live changes that arrive while the first refresh is still running.
+        self._pending: dict[str, RecipeData | None] = {}
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+    def _load(self) -> dict[str, SearchEntry]:
+
+        try:
+            with open(self.cache_path, "r", encoding="utf-8") as f:
+                data: dict[str, Any] = json.load(f)
+        except (OSError, ValueError):
+            return {}
+        if data.get("version") != SEARCH_INDEX_VERSION:
+            return {}
+        return data.get("entries", {})
+
+    def save(self) -> None:
+        "Write the index atomically. Failing to write it only means more reading next time."
+
+        with self._lock:
+            # Entries are replaced, never changed in place, so a shallow copy is a snapshot.
+            entries = dict(self.entries)
+        data = {"version": SEARCH_INDEX_VERSION, "entries": entries}
+        tmp_path = self.cache_path.with_suffix(f".{os.getpid()}.{threading.get_ident()}.tmp")
+        try:
+            self.cache_path.parent.mkdir(parents=True, exist_ok=True)
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(data, f, separators=(",", ":"))
+            os.replace(tmp_path, self.cache_path)
+        except OSError:
+            tmp_path.unlink(missing_ok=True)
+
+    def refresh(self, recipes: Iterable[RecipeData]) -> int:
+        """Bring the index up to date with `recipes` (the whole scan result).
+        Recipes whose file still has the indexed mtime and size are kept,
+        others are read and tokenized, and recipes that are gone are dropped.
+        Blocking, the app runs this in its scan thread.
+
+        Returns:
+            The number of recipes that had to be tokenized.
+        """
+
+        stored = self._load() if not self.entries else dict(self.entries)
+        entries: dict[str, SearchEntry] = {}
+        tokenized = 0
+        for recipe_data in recipes:
+            rel_path = recipe_data["path"]
+            recipe_file = self.recipes_dir / rel_path
+            entry = stored.get(rel_path)
+            try:
+                stat = recipe_file.stat()
+            except OSError:
+                continue
+            if entry is None or entry["mtime_ns"] != stat.st_mtime_ns or entry["size"] != stat.st_size:
+                entry = _tokenize_file(recipe_file, recipe_data["name"])
+                tokenized += 1
+                if entry is None:
+                    continue
+            entries[rel_path] = entry
+
+        postings: dict[str, dict[str, float]] = defaultdict(dict)
+        for rel_path, entry in entries.items():
+            for token, lines in entry["tokens"].items():
+                postings[token][rel_path] = TERM_WEIGHTS[len(lines)]
+        with self._lock:
+            self.entries, self._postings = entries, postings
+            self.ready = True
+            pending, self._pending = self._pending, {}
+        if pending:
+            updated = [recipe_data for recipe_data in pending.values() if recipe_data is not None]
+            self.update(updated, [rel_path for rel_path, recipe_data in pending.items() if recipe_data is None])
+        elif tokenized or len(entries) != len(stored):
+            self.save()
+        return tokenized
+
+    def update(self, recipes: Iterable[RecipeData], removed: Iterable[str]) -> None:
+        """Apply a live rescan: re-tokenize the given recipes and drop the
+        `removed` paths. Only the postings of those recipes are touched.
+        Changes made before the first `refresh` is done are applied by it."""
+
+        with self._lock:
+            if not self.ready:
+                self._pending.update({rel_path: None for rel_path in removed})
+                self._pending.update({recipe_data["path"]: recipe_data for recipe_data in recipes})
+                return
+
+        new_entries: dict[str, SearchEntry | None] = {rel_path: None for rel_path in removed}
+        for recipe_data in recipes:
+            rel_path = recipe_data["path"]
+            new_entries[rel_path] = _tokenize_file(self.recipes_dir / rel_path, recipe_data["name"])
+
+        with self._lock:
+            for rel_path, entry in new_entries.items():
+                old_entry = self.entries.pop(rel_path, None)
+                if old_entry is not None:
+                    for token in old_entry["tokens"]:
+                        paths = self._postings.get(token)
+                        if paths is not None:
+                            paths.pop(rel_path, None)
+                            if not paths:
+                                del self._postings[token]
+                if entry is not None:
+                    self.entries[rel_path] = entry
+                    for token, lines in entry["tokens"].items():
+                        self._postings[token][rel_path] = TERM_WEIGHTS[len(lines)]
+        self.save()
+
+    def search(self, query: str, limit: int = 50) -> list[SearchHit]:
+        """Return the recipes matching every term of `query`, best first.
+
+        A term matches any indexed token that contains it, so `mouse` finds
+        `capture_mouse`. Matches are scored by tf-idf, exact token matches
+        count double, and recipes whose name contains the term get a boost.
+        """
+
+        terms = [term.casefold() for term in TOKEN_PATTERN.findall(query)]
+        if not terms:
+            return []
+
+        with self._lock:
+            entries, postings = self.entries, self._postings
+            total = len(entries) or 1
+            scores: dict[str, float] | None = None
+            expanded: list[list[str]] = []
+            for term in terms:
+                expansions = [term] if term in postings else []
+                expansions += [token for token in postings if term in token and token != term][:MAX_EXPANSIONS]
+                expanded.append(expansions)
+                term_scores: dict[str, float] = defaultdict(float)
+                for token in expansions:
+                    paths = postings[token]
+                    idf = math.log(1 + total / len(paths))
+                    weight = idf * (2.0 if token == term else 1.0)
+                    if not term_scores:
+                        term_scores.update({rel_path: weight * tf for rel_path, tf in paths.items()})
+                        continue
+                    for rel_path, tf in paths.items():
+                        term_scores[rel_path] += weight * tf
+                for rel_path in term_scores:
+                    if term in entries[rel_path]["name"].casefold():
+                        term_scores[rel_path] *= 2
+                if scores is None:
+                    scores = term_scores
+                else:
+                    scores = {rel_path: score + term_scores[rel_path] for rel_path, score in scores.items() if rel_path in term_scores}
+                if not scores:
+                    return []
+
+            assert scores is not None
+            ranked = nlargest(limit, scores.items(), key=itemgetter(1))
+            ranked.sort(key=lambda item: (-item[1], entries[item[0]]["name"]))
+            hits: list[SearchHit] = []
+            for rel_path, score in ranked:
+                entry = entries[rel_path]
+                tokens = sorted({token for expansions in expanded for token in expansions if token in entry["tokens"]})
+                lines = sorted({line for token in tokens for line in entry["tokens"][token]})
+                hits.append(SearchHit(entry["name"], rel_path, round(score, 3), lines, tokens))
+        return hits
@@ -0,0 +1,389 @@
+"""Row bookkeeping for the recipe table
+====================================
+
+The recipe table adds rows in batches while recipes are discovered, hides and
+shows tens of thousands of them as the filter changes, and reorders all of
+them when a column is sorted. DataTable's public API does all of that a row
+at a time: `add_row` refreshes and checks idle once per row, `remove_row`
+renumbers every remaining row, `add_column` marks every cell to be measured
+again, and there is no way to hide a row without removing it.
+
+`RowViewTable` holds the cells of every row itself and shows a subset of them,
+in an order chosen by the subclass. With the Textual versions it has been
+checked against (`FAST_ROWS_VERSIONS`), it replaces DataTable's row
+bookkeeping (`_row_locations`, `_y_offsets` and friends) with `RowLocations`,
+which is built from whole lists at a time. This module is the only place in
+the cookbook that touches those internals. With any other version of Textual
+`FAST_ROWS` is False, and the shown rows are kept in step through
+`add_row`, `remove_row` and `update_cell`. Rows that leave the view are
+removed, and rows that join it at the end are added, but a change that moves
+rows (sorting, or showing hidden rows above shown ones) adds every row again
+after the first one that moved. That's the same behaviour, only slower for
+big tables.
+"""
+
+# python standard lib
+from __future__ import annotations
+from typing import Any
+from collections.abc import Callable, Iterable, Iterator
+from itertools import compress, repeat
+from operator import attrgetter
+
+# Textual imports
+from textual.widgets import DataTable
+from textual.widgets.data_table import Column, ColumnKey, Row, RowKey, RowDoesNotExist
+from textual._two_way_dict import TwoWayDict
+from rich.text import Text
+
+# Local imports
+from textual_cookbook.textual_versions import textual_version
+
+# Textual (major, minor) versions whose DataTable internals RowViewTable was written against.
+FAST_ROWS_VERSIONS = {(5, 3)}
+FAST_ROWS = textual_version() in FAST_ROWS_VERSIONS
+
+_row_name = attrgetter("key.value")
+
+# Roughly how many rows `DataTable.remove_row` renumbers in the time `add_row` adds one.
+_REMOVE_ROW_COST = 16
+
+
+class RowLocations(TwoWayDict[RowKey, int]):
+    """Stands in for `DataTable._row_locations`. It's backed by a list of rows in
+    display order, and a matching list of their keys. Index -> key lookups
+    (which is all that drawing and moving the cursor need) go straight to the
+    list. The key -> index mapping is only built the first time something asks
+    for it, from the key strings, which hash much faster than a RowKey."""
+
+    def __init__(self, rows: list[Row], names: list[str] | None = None) -> None:
+        self.rows = rows
+        self.names = names if names is not None else list(map(_row_name, rows))
+        self._index: dict[str, int] | None = None
+        self._line_offsets: list[tuple[RowKey, int]] | None = None
+
+    def _get_index(self) -> dict[str, int]:
+        if self._index is None:
+            self._index = dict(zip(self.names, range(len(self.names))))
+        return self._index
+
+    def copy(self) -> RowLocations:
+        return RowLocations(list(self.rows), list(self.names))
+
+    def select(self, mask: Iterable[bool]) -> RowLocations:
+        "The rows where `mask` is True, in the same order."
+        mask = list(mask)
+        return RowLocations(list(compress(self.rows, mask)), list(compress(self.names, mask)))
+
+    def extend(self, rows: list[Row]) -> None:
+
+        start = len(self.rows)
+        names = list(map(_row_name, rows))
+        self.rows.extend(rows)
+        self.names.extend(names)
+        if self._index is not None:
+            self._index.update(zip(names, range(start, len(self.names))))
+        self._line_offsets = None
+
+    def line_offsets(self) -> list[tuple[RowKey, int]]:
+        "`DataTable._y_offsets`, for rows that are all one line high."
+
+        if self._line_offsets is None:
+            self._line_offsets = list(zip(map(attrgetter("key"), self.rows), repeat(0)))
+        return self._line_offsets
+
+    def __setitem__(self, key: RowKey, value: int) -> None:
+        raise TypeError("Rows are added to a RowViewTable with append_rows().")
+
+    def __delitem__(self, key: RowKey) -> None:
+        raise TypeError("Rows are removed from a RowViewTable with discard_rows().")
+
+    def __iter__(self) -> Iterator[RowKey]:
+        return map(attrgetter("key"), self.rows)
+
+    def get(self, key: RowKey | str) -> int | None:
+        return self._get_index().get(getattr(key, "value", key))  # type: ignore[arg-type]
+
+    def get_key(self, value: int) -> RowKey | None:
+        return self.rows[value].key if 0 <= value < len(self.rows) else None
+
+    def contains_value(self, value: int) -> bool:
+        return 0 <= value < len(self.rows)
+
+    def __len__(self) -> int:
+        return len(self.rows)
+
+    def __contains__(self, item: object) -> bool:
+        return getattr(item, "value", item) in self._get_index()
+
+
+class RowViewTable(DataTable[Any]):
+    """A DataTable that shows a view of the rows it holds. Every row is one line high.
+
+    `row_cells` has the cells of every row by row key, whether it's shown or not.
+    `row_order` has every row key in display order. Rows are shown in that
+    order, skipping the ones that aren't in `row_filter` (unless it's None).
+    Subclasses change these through `append_rows`, `discard_rows`,
+    `set_row_order` and `set_row_filter`. Cells edited in place in `row_cells`
+    are shown after calling `cells_changed`.
+    """
+
+    def __init__(self, **kwargs: Any) -> None:
+        # Read here rather than at import, so tests can run both paths.
+        self.fast_rows = FAST_ROWS
+        self.row_cells: dict[str, dict[ColumnKey, Any]] = {}
+        self.row_filter: set[str] | None = None
+        # Fast path: every row in display order, and the rows that are shown.
+        self._all_rows = RowLocations([])
+        self._shown_rows = RowLocations([])
+        self._rows_by_key: dict[str, Row] = {}
+        # Public API path: every row key in display order, and DataTable's own bookkeeping.
+        self._order: list[str] = []
+        self._table_row_locations: TwoWayDict[RowKey, int] = TwoWayDict({})
+        super().__init__(**kwargs)
+
+    @property
+    def row_order(self) -> list[str]:
+        "Every row key in display order, shown or not."
+        return self._all_rows.names if self.fast_rows else self._order
+
+    def append_rows(self, cells: dict[str, dict[ColumnKey, Any]]) -> None:
+        """Add rows after the last row. Keys already in the table are the caller's
+        problem. While `row_filter` is set, new rows are hidden."""
+
+        if not cells:
+            return
+        self.row_cells.update(cells)
+        if not self.fast_rows:
+            self._order.extend(cells)
+            if self.row_filter is None:
+                with self.app.batch_update():
+                    for key, row_cells in cells.items():
+                        self.add_row(*self._ordered_cells(row_cells), key=key)
+            return
+
+        had_rows = self.row_count > 0
+        rows = self.rows
+        new_rows: list[Row] = []
+        for key, row_cells in cells.items():
+            row_key = RowKey(key)
+            rows[row_key] = self._rows_by_key[key] = row = Row(row_key, 1)
+            # Shared with row_cells, so edits there show up after cells_changed().
+            self._data[row_key] = row_cells
+            new_rows.append(row)
+        self._all_rows.extend(new_rows)
+        if self.row_filter is None:
+            self._shown_rows.extend(new_rows)
+        self._invalidate_rows(first_rows=not had_rows)
+
+    def discard_rows(self, keys: Iterable[str]) -> None:
+
+        removed = {key for key in keys if key in self.row_cells}
+        if not removed:
+            return
+        for key in removed:
+            del self.row_cells[key]
+        if not self.fast_rows:
+            self._order = [key for key in self._order if key not in removed]
+        else:
+            for key in removed:
+                row_key = self._rows_by_key.pop(key).key
+                del self.rows[row_key]
+                del self._data[row_key]
+            self._all_rows = self._all_rows.select(name not in removed for name in self._all_rows.names)
+        self._layout()
+
+    def remove_row(self, row_key: RowKey | str) -> None:
+
+        key = getattr(row_key, "value", row_key)
+        if key not in self.row_cells:
+            raise RowDoesNotExist(f"Row key {row_key!r} is not valid.")
+        self.discard_rows([str(key)])
+
+    def set_row_order(self, order: list[str]) -> None:
+        "Put every row in the order of `order`, which has every row key exactly once."
+
+        if not self.fast_rows:
+            self._order = order
+        else:
+            self._all_rows = RowLocations(list(map(self._rows_by_key.__getitem__, order)), order)
+        self._layout()
+
+    def sort(
+        self,
+        *columns: ColumnKey | str,
+        key: Callable[[Any], Any] | None = None,
+        reverse: bool = False,
+    ) -> RowViewTable:
+        """Sort every row, shown or not, like `DataTable.sort`: by the values
+        in `columns` (every cell if none are given), passed through `key` if
+        it's given."""
+
+        column_keys = [ColumnKey(str(getattr(column, "value", column))) for column in columns]
+
+        def sort_by(row_key: str) -> Any:
+            cells = self.row_cells[row_key]
+            values = [cells[column] for column in column_keys] if column_keys else list(cells.values())
+            if key is not None:
+                return key(values[0] if len(values) == 1 else tuple(values))
+            return values[0] if len(values) == 1 else tuple(values)
+
+        self.set_row_order(sorted(self.row_order, key=sort_by, reverse=reverse))
+        return self
+
+    def set_row_filter(self, row_filter: set[str] | None) -> None:
+        "Only show the rows in `row_filter`, or every row if None."
+
+        self.row_filter = row_filter
+        self._layout()
+
+    def cells_changed(self) -> None:
+        "Show cells that were changed in `row_cells`."
+
+        if not self.fast_rows:
+            self._update_cells()
+            return
+        self._require_update_dimensions = True
+        self._update_count += 1
+        self.refresh()
+
+    def add_fixed_column(self, label: Text, width: int, key: str) -> None:
+        """Add a column of a fixed width after the last one. Its cells are set in
+        `row_cells` by the caller, followed by `cells_changed`."""
+
+        if not self.fast_rows:
+            # Cells are filled in by the layout in cells_changed().
+            self.add_column(label, width=width, key=key)
+            return
+        # add_column would mark every cell of every row to be measured again.
+        column_key = ColumnKey(key)
+        self.columns[column_key] = Column(column_key, label, width)
+        self._column_locations[column_key] = len(self._column_locations)
+
+    def drop_column(self, key: str) -> None:
+        """Remove a column. Its cells are removed from `row_cells` by the caller,
+        followed by `cells_changed`."""
+
+        if not self.fast_rows:
+            self.remove_column(key)
+            return
+        del self.columns[ColumnKey(key)]
+        locations = self._column_locations
+        column_keys = map(locations.get_key, range(len(locations)))
+        kept = [column_key for column_key in column_keys if column_key is not None and column_key.value != key]
+        self._column_locations = TwoWayDict({column_key: index for index, column_key in enumerate(kept)})
+
+    def clear(self, columns: bool = False) -> RowViewTable:
+
+        super().clear(columns)
+        self.row_cells.clear()
+        self._order = []
+        self._all_rows = RowLocations([])
+        self._rows_by_key.clear()
+        return self
+
+    def _ordered_cells(self, row_cells: dict[ColumnKey, Any]) -> list[Any]:
+        return [row_cells.get(column.key) for column in self.ordered_columns]
+
+    def _layout(self) -> None:
+        "Lay out the rows that pass the filter, in the current order."
+
+        row_filter = self.row_filter
+        if self.fast_rows:
+            had_rows = self.row_count > 0
+            if row_filter is None:
+                self._shown_rows = self._all_rows.copy()
+            else:
+                self._shown_rows = self._all_rows.select(map(row_filter.__contains__, self._all_rows.names))
+            self._invalidate_rows(first_rows=not had_rows)
+            return
+
+        shown = self._order if row_filter is None else [key for key in self._order if key in row_filter]
+        table_rows: list[str] = list(map(_row_name, super().ordered_rows))
+        shown_set = set(shown)
+        kept = [key for key in table_rows if key in shown_set]
+        # Rows up to the first one that's out of place stay where they are.
+        in_place = 0
+        for table_key, key in zip(kept, shown):
+            if table_key != key:
+                break
+            in_place += 1
+        removed = [key for key in table_rows if key not in shown_set] + kept[in_place:]
+
+        cursor_coordinate = self.cursor_coordinate
+        with self.app.batch_update():
+            # remove_row renumbers every row after it, so past a point it's
+            # cheaper to add every shown row again.
+            if len(removed) * len(table_rows) > _REMOVE_ROW_COST * len(shown):
+                super().clear()
+                in_place = 0
+            else:
+                for key in removed:
+                    super().remove_row(key)
+            for key in shown[in_place:]:
+                self.add_row(*self._ordered_cells(self.row_cells[key]), key=key)
+        self.cursor_coordinate = cursor_coordinate
+
+    def _update_cells(self) -> None:
+        "Without FAST_ROWS, copy cells changed in `row_cells` to the rows that are shown."
+
+        with self.app.batch_update():
+            for row in super().ordered_rows:
+                cells = self.row_cells[_row_name(row)]
+                for column, value in zip(self.ordered_columns, self.get_row(row.key)):
+                    if cells.get(column.key) != value:
+                        self.update_cell(row.key, column.key, cells.get(column.key), update_width=True)
+
+    # Every row is one line high and `_row_locations` keeps the shown rows in
+    # order, so none of these have to rebuild per-row lists on every change.
+    # Without FAST_ROWS they all go to DataTable.
+
+    @property
+    def _row_locations(self) -> TwoWayDict[RowKey, int]:
+        return self._shown_rows if self.fast_rows else self._table_row_locations
+
+    @_row_locations.setter
+    def _row_locations(  # pyright: ignore[reportIncompatibleVariableOverride]
+        self, row_locations: TwoWayDict[RowKey, int]
+    ) -> None:
+
+        if not self.fast_rows:
+            self._table_row_locations = row_locations
+            return
+        if not isinstance(row_locations, RowLocations):
+            # Set by DataTable itself (in __init__ and clear).
+            ordered_keys = map(row_locations.get_key, range(len(row_locations)))
+            row_locations = RowLocations([self.rows[row_key] for row_key in ordered_keys if row_key is not None])
+        self._shown_rows = row_locations
+
+    @property
+    def row_count(self) -> int:
+        "The number of rows shown, which is less than `len(self.row_cells)` while `row_filter` is set."
+        return len(self._shown_rows) if self.fast_rows else super().row_count
+
+    def is_valid_row_index(self, row_index: int) -> bool:
+        return 0 <= row_index < self.row_count
+
+    @property
+    def ordered_rows(self) -> list[Row]:
+        return self._shown_rows.rows if self.fast_rows else super().ordered_rows
+
+    @property
+    def _y_offsets(self) -> list[tuple[RowKey, int]]:
+        return self._shown_rows.line_offsets() if self.fast_rows else super()._y_offsets
+
+    @property
+    def _total_row_height(self) -> int:
+        return len(self._shown_rows) if self.fast_rows else super()._total_row_height
+
+    def _invalidate_rows(self, first_rows: bool = False) -> None:
+        """The part of `add_row` that has to run once per change, not once per row.
+        `first_rows` is True if no rows were shown before the change."""
+
+        self._require_update_dimensions = True
+        self.cursor_coordinate = self.cursor_coordinate
+        self.hover_coordinate = self.hover_coordinate
+        if first_rows and self.row_count and self.show_cursor and self.cursor_type != "none":
+            self._highlight_cursor()
+        self._update_count += 1
+        self.check_idle()
+        self.refresh()
@@ -0,0 +1,23 @@
+"""Textual version checks
+======================
+
+A couple of the cookbook's widgets replace Textual internals where the public
+API is too slow for big tables and files (see `table_rows.RowViewTable` and
+`highlight_cache.CodeTextArea`). Each of them only does so with the Textual versions it
+has been checked against, and falls back to the public API otherwise.
+"""
+
+# python standard lib
+from __future__ import annotations
+from importlib import metadata
+import re
+
+
+def textual_version() -> tuple[int, ...]:
+    "The installed Textual's (major, minor) version, or () if it can't be found."
+
+    try:
+        version = metadata.version("textual")
+    except metadata.PackageNotFoundError:
+        return ()
+    return tuple(map(int, re.findall(r"\d+", version)[:2]))
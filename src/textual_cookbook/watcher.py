@@ -0,0 +1,211 @@
+"""Filesystem watching for live recipe rescans
+===========================================
+
+Used by the cookbook's watch mode (`textual-cookbook --watch`). A watcher
+yields sets of recipe paths (relative to the recipes directory) that were
+added, changed or removed. It's up to the caller to find out which.
+
+On Linux inotify is used directly through ctypes, everywhere else (or if
+inotify is unavailable) the recipes directory is polled.
+"""
+
+# python standard lib
+from __future__ import annotations
+from abc import ABC, abstractmethod
+from collections.abc import Callable, Iterator
+import ctypes
+import ctypes.util
+import os
+import select
+import struct
+import sys
+import time
+from pathlib import Path
+
+# Local imports
+from textual_cookbook.recipe_index import list_recipe_files
+
+# inotify constants, from <sys/inotify.h>
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_FROM = 0x00000040
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_DELETE = 0x00000200
+IN_DELETE_SELF = 0x00000400
+IN_Q_OVERFLOW = 0x00004000
+IN_IGNORED = 0x00008000
+IN_ISDIR = 0x40000000
+IN_NONBLOCK = os.O_NONBLOCK
+IN_CLOEXEC = 0o2000000
+
+WATCH_MASK = IN_CLOSE_WRITE | IN_MOVED_FROM | IN_MOVED_TO | IN_CREATE | IN_DELETE | IN_DELETE_SELF
+EVENT_HEADER = struct.Struct("iIII")
+
+# Editors tend to produce a burst of events per save, these are collected
+# until the directory has been quiet for this long.
+DEBOUNCE_SECONDS = 0.1
+POLL_INTERVAL = 1.0
+
+
+def _list_recipes(recipes_dir: Path) -> set[str]:
+    return {path.relative_to(recipes_dir).as_posix() for path in list_recipe_files(recipes_dir)}
+
+
+class RecipeWatcher(ABC):
+
+    def __init__(self, recipes_dir: Path) -> None:
+        self.recipes_dir = recipes_dir
+
+    @abstractmethod
+    def watch(self, should_stop: Callable[[], bool]) -> Iterator[set[str]]:
+        """Block and yield sets of changed recipe paths until `should_stop` returns True.
+        `should_stop` is checked at least twice a second."""
+
+    def close(self) -> None:
+        pass
+
+
+class PollingWatcher(RecipeWatcher):
+    "Compares the mtime and size of every recipe once per `interval`."
+
+    def __init__(self, recipes_dir: Path, interval: float = POLL_INTERVAL) -> None:
+        super().__init__(recipes_dir)
+        self.interval = interval
+
+    def _snapshot(self) -> dict[str, tuple[int, int]]:
+
+        snapshot: dict[str, tuple[int, int]] = {}
+        for rel_path in _list_recipes(self.recipes_dir):
+            try:
+                stat = (self.recipes_dir / rel_path).stat()
+            except OSError:  # removed between listing and stat
+                continue
+            snapshot[rel_path] = (stat.st_mtime_ns, stat.st_size)
+        return snapshot
+
+    def watch(self, should_stop: Callable[[], bool]) -> Iterator[set[str]]:
+
+        previous = self._snapshot()
+        next_poll = time.monotonic() + self.interval
+        while not should_stop():
+            if time.monotonic() < next_poll:
+                time.sleep(min(0.5, self.interval))
+                continue
+            next_poll = time.monotonic() + self.interval
+            current = self._snapshot()
+            changed = {
+                rel_path
+                for rel_path in previous.keys() | current.keys()
+                if previous.get(rel_path) != current.get(rel_path)
+            }
+            previous = current
+            if changed:
+                yield changed
+
+
+class InotifyWatcher(RecipeWatcher):
+    """Watches the recipes directory and every category directory with inotify.
+    New category directories are picked up as they are created."""
+
+    def __init__(self, recipes_dir: Path) -> None:
+        super().__init__(recipes_dir)
+        self._libc = _load_libc()
+        self._fd = self._libc.inotify_init1(IN_NONBLOCK | IN_CLOEXEC)
+        if self._fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 failed")
+        self._watches: dict[int, Path] = {}
+        self.known = _list_recipes(recipes_dir)
+        self._add_watch(recipes_dir)
+        for path in recipes_dir.iterdir():
+            if path.is_dir():
+                self._add_watch(path)
+
+    def _add_watch(self, path: Path) -> None:
+
+        wd = self._libc.inotify_add_watch(self._fd, os.fsencode(path), WATCH_MASK)
+        if wd >= 0:
+            self._watches[wd] = path
+
+    def _read_events(self) -> set[str]:
+
+        try:
+            data = os.read(self._fd, 64 * 1024)
+        except BlockingIOError:
+            return set()
+
+        changed: set[str] = set()
+        offset = 0
+        while offset < len(data):
+            wd, mask, _cookie, length = EVENT_HEADER.unpack_from(data, offset)
+            offset += EVENT_HEADER.size
+            name = os.fsdecode(data[offset : offset + length].rstrip(b"\0"))
+            offset += length
+
+            if mask & IN_Q_OVERFLOW:
+                # Events were dropped, so everything has to be checked again.
+                changed |= self.known | _list_recipes(self.recipes_dir)
+                continue
+            if mask & IN_IGNORED:
+                self._watches.pop(wd, None)
+                continue
+            directory = self._watches.get(wd)
+            if directory is None or not name:
+                continue
+
+            path = directory / name
+            if (directory == self.recipes_dir) != bool(mask & IN_ISDIR):
+                # Only category directories, and the recipes in them, are watched.
+                continue
+            if mask & IN_ISDIR:
+                # A category was added or moved in (its files count as added),
+                # or removed / moved out (its files count as removed).
+                if mask & (IN_CREATE | IN_MOVED_TO):
+                    self._add_watch(path)
+                    changed |= _list_recipes(self.recipes_dir) - self.known
+                else:
+                    prefix = f"{path.relative_to(self.recipes_dir).as_posix()}/"
+                    changed |= {rel_path for rel_path in self.known if rel_path.startswith(prefix)}
+            elif path.suffix == ".py":
+                changed.add(path.relative_to(self.recipes_dir).as_posix())
+        return changed
+
+    def watch(self, should_stop: Callable[[], bool]) -> Iterator[set[str]]:
+
+        pending: set[str] = set()
+        while not should_stop():
+            timeout = DEBOUNCE_SECONDS if pending else 0.5
+            readable, _, _ = select.select([self._fd], [], [], timeout)
+            if readable:
+                pending |= self._read_events()
+            elif pending:
+                for rel_path in pending:
+                    if (self.recipes_dir / rel_path).exists():
+                        self.known.add(rel_path)
+                    else:
+                        self.known.discard(rel_path)
+                yield pending
+                pending = set()
+
+    def close(self) -> None:
+        if self._fd >= 0:
+            os.close(self._fd)
+            self._fd = -1
+
+
+def _load_libc() -> ctypes.CDLL:
+
+    libc = ctypes.CDLL(ctypes.util.find_library("c"), use_errno=True)
+    libc.inotify_init1.argtypes = [ctypes.c_int]
+    libc.inotify_add_watch.argtypes = [ctypes.c_int, ctypes.c_char_p, ctypes.c_uint32]
+    return libc
+
+
+def create_watcher(recipes_dir: Path) -> RecipeWatcher:
+    "Return an inotify watcher where possible, otherwise a polling watcher."
+
+    if sys.platform.startswith("linux"):
+        try:
+            return InotifyWatcher(recipes_dir)
+        except (OSError, AttributeError):
+            pass
+    return PollingWatcher(recipes_dir)
@@ -0,0 +1,418 @@
+"""Tests for the code viewer."""
+
+from __future__ import annotations
+
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any
+from pathlib import Path
+import threading
+import time
+import pytest
+
+from textual.app import App, ComposeResult
+from textual.widgets import TextArea
+from textual.widgets.text_area import Document, Highlight
+
+from textual_cookbook import highlight_cache
+from textual_cookbook.highlight_cache import CodeTextArea, HighlightCache, parse_document
+from textual_cookbook.main import (
+    CodeContainer,
+    CookBookApp,
+    ResizeBar,
+    ResizeGhost,
+    TableScreen,
+)
+from textual_cookbook import large_file_view
+from textual_cookbook.large_file_view import LargeFileView, text_area_theme
+from textual_cookbook.mapped_file import MappedFile
+
+SOURCE_A = 'def spin(speed: int) -> None:\n    """Spin."""\n    return None\n'
+SOURCE_B = "from textual.app import App\n\nclass SpinApp(App):\n    pass\n"
+
+
+class CodeApp(App[None]):
+
+    def __init__(self, highlight_cache: HighlightCache, read_only: bool = True) -> None:
+        super().__init__()
+        self.highlight_cache = highlight_cache
+        self.read_only = read_only
+
+    def compose(self) -> ComposeResult:
+        yield CodeTextArea(language="python", read_only=self.read_only, highlight_cache=self.highlight_cache)
+
+
+def highlighted_lines(text_area: CodeTextArea) -> dict[int, list[Highlight]]:
+    # Drawing a line without highlights adds an empty list to the defaultdict.
+    return {line: highlights for line, highlights in text_area._highlights.items() if highlights}
+
+
+async def test_switching_back_reuses_parsed_document() -> None:
+
+    cache = HighlightCache()
+    app = CodeApp(cache)
+    async with app.run_test() as pilot:
+        text_area = app.query_one(CodeTextArea)
+        text_area.text = SOURCE_A
+        document_a, highlights_a = text_area.document, highlighted_lines(text_area)
+        assert highlights_a  # tree-sitter highlighted something
+        text_area.text = SOURCE_B
+        hits, misses = cache.hits, cache.misses
+
+        text_area.text = SOURCE_A
+        await pilot.pause()
+        assert (cache.hits, cache.misses) == (hits + 1, misses)
+        assert text_area.document is document_a
+        assert highlighted_lines(text_area) == highlights_a
+        assert text_area.text == SOURCE_A
+        assert cache.get(cache.make_key(SOURCE_B, "python")) is not None
+        assert 0 < cache.current_bytes <= cache.max_bytes
+
+
+def test_cache_is_bounded_by_estimated_size() -> None:
+
+    document_a, document_b = Document(SOURCE_A), Document(SOURCE_B)
+    highlights: defaultdict[int, list[Highlight]] = defaultdict(list, {0: [(0, 3, "keyword")]})
+    size_a = HighlightCache.estimate_bytes(document_a, highlights)
+    size_b = HighlightCache.estimate_bytes(document_b, highlights)
+
+    cache = HighlightCache(max_bytes=max(size_a, size_b))
+    key_a, key_b = cache.make_key(SOURCE_A, "python"), cache.make_key(SOURCE_B, "python")
+    cache.put(key_a, document_a, highlights, None)
+    assert cache.current_bytes == size_a
+    cache.put(key_b, document_b, highlights, None)
+    assert len(cache) == 1 and cache.current_bytes == size_b
+    assert cache.get(key_a) is None
+    assert cache.get(key_b) is not None
+    assert "1 documents" in cache.describe()
+
+    # Documents too large for the whole cache aren't cached at all.
+    cache.put(cache.make_key(SOURCE_A * 10, "python"), Document(SOURCE_A * 10), highlights, None)
+    assert len(cache) == 1
+
+
+def test_prepare_parses_each_key_once_and_keys_in_parallel(monkeypatch: pytest.MonkeyPatch) -> None:
+
+    release_a = threading.Event()
+    parsed: list[str] = []
+
+    def slow_parse(text: str, language: str) -> Any:
+        parsed.append(text)
+        if text == SOURCE_A:
+            assert release_a.wait(5)
+        return Document(text), defaultdict(list), None
+
+    monkeypatch.setattr(highlight_cache, "parse_document", slow_parse)
+    cache = HighlightCache()
+    key_a, key_b = cache.make_key(SOURCE_A, "python"), cache.make_key(SOURCE_B, "python")
+    with ThreadPoolExecutor(3) as pool:
+        first_a = pool.submit(cache.prepare, key_a, SOURCE_A, "python")
+        while SOURCE_A not in parsed:
+            time.sleep(0.001)
+        second_a = pool.submit(cache.prepare, key_a, SOURCE_A, "python")
+        # B doesn't wait for A to be parsed.
+        entry_b = pool.submit(cache.prepare, key_b, SOURCE_B, "python").result(timeout=5)
+        assert entry_b is not None and not second_a.done()
+        release_a.set()
+        assert first_a.result(timeout=5) is second_a.result(timeout=5) is not None
+    assert sorted(parsed) == sorted([SOURCE_A, SOURCE_B])
+
+
+async def test_cache_is_skipped_when_editable() -> None:
+
+    cache = HighlightCache()
+    app = CodeApp(cache, read_only=False)
+    async with app.run_test():
+        text_area = app.query_one(CodeTextArea)
+        text_area.text = SOURCE_A
+        assert len(cache) == 0
+
+
+async def test_edits_leave_cached_entry_alone() -> None:
+
+    cache = HighlightCache()
+    app = CodeApp(cache)
+    async with app.run_test() as pilot:
+        text_area = app.query_one(CodeTextArea)
+        text_area.text = SOURCE_A
+        await pilot.pause()
+        entry = cache.get(cache.make_key(SOURCE_A, "python"))
+        assert entry is not None
+        cached_highlights = {line: list(spans) for line, spans in entry.highlights.items()}
+        assert text_area.document is entry.document
+        assert text_area._highlights is not entry.highlights
+
+        text_area.insert("import os\n", (0, 0))
+        assert text_area.text == "import os\n" + SOURCE_A
+        assert text_area.document is not entry.document
+        assert entry.document.text == SOURCE_A
+        assert {line: list(spans) for line, spans in entry.highlights.items()} == cached_highlights
+
+        text_area.undo()
+        assert text_area.text == SOURCE_A
+        assert entry.document.text == SOURCE_A
+
+
+async def test_cache_is_skipped_with_unchecked_textual(monkeypatch: pytest.MonkeyPatch) -> None:
+
+    monkeypatch.setattr(highlight_cache, "CACHED_DOCUMENTS", False)
+    cache = HighlightCache()
+    app = CodeApp(cache)
+    async with app.run_test():
+        text_area = app.query_one(CodeTextArea)
+        text_area.text = SOURCE_A
+        assert len(cache) == 0
+        assert highlighted_lines(text_area)
+
+
+async def test_parse_document_matches_text_area() -> None:
+
+    app = App[None]()
+    async with app.run_test():
+        text_area = TextArea(SOURCE_B, language="python")
+        await app.mount(text_area)
+        parsed = parse_document(SOURCE_B, "python")
+        assert parsed is not None
+        document, highlights, _ = parsed
+        assert document.text == SOURCE_B
+        # Spans of the same capture can come back in a different order, which doesn't change the result.
+        expected = {line: sorted(spans, key=str) for line, spans in text_area._highlights.items() if spans}
+        assert {line: sorted(spans, key=str) for line, spans in highlights.items() if spans} == expected
+
+
+def make_recipes_dir(tmp_path: Path, count: int) -> Path:
+
+    recipes_dir = tmp_path / "recipes"
+    (recipes_dir / "tips_and_tricks").mkdir(parents=True)
+    for index in range(count):
+        source = f'"""Recipe {index}.\n\nRecipe by Test Author"""\n\nVALUE = {index}\n'
+        (recipes_dir / "tips_and_tricks" / f"recipe_{index:02}.py").write_text(source, encoding="utf-8")
+    return recipes_dir
+
+
+async def wait_for_scan(app: CookBookApp, pilot: Any) -> None:
+
+    while not app.table_screen.scan_complete:
+        await pilot.pause(0.01)
+    await app.workers.wait_for_complete()
+
+
+async def test_cursor_rest_prefetches_neighbours(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+
+    monkeypatch.setenv("TEXTUAL_COOKBOOK_CACHE_DIR", str(tmp_path / "cache"))
+    monkeypatch.setattr(TableScreen, "PREFETCH_DELAY", 0.01)
+    app = CookBookApp(recipes_dir=make_recipes_dir(tmp_path, 6))
+    async with app.run_test() as pilot:
+        await wait_for_scan(app, pilot)
+        table = app.table_screen.table
+        table.move_cursor(row=3)
+        await pilot.pause()
+        await app.workers.wait_for_complete()
+
+        # The cursor row and two rows either side, nothing else.
+        cache = app.highlight_cache
+        prefetched = {
+            key
+            for key in map(table.key_at, range(table.row_count))
+            if cache.make_key(app.source_cache.get(app.recipe_data_dict[key]), "python") in cache
+        }
+        assert prefetched == set(map(table.key_at, range(1, 6)))
+
+        await pilot.press("enter")
+        assert cache.misses == 0 and cache.hits == 1
+
+
+async def test_preview_only_renders_the_resting_row(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+
+    monkeypatch.setenv("TEXTUAL_COOKBOOK_CACHE_DIR", str(tmp_path / "cache"))
+    monkeypatch.setattr(TableScreen, "schedule_prefetch", lambda self: None)  # keep it out of the count
+    parsed: list[str] = []
+
+    def counting_parse(text: str, language: str) -> Any:
+        parsed.append(text)
+        return parse_document(text, language)
+
+    monkeypatch.setattr(highlight_cache, "parse_document", counting_parse)
+    app = CookBookApp(recipes_dir=make_recipes_dir(tmp_path, 30), preview=True)
+    async with app.run_test() as pilot:
+        await wait_for_scan(app, pilot)
+        screen = app.table_screen
+        parsed.clear()
+        for _ in range(20):
+            screen.table.action_cursor_down()
+        await pilot.pause()
+        await app.workers.wait_for_complete()
+
+        resting = screen.table.key_at(screen.table.cursor_row)
+        assert screen.selected_recipe == resting
+        assert screen.query_one(CodeTextArea).text.startswith(f'"""Recipe {int(resting.removeprefix("tips_and_tricks/recipe_"))}.')
+        assert len(parsed) == 1
+
+        # Enter on a previewed recipe runs it, so preview can be switched off.
+        await pilot.press("p")
+        screen.table.action_cursor_up()
+        await pilot.pause(screen.PREVIEW_DEBOUNCE * 3)
+        assert screen.selected_recipe == resting
+
+
+@pytest.mark.parametrize(
+    "content, lines",
+    [
+        (b"", []),
+        (b"a = 1\nb = 2\n", ["a = 1", "b = 2"]),
+        (b"a = 1\r\n\nb = 'h\xc3\xa9'", ["a = 1", "", "b = 'h\u00e9'"]),
+    ],
+)
+def test_mapped_file_indexes_lines(tmp_path: Path, content: bytes, lines: list[str]) -> None:
+
+    path = tmp_path / "recipe.py"
+    path.write_bytes(content)
+    with MappedFile(path) as mapped:
+        assert mapped.line_count == len(lines)
+        assert mapped.lines(0, 100) == lines
+        assert [mapped.line(index) for index in range(mapped.line_count)] == lines
+        assert mapped.lines(1, 1) == []
+
+
+def test_mapped_file_truncated_while_mapped(tmp_path: Path) -> None:
+
+    path = tmp_path / "recipe.py"
+    path.write_bytes(b"x = 1\n" * 10_000)
+    with MappedFile(path) as mapped:
+        # In place, so the pages past the new end can't be read any more.
+        with open(path, "r+b") as f:
+            f.truncate(12)
+        assert mapped.line_count == 10_000
+        assert mapped.lines(0, 3) == ["x = 1", "x = 1", ""]
+        assert mapped.line(1) == "x = 1"
+        assert mapped.line(9_999) == ""
+        assert mapped.lines(5_000, 5_010) == [""] * 10
+
+
+@pytest.mark.parametrize("private_theme", [True, False], ids=["text_area_theme", "public_api"])
+async def test_large_file_view_uses_the_text_area_theme(
+    private_theme: bool, monkeypatch: pytest.MonkeyPatch
+) -> None:
+
+    monkeypatch.setattr(large_file_view, "TEXT_AREA_THEME", private_theme)
+    app = CodeApp(HighlightCache())
+    async with app.run_test():
+        text_area = app.query_one(CodeTextArea)
+        text_area.theme = "monokai"
+        theme = text_area_theme(text_area)
+        assert theme.name == "monokai"
+        assert theme.base_style is not None and theme.gutter_style is not None
+        assert theme.syntax_styles == text_area._theme.syntax_styles
+        assert theme.base_style.bgcolor == text_area._theme.base_style.bgcolor  # type: ignore[union-attr]
+
+
+async def test_large_recipe_is_drawn_from_a_window(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+
+    monkeypatch.setenv("TEXTUAL_COOKBOOK_CACHE_DIR", str(tmp_path / "cache"))
+    monkeypatch.setattr(CodeContainer, "LARGE_FILE_LINES", 200)
+    recipes_dir = make_recipes_dir(tmp_path, 1)
+    body = "".join(f"def func_{index}() -> int:\n    return {index}\n\n" for index in range(1000))
+    (recipes_dir / "tips_and_tricks" / "huge.py").write_text(f'"""Huge.\n\nRecipe by Test Author"""\n{body}')
+
+    app = CookBookApp(recipes_dir=recipes_dir)
+    async with app.run_test() as pilot:
+        await wait_for_scan(app, pilot)
+        screen = app.table_screen
+        screen.show_recipe("tips_and_tricks/huge", line=2500)
+        view = screen.query_one(LargeFileView)
+        # The scroll waits for the view's first refresh, which can take more than one pause.
+        while not view.scroll_offset.y:
+            await pilot.pause(0.01)
+
+        assert view.display and not screen.query_one(CodeTextArea).display
+        assert view.line_count == 3003
+        line_index = int(view.scroll_offset.y)
+        assert 0 < line_index < 2500 < line_index + view.size.height
+
+        assert view.render_line(0).text.split()[0] == str(line_index + 1)
+        start, end = view._window
+        assert start <= line_index < end
+        assert end - start <= view.size.height + 2 * view.HIGHLIGHT_MARGIN
+        assert any(view._window_highlights.values())
+
+        # A small recipe puts the TextArea back.
+        screen.show_recipe("tips_and_tricks/recipe_00")
+        await pilot.pause()
+        assert not view.display and view.mapped_file is None
+        assert screen.query_one(CodeTextArea).text.startswith('"""Recipe 0.')
+
+
+async def test_show_recipe_clears_filter_hiding_it(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+
+    monkeypatch.setenv("TEXTUAL_COOKBOOK_CACHE_DIR", str(tmp_path / "cache"))
+    app = CookBookApp(recipes_dir=make_recipes_dir(tmp_path, 3))
+    async with app.run_test(size=(120, 40)) as pilot:
+        await wait_for_scan(app, pilot)
+        screen = app.table_screen
+        screen.table.filter_rows({"tips_and_tricks/recipe_00"})
+        assert screen.table.row_count == 1
+
+        screen.show_recipe("tips_and_tricks/recipe_02")
+        await pilot.pause()
+        assert screen.table.row_count == 3
+        assert screen.cursor_recipe() == "tips_and_tricks/recipe_02"
+        assert screen.query_one(CodeTextArea).text.startswith('"""Recipe 2.')
+
+
+async def test_resize_drag_moves_ghost_then_commits(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+
+    monkeypatch.setenv("TEXTUAL_COOKBOOK_CACHE_DIR", str(tmp_path / "cache"))
+    app = CookBookApp(recipes_dir=make_recipes_dir(tmp_path, 3))
+    async with app.run_test(size=(120, 40)) as pilot:
+        await wait_for_scan(app, pilot)
+        screen = app.table_screen
+        container, ghost = screen.query_one(CodeContainer), screen.query_one(ResizeGhost)
+        bar = container.query_one(ResizeBar)
+        width, right = container.size.width, container.region.right
+
+        await pilot.mouse_down(bar)
+        for step in range(1, 11):
+            await pilot.hover(bar, offset=(-step, 0))
+        await pilot.pause(bar.FRAME_INTERVAL * 2)
+
+        # Only the ghost has moved, and it shows the width the container will get.
+        assert container.size.width == width
+        assert ghost.display and ghost.region.x == right - (width + 10)
+
+        await pilot.mouse_up(bar, offset=(-10, 0))
+        await pilot.pause()
+        assert not ghost.display
+        assert container.size.width == width + 10
+
+
+async def test_duplicate_names_are_reported_and_kept_apart(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+
+    monkeypatch.setenv("TEXTUAL_COOKBOOK_CACHE_DIR", str(tmp_path / "cache"))
+    recipes_dir = make_recipes_dir(tmp_path, 2)
+    (recipes_dir / "animation_effects").mkdir()
+    (recipes_dir / "animation_effects" / "recipe_01.py").write_text('"""Other.\n\nRecipe by Test Author"""\n')
+
+    app = CookBookApp(recipes_dir=recipes_dir, starting_recipe="recipe_01")
+    async with app.run_test() as pilot:
+        await wait_for_scan(app, pilot)
+        await pilot.pause()
+        assert app.table_screen.table.row_count == 3
+        messages = [notification.message for notification in app._notifications]
+        assert any("animation_effects/recipe_01, tips_and_tricks/recipe_01" in message for message in messages)
+        assert any("more than one category" in message for message in messages)
+        assert app.table_screen.selected_recipe is None
+
+    app = CookBookApp(recipes_dir=recipes_dir, starting_recipe="animation_effects/recipe_01")
+    async with app.run_test() as pilot:
+        await wait_for_scan(app, pilot)
+        await pilot.pause()
+        assert app.table_screen.selected_recipe == "animation_effects/recipe_01"
+        assert app.table_screen.query_one(CodeTextArea).text.startswith('"""Other.')
@@ -0,0 +1,341 @@
+"""Tests for the recipe launchers."""
+
+from __future__ import annotations
+from collections.abc import Callable
+from pathlib import Path
+import os
+import select
+import signal
+import struct
+import subprocess
+import sys
+import time
+import pytest
+
+try:
+    import fcntl
+    import termios
+except ImportError:  # Windows
+    pass
+
+from textual_cookbook.launcher import (
+    ForkServerLauncher,
+    InProcessLauncher,
+    OutputTail,
+    SubprocessLauncher,
+    create_launcher,
+)
+from textual_cookbook.run_history import RunHistory
+
+RECIPE_SOURCE = '''import sys
+from pathlib import Path
+
+Path(sys.argv[1] if len(sys.argv) > 1 else "out.txt").write_text(f"{__name__} {Path(sys.argv[0]).name} {'textual.app' in sys.modules}")
+sys.exit(3)
+'''
+
+
+@pytest.fixture
+def recipe(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> Path:
+
+    recipe_path = tmp_path / "recipe.py"
+    recipe_path.write_text(RECIPE_SOURCE, encoding="utf-8")
+    monkeypatch.chdir(tmp_path)
+    return recipe_path
+
+
+@pytest.mark.skipif(not hasattr(os, "fork"), reason="needs os.fork")
+def test_fork_server_runs_recipes_warm(recipe: Path, tmp_path: Path) -> None:
+
+    launcher = create_launcher("fork")
+    assert isinstance(launcher, ForkServerLauncher)
+    launcher.start()
+    try:
+        result = launcher.run(recipe)
+        assert result.returncode == 3
+        assert result.wall_time > 0
+        assert result.max_rss and result.user_time is not None and result.system_time is not None
+        assert result.first_paint is None  # it never started an App
+        # Run as __main__, in the caller's working directory, with Textual already imported.
+        assert (tmp_path / "out.txt").read_text() == "__main__ recipe.py True"
+
+        broken = tmp_path / "broken.py"
+        broken.write_text("raise ValueError('boom')\n", encoding="utf-8")
+        result = launcher.run(broken)
+        assert result.returncode == 1
+        assert result.output is not None and result.output.endswith("ValueError: boom\n")
+        assert 'broken.py", line 1' in result.output
+
+        # Output is read while the child runs, and only its tail is kept.
+        flood = tmp_path / "flood.py"
+        flood.write_text("for n in range(100_000): print('line', n)\nraise SystemExit('done')\n", encoding="utf-8")
+        result = launcher.run(flood)
+        assert result.returncode == 1
+        assert result.output is not None and len(result.output) < 70_000
+        assert result.output.startswith("[") and "bytes of earlier output skipped]\nline" in result.output
+        assert result.output.endswith("line 99999\ndone\n")
+        assert launcher.run(recipe).returncode == 3  # a crash only takes down its own child
+
+        # Without its server it falls back to a new interpreter.
+        assert launcher.server is not None
+        launcher.server.kill()
+        launcher.server.wait()
+        (tmp_path / "out.txt").unlink()
+        assert launcher.run(recipe).returncode == 3
+        assert (tmp_path / "out.txt").read_text() == "__main__ recipe.py False"
+    finally:
+        launcher.close()
+    assert launcher.server is None
+
+
+@pytest.mark.skipif(not hasattr(os, "fork"), reason="needs os.fork")
+def test_fork_server_that_stops_answering_falls_back(
+    recipe: Path, tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+
+    monkeypatch.setattr(ForkServerLauncher, "PING_TIMEOUT", 0.5)
+    launcher = ForkServerLauncher()
+    launcher.start()
+    try:
+        assert launcher.server is not None
+        os.kill(launcher.server.pid, signal.SIGSTOP)
+        assert launcher.run(recipe).returncode == 3
+        assert (tmp_path / "out.txt").read_text() == "__main__ recipe.py False"
+        assert launcher.server is None
+    finally:
+        launcher.close()
+
+
+@pytest.mark.skipif(not hasattr(os, "fork"), reason="needs os.fork")
+def test_fork_server_dying_during_a_run_fails_it(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+
+    monkeypatch.chdir(tmp_path)
+    recipe_path = tmp_path / "kill_server.py"
+    recipe_path.write_text(
+        "import os, signal\n"
+        "with open('runs.txt', 'a') as runs:\n"
+        "    runs.write('run\\n')\n"
+        "os.kill(os.getppid(), signal.SIGKILL)\n",
+        encoding="utf-8",
+    )
+    launcher = ForkServerLauncher()
+    launcher.start()
+    try:
+        result = launcher.run(recipe_path)
+        assert result.returncode == 1
+        assert result.output is not None and "fork server exited" in result.output
+        # Not run a second time by the fallback.
+        assert (tmp_path / "runs.txt").read_text() == "run\n"
+    finally:
+        launcher.close()
+
+
+def test_subprocess_launcher(recipe: Path, tmp_path: Path) -> None:
+
+    assert isinstance(create_launcher(), SubprocessLauncher)
+    assert isinstance(create_launcher("subprocess"), SubprocessLauncher)
+    assert SubprocessLauncher().run(recipe).returncode == 3
+    # A new interpreter, without Textual imported for it.
+    assert (tmp_path / "out.txt").read_text() == "__main__ recipe.py False"
+
+
+@pytest.mark.skipif(not hasattr(os, "wait4"), reason="needs os.wait4")
+def test_subprocess_launcher_captures_output(tmp_path: Path) -> None:
+
+    broken = tmp_path / "broken.py"
+    broken.write_text("print('loading')\nraise ValueError('boom')\n", encoding="utf-8")
+    result = SubprocessLauncher().run(broken)
+    assert result.returncode == 1
+    assert result.output is not None
+    assert result.output.startswith("loading\n") and result.output.endswith("ValueError: boom\n")
+    assert 'broken.py", line 2' in result.output and "launcher.py" not in result.output
+    assert result.max_rss and result.first_paint is None
+
+    exits = tmp_path / "exits.py"
+    exits.write_text("raise SystemExit('bad config')\n", encoding="utf-8")
+    result = SubprocessLauncher().run(exits)
+    assert (result.returncode, result.output) == (1, "bad config\n")
+
+
+APP_SOURCE = '''from textual.app import App
+
+RUNS = []
+
+
+class ExitApp(App[None]):
+
+    def on_ready(self) -> None:
+        RUNS.append(self)
+        self.call_after_refresh(self.exit, return_code={code})
+
+
+if __name__ == "__main__":
+    raise SystemExit("not run as __main__")
+'''
+
+
+async def test_inprocess_launcher_caches_recipes_by_mtime(tmp_path: Path) -> None:
+
+    recipe_path = tmp_path / "exit_app.py"
+    recipe_path.write_text(APP_SOURCE.format(code=3), encoding="utf-8")
+    assert isinstance(create_launcher("inprocess"), InProcessLauncher)
+    launcher = InProcessLauncher(headless=True)
+
+    # Runs on this test's event loop, like it would on the cookbook's.
+    result = await launcher.run_async(recipe_path)
+    assert result.returncode == 3
+    assert result.first_paint is not None and 0 < result.first_paint < result.wall_time
+    app_class = launcher.load(recipe_path)
+    assert (await launcher.run_async(recipe_path)).returncode == 3
+    # The second run came from the same module, it wasn't imported again.
+    assert launcher.load(recipe_path) is app_class
+    assert len(sys.modules[app_class.__module__].RUNS) == 2
+
+    recipe_path.write_text(APP_SOURCE.format(code=4), encoding="utf-8")
+    os.utime(recipe_path, ns=(0, recipe_path.stat().st_mtime_ns + 1))
+    assert (await launcher.run_async(recipe_path)).returncode == 4
+    assert launcher.load(recipe_path) is not app_class
+
+    recipe_path.write_text("print('loading')\nraise ValueError('boom')\n", encoding="utf-8")
+    os.utime(recipe_path, ns=(0, recipe_path.stat().st_mtime_ns + 2))
+    stdout = sys.stdout
+    result = await launcher.run_async(recipe_path)
+    assert result.returncode == 1
+    assert result.output is not None
+    assert result.output.startswith("loading\n") and result.output.endswith("ValueError: boom\n")
+    assert sys.stdout is stdout
+
+
+def test_inprocess_launcher_runs_outside_an_event_loop(tmp_path: Path) -> None:
+
+    recipe_path = tmp_path / "exit_app_sync.py"
+    recipe_path.write_text(APP_SOURCE.format(code=5), encoding="utf-8")
+    result = InProcessLauncher(headless=True).run(recipe_path)
+    assert result.returncode == 5
+    assert result.first_paint is not None
+
+
+@pytest.mark.skipif(not hasattr(os, "fork"), reason="needs os.fork")
+def test_fork_server_times_first_paint(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+
+    monkeypatch.chdir(tmp_path)
+    recipe_path = tmp_path / "exit_app_main.py"
+    source = APP_SOURCE.format(code=6).replace('raise SystemExit("not run as __main__")', "ExitApp().run(headless=True)")
+    recipe_path.write_text(source + "raise SystemExit(6)\n", encoding="utf-8")
+    launcher = ForkServerLauncher()
+    launcher.start()
+    try:
+        result = launcher.run(recipe_path)
+        assert result.returncode == 6
+        assert result.first_paint is not None and 0 < result.first_paint < result.wall_time
+    finally:
+        launcher.close()
+
+
+SLOW_APP_SOURCE = '''"""Slow app.
+
+Recipe by Test Author"""
+
+from pathlib import Path
+from textual.app import App
+
+
+class SlowApp(App[None]):
+
+    def on_ready(self) -> None:
+        Path("ran.txt").write_text("ran")
+        # Long enough for the cookbook's title animation to fill its writer's queue.
+        self.set_timer(1.5, self.exit)
+'''
+
+COOKBOOK_SCRIPT = """import sys
+from pathlib import Path
+from textual_cookbook.main import CookBookApp
+
+CookBookApp(starting_recipe="slow_app", run=True, recipes_dir=Path(sys.argv[1]), launcher="inprocess").run()
+"""
+
+
+def _read_until(fd: int, output: bytearray, done: Callable[[], bool], timeout: float) -> bool:
+
+    deadline = time.monotonic() + timeout
+    while not done() and time.monotonic() < deadline:
+        readable, _, _ = select.select([fd], [], [], 0.05)
+        if readable:
+            try:
+                output += os.read(fd, 65536)
+            except OSError:  # the other end is closed
+                break
+    return done()
+
+
+@pytest.mark.skipif(not hasattr(os, "openpty"), reason="needs a pty")
+def test_inprocess_launcher_in_a_terminal(tmp_path: Path) -> None:
+
+    recipes_dir = tmp_path / "recipes"
+    (recipes_dir / "tips_and_tricks").mkdir(parents=True)
+    (recipes_dir / "tips_and_tricks" / "slow_app.py").write_text(SLOW_APP_SOURCE, encoding="utf-8")
+    script = tmp_path / "cookbook.py"
+    script.write_text(COOKBOOK_SCRIPT, encoding="utf-8")
+
+    # The cookbook with a real driver, in a terminal of its own.
+    master, slave = os.openpty()
+    fcntl.ioctl(slave, termios.TIOCSWINSZ, struct.pack("HHHH", 30, 120, 0, 0))
+    env = dict(os.environ, TERM="xterm-256color", TEXTUAL_COOKBOOK_CACHE_DIR=str(tmp_path / "cache"))
+    process = subprocess.Popen(
+        [sys.executable, str(script), str(recipes_dir)],
+        stdin=slave, stdout=slave, stderr=slave, cwd=tmp_path, env=env, start_new_session=True,
+    )
+    os.close(slave)
+    output = bytearray()
+    try:
+        # The cookbook, then the recipe, then the cookbook again switch to the alternate screen.
+        resumed = _read_until(master, output, lambda: output.count(b"\x1b[?1049h") >= 3, timeout=30)
+        assert resumed, output[-2000:].decode(errors="replace")
+        assert (tmp_path / "ran.txt").read_text() == "ran"
+        # And it still takes input.
+        os.write(master, b"\x11")  # ctrl+q
+        _read_until(master, output, lambda: process.poll() is not None, timeout=15)
+        assert process.wait(timeout=5) == 0
+        # The run was timed from the recipe's first frame on a real terminal too.
+        [run] = RunHistory(tmp_path / "cache" / "run_history.sqlite3").runs("tips_and_tricks/slow_app")
+        assert run.returncode == 0
+        assert run.first_paint is not None and 0 < run.first_paint < 1.5 < run.wall_time
+    finally:
+        if process.poll() is None:
+            process.kill()
+            process.wait()
+        os.close(master)
+
+
+def test_output_tail_keeps_the_last_bytes() -> None:
+
+    tail = OutputTail(capacity=10)
+    tail.write(b"abc\n")
+    assert tail.text() == "abc\n"
+    tail.write(b"defg\nhij\n")
+    # Full, and the oldest byte is dropped along with the rest of its line.
+    tail.write(b"k")
+    assert bytes(tail.buffer) == b"defg\nhij\nk"
+    assert tail.text() == "[9 bytes of earlier output skipped]\nhij\nk"
+    tail.write(b"x" * 25)
+    assert bytes(tail.buffer) == b"x" * 10
+    assert tail.dropped == 4 + 10 + 15
+
+
+async def test_error_screen_shows_captured_output() -> None:
+
+    from subprocess import CalledProcessError
+    from textual.app import App
+    from textual.widgets import Log
+    from textual_cookbook.main import ErrorScreen
+
+    output = "".join(f"line {n}\n" for n in range(500)) + "\x1b[31mValueError\x1b[0m: boom\n"
+    app: App[None] = App()
+    async with app.run_test() as pilot:
+        await app.push_screen(ErrorScreen(CalledProcessError(1, ["python", "recipe.py"], output=output)))
+        await pilot.pause()
+        log = app.screen.query_one(Log)
+        assert log.line_count == 501
+        assert log.lines[-2:] == ["ValueError: boom", ""]
+        assert log.scroll_offset.y == log.max_scroll_y > 0
@@ -0,0 +1,47 @@
+"""Tests for the extracted recipe file cache."""
+
+from __future__ import annotations
+from pathlib import Path
+import os
+import zipfile
+
+from textual_cookbook.launcher import SubprocessLauncher
+from textual_cookbook.recipe_files import RecipeFileCache
+
+
+def test_zipped_recipes_are_extracted_and_compiled_once(tmp_path: Path) -> None:
+
+    archive = tmp_path / "cookbook.zip"
+    with zipfile.ZipFile(archive, "w") as zf:
+        zf.writestr("textual_cookbook/recipes/demo.py", "import sys\nprint(__name__)\nsys.exit(3)\n")
+        zf.writestr("textual_cookbook/recipes/broken.py", "def broken(:\n")
+    recipes = zipfile.Path(archive, "textual_cookbook/recipes/")
+    cache = RecipeFileCache(tmp_path / "cache")
+
+    with cache.open(recipes / "demo.py") as recipe_path:
+        assert recipe_path.suffix == ".pyc" and recipe_path.with_name("demo.py").exists()
+        result = SubprocessLauncher().run(recipe_path)
+        assert result.returncode == 3
+    # Still there, and reused as is.
+    assert recipe_path.exists()
+    os.utime(recipe_path, ns=(0, 0))
+    with cache.open(recipes / "demo.py") as again:
+        assert again == recipe_path
+    assert recipe_path.stat().st_mtime_ns == 0
+
+    # A recipe that doesn't compile is run from source.
+    with cache.open(recipes / "broken.py") as broken_path:
+        assert broken_path.name == "broken.py"
+
+    # Files on disk are used where they are.
+    on_disk = tmp_path / "on_disk.py"
+    on_disk.write_text("pass\n")
+    with cache.open(on_disk) as recipe_path:
+        assert recipe_path == on_disk
+
+    # Entries that haven't been used for a while are removed.
+    entries = list(cache.root.iterdir())
+    assert len(entries) == 2
+    os.utime(entries[0], (0, 0))
+    cache.prune()
+    assert list(cache.root.iterdir()) == entries[1:]
@@ -0,0 +1,274 @@
+"""Tests for recipe discovery and the recipe index cache."""
+
+from __future__ import annotations
+from pathlib import Path
+import os
+import pytest
+
+from textual_cookbook import recipe_index
+from textual_cookbook.recipe_index import RecipeIndexCache, RecipeSourceCache, scan_recipes
+
+
+RECIPE_SOURCE = '''"""Shows how to do a thing.
+
+Recipe by Test Author"""
+
+print("hello")
+'''
+
+
+@pytest.fixture
+def recipes_dir(tmp_path: Path) -> Path:
+
+    recipes = tmp_path / "recipes"
+    for category, name in [("animation_effects", "spin"), ("tips_and_tricks", "timer")]:
+        (recipes / category).mkdir(parents=True)
+        (recipes / category / f"{name}.py").write_text(RECIPE_SOURCE, encoding="utf-8")
+    return recipes
+
+
+def test_scan_extracts_metadata(recipes_dir: Path) -> None:
+
+    recipe_data_dict = scan_recipes(recipes_dir)
+    assert set(recipe_data_dict) == {"animation_effects/spin", "tips_and_tricks/timer"}
+    spin = recipe_data_dict["animation_effects/spin"]
+    assert spin["category"] == "animation_effects"
+    assert spin["author"] == "Test Author"
+    assert spin["description"].startswith("Shows how to do a thing.")
+
+
+def test_scan_only_reads_category_directories(recipes_dir: Path) -> None:
+
+    (recipes_dir / "helper.py").write_text(RECIPE_SOURCE, encoding="utf-8")
+    (recipes_dir / "tips_and_tricks" / "nested").mkdir()
+    (recipes_dir / "tips_and_tricks" / "nested" / "timer.py").write_text(RECIPE_SOURCE, encoding="utf-8")
+
+    recipe_data_dict = scan_recipes(recipes_dir)
+    assert set(recipe_data_dict) == {"animation_effects/spin", "tips_and_tricks/timer"}
+    for key, recipe_data in recipe_data_dict.items():
+        assert recipe_index.path_to_key(recipe_data["path"]) == key
+    assert recipe_index.build_manifest(recipes_dir).keys() == {"animation_effects/spin.py", "tips_and_tricks/timer.py"}
+
+
+def test_warm_scan_does_not_read_files(
+    recipes_dir: Path, tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+
+    cache_dir = tmp_path / "cache"
+    cold = scan_recipes(recipes_dir, RecipeIndexCache(recipes_dir, cache_dir))
+
+    def fail_read(recipe_file: Path) -> bytes:
+        raise AssertionError(f"{recipe_file} was read on a warm start")
+
+    monkeypatch.setattr(recipe_index, "read_recipe", fail_read)
+    warm = scan_recipes(recipes_dir, RecipeIndexCache(recipes_dir, cache_dir))
+    assert warm == cold
+
+
+def test_changed_and_removed_recipes_invalidate(recipes_dir: Path, tmp_path: Path) -> None:
+
+    cache_dir = tmp_path / "cache"
+    scan_recipes(recipes_dir, RecipeIndexCache(recipes_dir, cache_dir))
+
+    spin = recipes_dir / "animation_effects" / "spin.py"
+    spin.write_text(RECIPE_SOURCE.replace("Test Author", "Someone Else"), encoding="utf-8")
+    stat = spin.stat()
+    os.utime(spin, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000))
+    (recipes_dir / "tips_and_tricks" / "timer.py").unlink()
+
+    cache = RecipeIndexCache(recipes_dir, cache_dir)
+    recipe_data_dict = scan_recipes(recipes_dir, cache)
+    assert set(recipe_data_dict) == {"animation_effects/spin"}
+    assert recipe_data_dict["animation_effects/spin"]["author"] == "Someone Else"
+    assert set(cache.entries) == {"animation_effects/spin.py"}
+
+
+def test_parallel_scan_matches_serial(
+    recipes_dir: Path, tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+
+    serial = scan_recipes(recipes_dir, max_workers=1)
+    monkeypatch.setattr(recipe_index, "PARALLEL_THRESHOLD", 0)
+    parallel = scan_recipes(recipes_dir, RecipeIndexCache(recipes_dir, tmp_path / "cache"), max_workers=2)
+    assert list(parallel) == list(serial)
+    assert parallel == serial
+
+
+def test_index_does_not_keep_source(recipes_dir: Path) -> None:
+
+    spin = scan_recipes(recipes_dir)["animation_effects/spin"]
+    assert spin["path"] == "animation_effects/spin.py"
+    assert "text_blob" not in spin
+
+
+def test_source_cache_is_bounded(recipes_dir: Path) -> None:
+
+    recipe_data_dict = scan_recipes(recipes_dir)
+    size = len(RECIPE_SOURCE.encode())
+    source_cache = RecipeSourceCache(recipes_dir, max_bytes=size)
+
+    assert source_cache.get(recipe_data_dict["animation_effects/spin"]) == RECIPE_SOURCE
+    assert source_cache.get(recipe_data_dict["tips_and_tricks/timer"]) == RECIPE_SOURCE
+    # Only one recipe fits, so loading the second evicted the first.
+    assert len(source_cache) == 1
+    assert source_cache.current_bytes == size
+
+    source_cache = RecipeSourceCache(recipes_dir, max_bytes=size - 1)
+    assert source_cache.get(recipe_data_dict["animation_effects/spin"]) == RECIPE_SOURCE
+    assert len(source_cache) == 0
+
+
+def test_manifest_serves_recipes_without_parsing(
+    recipes_dir: Path, tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+
+    manifest_path = tmp_path / recipe_index.MANIFEST_NAME
+    assert recipe_index.write_manifest(recipes_dir, manifest_path) == 2
+    (recipes_dir / "tips_and_tricks" / "added_later.py").write_text(RECIPE_SOURCE, encoding="utf-8")
+
+    parsed: list[str] = []
+    real_extract = recipe_index.extract_recipe_data
+
+    def tracking_extract(recipe_file: Path, text_blob: str) -> recipe_index.RecipeData:
+        parsed.append(recipe_file.name)
+        return real_extract(recipe_file, text_blob)
+
+    monkeypatch.setattr(recipe_index, "extract_recipe_data", tracking_extract)
+    cache_dir = tmp_path / "cache"
+    recipe_data_dict = scan_recipes(recipes_dir, RecipeIndexCache(recipes_dir, cache_dir), manifest_path=manifest_path)
+
+    assert set(recipe_data_dict) == {"animation_effects/spin", "tips_and_tricks/timer", "tips_and_tricks/added_later"}
+    assert recipe_data_dict["animation_effects/spin"]["line_count"] == 5
+    # Only the recipe added after the manifest was built had to be parsed.
+    assert parsed == ["added_later.py"]
+
+    # The hashes checked against the manifest are in the index now.
+    def fail_read(recipe_file: Path) -> bytes:
+        raise AssertionError(f"{recipe_file} was read on a warm start")
+
+    monkeypatch.setattr(recipe_index, "read_recipe", fail_read)
+    assert scan_recipes(recipes_dir, RecipeIndexCache(recipes_dir, cache_dir), manifest_path=manifest_path) == (
+        recipe_data_dict
+    )
+
+
+def test_manifest_rejects_same_size_edit(recipes_dir: Path, tmp_path: Path) -> None:
+
+    manifest_path = tmp_path / recipe_index.MANIFEST_NAME
+    recipe_index.write_manifest(recipes_dir, manifest_path)
+    spin = recipes_dir / "animation_effects" / "spin.py"
+    edited = RECIPE_SOURCE.replace("Test Author", "Test Editor")
+    assert len(edited) == len(RECIPE_SOURCE)
+    spin.write_text(edited, encoding="utf-8")
+
+    recipe_data_dict = scan_recipes(recipes_dir, manifest_path=manifest_path)
+    assert recipe_data_dict["animation_effects/spin"]["author"] == "Test Editor"
+    assert recipe_data_dict["tips_and_tricks/timer"]["author"] == "Test Author"
+
+
+def test_ast_extractor_reads_structure(tmp_path: Path) -> None:
+
+    recipe_file = tmp_path / "styling_and_colors" / "raw_doc.py"
+    recipe_file.parent.mkdir()
+    source = (
+        "r'''Single quoted raw docstring with a \\d backslash.\n\n"
+        "Recipe by Someone'''\n\n"
+        "from textual.app import App, ComposeResult\n"
+        "from textual.widgets import Button, Label\n\n"
+        "class BaseApp(App[None]):\n"
+        "    def compose(self) -> ComposeResult:\n"
+        "        yield Button('hi')\n\n"
+        "class RawApp(BaseApp):\n"
+        "    pass\n"
+    )
+    recipe_file.write_text(source, encoding="utf-8")
+
+    recipe_data = recipe_index.extract_recipe_data(recipe_file, source)
+    assert recipe_data["description"].startswith("Single quoted raw docstring with a \\d backslash.")
+    assert recipe_data["author"] == "Someone"
+    assert recipe_data["app_class"] == "BaseApp"
+    assert recipe_data["textual_apis"] == [
+        "textual.app.App",
+        "textual.app.ComposeResult",
+        "textual.widgets.Button",
+        "textual.widgets.Label",
+    ]
+    # Label is imported but never used.
+    assert recipe_data["widgets"] == ["Button"]
+
+
+def test_unparseable_recipe_falls_back_to_text(tmp_path: Path) -> None:
+
+    source = '"""Broken recipe.\n\nRecipe by Someone"""\n\ndef broken(:\n'
+    recipe_data = recipe_index.extract_recipe_data(tmp_path / "broken.py", source)
+    assert recipe_data["author"] == "Someone"
+    assert recipe_data["description"].startswith("Broken recipe.")
+    assert recipe_data["app_class"] == ""
+
+
+def test_rescan_only_touches_given_paths(recipes_dir: Path, tmp_path: Path) -> None:
+
+    cache = RecipeIndexCache(recipes_dir, tmp_path / "cache")
+    scan_recipes(recipes_dir, cache)
+    (recipes_dir / "tips_and_tricks" / "timer.py").unlink()
+    (recipes_dir / "tips_and_tricks" / "added.py").write_text(RECIPE_SOURCE, encoding="utf-8")
+
+    updated, removed = recipe_index.rescan_recipes(
+        recipes_dir, {"tips_and_tricks/timer.py", "tips_and_tricks/added.py"}, cache
+    )
+    assert [recipe_data["name"] for recipe_data in updated] == ["added"]
+    assert removed == ["tips_and_tricks/timer.py"]
+    assert set(cache.entries) == {"animation_effects/spin.py", "tips_and_tricks/added.py"}
+
+
+def test_rescan_drops_recipes_it_cannot_read(
+    recipes_dir: Path, tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+
+    cache = RecipeIndexCache(recipes_dir, tmp_path / "cache")
+    scan_recipes(recipes_dir, cache)
+    # Saved in another encoding.
+    (recipes_dir / "tips_and_tricks" / "timer.py").write_bytes(RECIPE_SOURCE.replace("Test", "T\xe9st").encode("latin-1"))
+    # Deleted between the watcher's event and the read.
+    spin = recipes_dir / "animation_effects" / "spin.py"
+    spin.write_text(RECIPE_SOURCE + "# edited\n", encoding="utf-8")
+    read_recipe = recipe_index.read_recipe
+
+    def read_deleted(recipe_file: Path) -> bytes:
+        if recipe_file == spin:
+            spin.unlink()
+        return read_recipe(recipe_file)
+
+    monkeypatch.setattr(recipe_index, "read_recipe", read_deleted)
+    updated, removed = recipe_index.rescan_recipes(
+        recipes_dir, {"animation_effects/spin.py", "tips_and_tricks/timer.py"}, cache
+    )
+    assert updated == []
+    assert removed == ["animation_effects/spin.py", "tips_and_tricks/timer.py"]
+    assert cache.entries == {}
+
+    # Back once it's UTF-8 again.
+    (recipes_dir / "tips_and_tricks" / "timer.py").write_text(RECIPE_SOURCE, encoding="utf-8")
+    updated, removed = recipe_index.rescan_recipes(recipes_dir, {"tips_and_tricks/timer.py"}, cache)
+    assert [recipe_data["name"] for recipe_data in updated] == ["timer"] and removed == []
+
+
+def test_catalog_keeps_duplicate_names_apart(recipes_dir: Path) -> None:
+
+    (recipes_dir / "tips_and_tricks" / "spin.py").write_text(RECIPE_SOURCE.replace("Test Author", "Other"), encoding="utf-8")
+    catalog = scan_recipes(recipes_dir)
+    assert len(catalog) == 3
+    assert catalog.duplicates() == {"spin": ["animation_effects/spin", "tips_and_tricks/spin"]}
+    assert catalog.resolve("spin") == ["animation_effects/spin", "tips_and_tricks/spin"]
+    assert catalog.resolve("tips_and_tricks/spin") == ["tips_and_tricks/spin"]
+    assert catalog.resolve("timer") == ["tips_and_tricks/timer"]
+    assert catalog.by_category["tips_and_tricks"] == {"tips_and_tricks/spin", "tips_and_tricks/timer"}
+    assert catalog.by_author["other"] == {"tips_and_tricks/spin"}
+
+    # Replacing a recipe moves it between lookups, removing the last one drops the entry.
+    renamed = dict(catalog["tips_and_tricks/spin"], author="Test Author")
+    assert catalog.add([renamed]) == []  # type: ignore[list-item]
+    assert "other" not in catalog.by_author
+    catalog.remove(["animation_effects/spin"])
+    assert catalog.duplicates() == {}
+    assert catalog.resolve("spin") == ["tips_and_tricks/spin"]
@@ -0,0 +1,33 @@
+"""Tests for the recipe run history."""
+
+from __future__ import annotations
+from pathlib import Path
+
+from textual_cookbook.launcher import RunResult
+from textual_cookbook.run_history import RunHistory
+
+
+def test_history_keeps_every_run_and_reports_the_latest(tmp_path: Path) -> None:
+
+    db_path = tmp_path / "cache" / "run_history.sqlite3"
+    history = RunHistory(db_path)
+    assert not db_path.exists()  # only opened when it's used
+    history.record("widgets/spinner", RunResult(0, 1.5, 0.2, 0.8, 0.1, 50_000_000))
+    history.record("widgets/spinner", RunResult(1, 0.5))
+    history.record("tips/timer", RunResult(0, 2.0, None, 1.0, 0.2, 60_000_000))
+    history.close()
+
+    reopened = RunHistory(db_path)
+    assert reopened.latest() == {
+        "widgets/spinner": RunResult(1, 0.5),
+        "tips/timer": RunResult(0, 2.0, None, 1.0, 0.2, 60_000_000),
+    }
+    assert [run.returncode for run in reopened.runs("widgets/spinner")] == [0, 1]
+    reopened.close()
+
+    # A history that can't be written is left alone.
+    (tmp_path / "file").write_text("")
+    broken = RunHistory(tmp_path / "file" / "run_history.sqlite3")
+    broken.record("tips/timer", RunResult(0, 1.0))
+    assert broken.latest() == {}
+    assert not broken.available
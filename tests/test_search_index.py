@@ -0,0 +1,120 @@
+"""Tests for the full-text search index."""
+
+from __future__ import annotations
+from pathlib import Path
+import pytest
+
+from textual_cookbook import search_index
+from textual_cookbook.recipe_index import scan_recipes
+from textual_cookbook.search_index import SearchIndex, tokenize_source
+
+
+SPIN_SOURCE = '''"""Shows a spinner while a worker runs.
+
+Recipe by Test Author"""
+
+def on_mount(self):
+    self.call_from_thread(self.refresh)
+    self.call_from_thread(self.refresh)
+'''
+
+TIMER_SOURCE = '''"""A timer inside a worker.
+
+Recipe by Test Author"""
+
+def on_mount(self):
+    self.set_interval(1, self.tick)
+    self.call_from_thread(self.tick)
+'''
+
+
+@pytest.fixture
+def recipes_dir(tmp_path: Path) -> Path:
+
+    recipes = tmp_path / "recipes"
+    for category, name, source in [("animation_effects", "spin", SPIN_SOURCE), ("tips_and_tricks", "timer", TIMER_SOURCE)]:
+        (recipes / category).mkdir(parents=True)
+        (recipes / category / f"{name}.py").write_text(source, encoding="utf-8")
+    return recipes
+
+
+def build_index(recipes_dir: Path, cache_dir: Path) -> SearchIndex:
+
+    index = SearchIndex(recipes_dir, cache_dir)
+    index.refresh(scan_recipes(recipes_dir).values())
+    return index
+
+
+def test_tokenize_source_records_lines() -> None:
+
+    tokens = tokenize_source("import Foo\nfoo = Foo()\nx = 1\n")
+    assert tokens["foo"] == [1, 2]
+    assert tokens["import"] == [1]
+    assert "x" not in tokens  # single characters aren't indexed
+
+
+def test_search_ranks_and_reports_lines(recipes_dir: Path, tmp_path: Path) -> None:
+
+    index = build_index(recipes_dir, tmp_path / "cache")
+    hits = index.search("call_from_thread")
+    assert [hit.name for hit in hits] == ["spin", "timer"]  # spin uses it twice
+    assert hits[0].lines == [6, 7]
+    assert hits[0].path == "animation_effects/spin.py"
+
+    # Terms match inside tokens and must all match.
+    assert [hit.name for hit in index.search("interval")] == ["timer"]
+    assert [hit.name for hit in index.search("worker FROM_THREAD")] == ["spin", "timer"]
+    assert index.search("spinner interval") == []
+    assert index.search("  ") == []
+
+    # The recipe name counts for ranking, the docstring is indexed with the source.
+    assert [hit.name for hit in index.search("timer")] == ["timer"]
+    assert index.search("spin")[0].name == "spin"
+
+
+def test_refresh_only_reads_changed_recipes(
+    recipes_dir: Path, tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+
+    cache_dir = tmp_path / "cache"
+    build_index(recipes_dir, cache_dir)
+
+    timer = recipes_dir / "tips_and_tricks" / "timer.py"
+    timer.write_text(TIMER_SOURCE + "\nmagic_number = 42\n", encoding="utf-8")
+    (recipes_dir / "animation_effects" / "spin.py").unlink()
+
+    read: list[str] = []
+    original_read = search_index.read_recipe
+
+    def tracking_read(recipe_file: Path) -> bytes:
+        read.append(recipe_file.name)
+        return original_read(recipe_file)
+
+    monkeypatch.setattr(search_index, "read_recipe", tracking_read)
+    index = SearchIndex(recipes_dir, cache_dir)
+    assert index.refresh(scan_recipes(recipes_dir).values()) == 1
+    assert read == ["timer.py"]
+    assert [hit.name for hit in index.search("magic_number")] == ["timer"]
+    assert index.search("spinner") == []
+
+    # Saved, so nothing is read next time.
+    read.clear()
+    assert SearchIndex(recipes_dir, cache_dir).refresh(scan_recipes(recipes_dir).values()) == 0
+    assert read == []
+
+
+def test_update_applies_live_changes(recipes_dir: Path, tmp_path: Path) -> None:
+
+    index = SearchIndex(recipes_dir, tmp_path / "cache")
+    recipes = scan_recipes(recipes_dir)
+
+    # Changes made before the first refresh are held until it's done.
+    index.update([], ["tips_and_tricks/timer.py"])
+    index.refresh(recipes.values())
+    assert [hit.name for hit in index.search("call_from_thread")] == ["spin"]
+
+    spin = recipes_dir / "animation_effects" / "spin.py"
+    spin.write_text(SPIN_SOURCE.replace("call_from_thread", "post_message"), encoding="utf-8")
+    index.update([recipes["animation_effects/spin"]], [])
+    assert index.search("call_from_thread") == []
+    assert index.search("post_message")[0].lines == [6, 7]
@@ -0,0 +1,449 @@
+"""Tests for the recipe table."""
+
+from __future__ import annotations
+import pytest
+
+from textual.app import App, ComposeResult
+from textual.coordinate import Coordinate
+from textual.widgets import Static
+from rich.text import Text
+from textual.widgets.data_table import ColumnKey, RowKey
+
+from textual_cookbook import table_rows
+from textual_cookbook.launcher import RunResult
+from textual_cookbook.main import (
+    CustomDataTable,
+    RecipeCell,
+    RecipeFinderScreen,
+)
+from textual_cookbook.recipe_filter import RecipeFilter
+from textual_cookbook.recipe_finder import RecipeFinder
+from textual_cookbook.recipe_index import RecipeCatalog, RecipeData
+from textual_cookbook.recipe_tree import RecipeTree
+
+
+def make_recipe(
+    name: str, category: str = "tips_and_tricks", author: str = "Test Author", description: str = ""
+) -> RecipeData:
+    return {
+        "name": name,
+        "category": category,
+        "author": author,
+        "description": description,
+        "path": f"{category}/{name}.py",
+        "line_count": 1,
+        "app_class": "",
+        "textual_apis": [],
+        "widgets": [],
+    }
+
+
+@pytest.fixture(params=[True, False], ids=["fast_rows", "public_api"])
+def fast_rows(request: pytest.FixtureRequest, monkeypatch: pytest.MonkeyPatch) -> bool:
+    "Run a table test with and without the DataTable internals of the supported Textual versions."
+
+    monkeypatch.setattr(table_rows, "FAST_ROWS", request.param)
+    return request.param
+
+
+class TableApp(App[None]):
+
+    def __init__(self, recipe_data_dict: dict[str, RecipeData]) -> None:
+        super().__init__()
+        self.recipe_data_dict = recipe_data_dict
+
+    def compose(self) -> ComposeResult:
+        yield CustomDataTable(self.recipe_data_dict)
+
+
+async def test_bulk_load_builds_rows_and_widths(fast_rows: bool) -> None:
+
+    recipe_data_dict = {
+        name: make_recipe(name, author=author)
+        for name, author in [("spin", "A"), ("a_much_longer_recipe_name", "Somebody Else")]
+    }
+    app = TableApp(recipe_data_dict)
+    async with app.run_test() as pilot:
+        await pilot.pause()
+        table = app.query_one(CustomDataTable)
+        assert table.row_count == 2
+        assert [str(cell) for cell in table.get_row_at(1)] == ["a_much_longer_recipe_name", "tips_and_tricks", "Somebody Else"]
+        assert all(isinstance(cell, RecipeCell) for cell in table.get_row_at(0))
+        widths = [column.content_width for column in table.ordered_columns]
+        assert widths == [len("a_much_longer_recipe_name"), len("tips_and_tricks"), len("Somebody Else")]
+        assert table.virtual_size.height == 3  # header + 2 rows
+        assert table.cursor_row == 0
+
+
+async def test_add_recipes_skips_existing_rows(fast_rows: bool) -> None:
+
+    app = TableApp({"spin": make_recipe("spin")})
+    async with app.run_test() as pilot:
+        await pilot.pause()
+        table = app.query_one(CustomDataTable)
+        table.add_recipes([make_recipe("spin"), make_recipe("timer"), make_recipe("fade")])
+        await pilot.pause()
+        assert [str(table.get_row_at(index)[0]) for index in range(table.row_count)] == ["spin", "timer", "fade"]
+        assert table.get_row_index("tips_and_tricks/fade") == 2
+        assert table.virtual_size.height == 4
+
+
+async def test_sort_is_case_insensitive_and_stable(fast_rows: bool) -> None:
+
+    recipes = [
+        make_recipe("b_recipe", category="beta", author="zed"),
+        make_recipe("A_recipe", category="Alpha", author="amy"),
+        make_recipe("c_recipe", category="alpha", author="Zed"),
+        make_recipe("d_recipe", category="beta", author="Amy"),
+    ]
+    app = TableApp({recipe_data["name"]: recipe_data for recipe_data in recipes})
+    async with app.run_test() as pilot:
+        await pilot.pause()
+        table = app.query_one(CustomDataTable)
+
+        def names() -> list[str]:
+            return [str(table.get_row_at(index)[0]) for index in range(table.row_count)]
+
+        table.sort("name")
+        assert names() == ["A_recipe", "b_recipe", "c_recipe", "d_recipe"]
+        table.sort("name", reverse=True)
+        assert names() == ["d_recipe", "c_recipe", "b_recipe", "A_recipe"]
+
+        # Ties keep the order of the previous sort, in both directions.
+        table.sort("name")
+        table.sort(ColumnKey("category"))
+        assert names() == ["A_recipe", "c_recipe", "b_recipe", "d_recipe"]
+        table.sort("category", reverse=True)
+        assert names() == ["b_recipe", "d_recipe", "A_recipe", "c_recipe"]
+        table.sort("author")
+        assert names() == ["d_recipe", "A_recipe", "b_recipe", "c_recipe"]
+
+        # New rows drop the cached ranks.
+        table.add_recipes([make_recipe("0_recipe", author="mid")])
+        table.sort("author")
+        assert names() == ["d_recipe", "A_recipe", "0_recipe", "b_recipe", "c_recipe"]
+
+
+async def test_header_sorts_by_column_key(fast_rows: bool) -> None:
+
+    recipes = [
+        make_recipe("b_recipe", category="beta"),
+        make_recipe("a_recipe", category="Gamma"),
+        make_recipe("c_recipe", category="alpha"),
+    ]
+    app = TableApp({recipe_data["name"]: recipe_data for recipe_data in recipes})
+    async with app.run_test() as pilot:
+        await pilot.pause()
+        table = app.query_one(CustomDataTable)
+
+        def names() -> list[str]:
+            return [str(table.get_row_at(index)[0]) for index in range(table.row_count)]
+
+        # The table's own ColumnKey, as DataTable passes it with HeaderSelected.
+        column_key = table.ordered_columns[1].key
+        table.sort_column(table.columns[column_key], column_key)
+        assert names() == ["a_recipe", "b_recipe", "c_recipe"]
+        table.sort_column(table.columns[column_key], column_key)
+        assert names() == ["c_recipe", "b_recipe", "a_recipe"]
+
+        await pilot.click(CustomDataTable, offset=(2, 0))
+        await pilot.pause()
+        assert table.sort_status["name"] == CustomDataTable.SortingStatus.ASCENDING
+        assert names() == ["c_recipe", "b_recipe", "a_recipe"]
+
+
+async def test_filter_hides_rows_and_keeps_sort_order(fast_rows: bool) -> None:
+
+    recipes = [make_recipe(name) for name in ["d_recipe", "b_recipe", "c_recipe", "a_recipe"]]
+    app = TableApp({recipe_data["name"]: recipe_data for recipe_data in recipes})
+    async with app.run_test() as pilot:
+        await pilot.pause()
+        table = app.query_one(CustomDataTable)
+
+        def names() -> list[str]:
+            return [str(table.get_row_at(index)[0]) for index in range(table.row_count)]
+
+        table.move_cursor(row=2)  # c_recipe
+        table.filter_rows({"tips_and_tricks/c_recipe", "tips_and_tricks/d_recipe"})
+        assert names() == ["d_recipe", "c_recipe"]
+        assert table.cursor_row == 1
+        assert len(table.row_cells) == 4
+        assert len(table.rows) == (4 if fast_rows else 2)
+
+        # Sorting while filtered sorts the hidden rows too.
+        table.sort("name")
+        assert names() == ["c_recipe", "d_recipe"]
+        table.add_recipes([make_recipe("0_recipe")])
+        assert names() == ["c_recipe", "d_recipe"]
+        table.filter_rows(None)
+        assert names() == ["a_recipe", "b_recipe", "c_recipe", "d_recipe", "0_recipe"]
+        table.sort("name")
+        assert names() == ["0_recipe", "a_recipe", "b_recipe", "c_recipe", "d_recipe"]
+
+        table.apply_changes([], removed=["tips_and_tricks/b_recipe"])
+        table.filter_rows(set())
+        assert table.row_count == 0
+        table.filter_rows(None)
+        assert names() == ["0_recipe", "a_recipe", "c_recipe", "d_recipe"]
+        await pilot.pause()
+        assert table.virtual_size.height == 5
+
+
+async def test_run_stat_columns_show_and_sort_by_value(fast_rows: bool) -> None:
+
+    recipes = [make_recipe(name) for name in ["a_recipe", "b_recipe", "c_recipe"]]
+    app = TableApp({recipe_data["name"]: recipe_data for recipe_data in recipes})
+    async with app.run_test() as pilot:
+        await pilot.pause()
+        table = app.query_one(CustomDataTable)
+
+        def column(key: str) -> list[str]:
+            return [str(table.get_cell_at((index, table.get_column_index(key)))).strip() for index in range(table.row_count)]
+
+        table.toggle_run_stats({
+            "tips_and_tricks/a_recipe": RunResult(0, 12.5, 0.25, 1.0, 0.5, 300 * 2**20),
+            "tips_and_tricks/c_recipe": RunResult(0, 2.0, None, 0.1, 0.05, 40 * 2**20),
+        })
+        assert [column.key.value for column in table.ordered_columns] == [
+            "name", "category", "author", "wall", "paint", "user", "sys", "rss"
+        ]
+        assert column("wall") == ["12.50s", "", "2.00s"]
+        assert column("paint") == ["250ms", "", ""]
+        assert column("rss") == ["300.0M", "", "40.0M"]
+
+        # By value, not by the formatted string. Recipes that never ran come first.
+        table.sort("wall")
+        assert column("name") == ["b_recipe", "c_recipe", "a_recipe"]
+        table.sort_column(table.columns[ColumnKey("wall")], ColumnKey("wall"))
+        table.update_run_stats({"tips_and_tricks/b_recipe": RunResult(1, 0.5)})
+        # Still sorted by wall time, biggest first.
+        assert column("name") == ["a_recipe", "c_recipe", "b_recipe"]
+        assert column("wall") == ["12.50s", "2.00s", "500ms"]
+
+        table.add_recipes([make_recipe("d_recipe")])
+        assert table.get_row("tips_and_tricks/d_recipe")[3].plain.strip() == ""
+
+        table.toggle_run_stats({})
+        assert len(table.columns) == 3
+        assert list(table.sort_status) == ["name", "category", "author"]
+        assert len(table.get_row_at(0)) == 3
+        await pilot.pause()
+        # Not shown, so not kept.
+        table.update_run_stats({"tips_and_tricks/a_recipe": RunResult(0, 1.0)})
+        assert table.run_stats == {}
+
+
+def test_recipe_filter_matches_every_term() -> None:
+
+    recipe_filter = RecipeFilter()
+    recipe_filter.update([
+        make_recipe("spinner", category="animation_effects", description="Shows a Loading spinner."),
+        make_recipe("tabs", author="Someone Else", description="Tabs that can't be clicked."),
+        make_recipe("worker", description="Exclusive workers."),
+    ])
+    assert recipe_filter.match("") is None
+    assert recipe_filter.match("s") == {"animation_effects/spinner", "tips_and_tricks/tabs", "tips_and_tricks/worker"}
+    assert recipe_filter.match("sp") == {"animation_effects/spinner"}
+    assert recipe_filter.match("sp load") == {"animation_effects/spinner"}
+    assert recipe_filter.match("sp loadx") == set()
+    assert recipe_filter.match("SOMEONE tabs") == {"tips_and_tricks/tabs"}
+    assert recipe_filter.match("exclusive") == {"tips_and_tricks/worker"}
+    recipe_filter.remove(["tips_and_tricks/worker"])
+    assert recipe_filter.match("exclusive") == set()
+
+
+def test_recipe_filter_common_tokens_and_replaced_recipes() -> None:
+
+    recipe_filter = RecipeFilter()
+    recipe_filter.COMMON_TOKEN_RECIPES = 3
+    recipe_filter.MERGE_EVERY = 4
+    recipe_filter.update([make_recipe(f"r{n}", description="A widget demo.") for n in range(5)])
+    recipe_filter.update([make_recipe(f"r{n}", description="A widget demo.") for n in range(5, 9)])
+    assert "widget" in recipe_filter._common
+    assert recipe_filter.match("idge") == {f"tips_and_tricks/r{n}" for n in range(9)}
+    assert recipe_filter.match("idge r8") == {"tips_and_tricks/r8"}
+
+    # A recipe given twice in one update only matches as its last version.
+    recipe_filter.update([make_recipe("r1", description="Spinner."), make_recipe("r1", description="A table.")])
+    assert recipe_filter.match("r1 spinner") == set()
+    assert recipe_filter.match("r1 table") == {"tips_and_tricks/r1"}
+    assert "tips_and_tricks/r1" not in recipe_filter.match("widget")
+    recipe_filter.remove(["tips_and_tricks/r2"])
+    assert recipe_filter.match("widget") == {f"tips_and_tricks/r{n}" for n in range(9)} - {
+        "tips_and_tricks/r1",
+        "tips_and_tricks/r2",
+    }
+
+
+def test_recipe_filter_qualified_terms_use_the_catalog() -> None:
+
+    recipes = [
+        make_recipe("spin", category="animation_effects", author="Test Author"),
+        make_recipe("spin", author="Someone Else"),
+        make_recipe("tabs", author="Someone Else"),
+    ]
+    catalog = RecipeCatalog()
+    assert catalog.add(recipes) == ["spin"]
+    recipe_filter = RecipeFilter(catalog)
+    recipe_filter.update(recipes)
+    assert recipe_filter.match("spin") == {"animation_effects/spin", "tips_and_tricks/spin"}
+    assert recipe_filter.match("category:tips_and_tricks spin") == {"tips_and_tricks/spin"}
+    assert recipe_filter.match("author:someone_else") == {"tips_and_tricks/spin", "tips_and_tricks/tabs"}
+    # Qualified terms are exact, so a shorter value doesn't match and a longer one isn't narrowed from it.
+    assert recipe_filter.match("category:animation") == set()
+    assert recipe_filter.match("category:animation_effects") == {"animation_effects/spin"}
+
+
+def test_recipe_finder_matches_fuzzily() -> None:
+
+    recipe_finder = RecipeFinder(max_candidates=2)
+    recipe_finder.update(["spinner_widget", "Spin_Timer", "tabbed_content", "widget_spinner", "worker"])
+    assert recipe_finder.match("") == []
+    assert [name for _, name, _ in recipe_finder.match("sprwdg")] == ["spinner_widget"]
+    assert [name for _, name, _ in recipe_finder.match("tmr")] == ["Spin_Timer"]
+    assert recipe_finder.match("xyz") == []
+
+    assert recipe_finder.candidates("wid") == ["spinner_widget", "widget_spinner"]
+
+    score, name, highlighted = recipe_finder.match("wrk")[0]
+    assert name == "worker" and score > 0
+    assert highlighted.plain == "worker"
+
+    recipe_finder.remove(["worker"])
+    assert recipe_finder.match("wrk") == []
+    recipe_finder.update(["worker"])
+    assert [name for _, name, _ in recipe_finder.match("wrk")] == ["worker"]
+    assert len(recipe_finder) == 5
+
+
+def test_recipe_finder_scores_trigram_matches_first() -> None:
+
+    # Only `max_candidates` names are scored, the ones sharing trigrams with the query first.
+    recipe_finder = RecipeFinder(max_candidates=1)
+    recipe_finder.update(["s_p_i_n_n_e_r", "spinner"])
+    assert recipe_finder.candidates("spin") == ["spinner"]
+    assert recipe_finder.candidates("s_p") == ["s_p_i_n_n_e_r"]
+
+
+class FinderApp(App[None]):
+
+    def __init__(self, recipe_finder: RecipeFinder) -> None:
+        super().__init__()
+        self.recipe_finder = recipe_finder
+
+    def on_mount(self) -> None:
+        self.push_screen(RecipeFinderScreen(self.recipe_finder))
+
+
+async def test_finder_screen_counts_every_match() -> None:
+
+    recipe_finder = RecipeFinder(max_candidates=20)
+    recipe_finder.update([f"category/recipe_{n:03d}" for n in range(300)])
+    app = FinderApp(recipe_finder)
+    async with app.run_test() as pilot:
+        await pilot.press("r", "c", "p")
+        await app.workers.wait_for_complete()
+        await pilot.pause()
+        screen = app.screen
+        assert isinstance(screen, RecipeFinderScreen)
+        assert len(screen.matches) == 20
+        assert str(screen.query_one("#finder_status", Static).render()) == "20 of 300 recipes"
+
+
+class TreeApp(App[None]):
+
+    def compose(self) -> ComposeResult:
+        yield RecipeTree()
+
+
+async def test_tree_materializes_categories_on_expand() -> None:
+
+    recipes = [make_recipe(f"recipe_{index}", category=f"category_{index % 3}") for index in range(30)]
+    app = TreeApp()
+    async with app.run_test() as pilot:
+        tree = app.query_one(RecipeTree)
+        tree.add_recipes(recipes)
+        await pilot.pause()
+        assert [str(node.label) for node in tree.root.children] == [f"category_{index} (10)" for index in range(3)]
+        assert all(not node.children for node in tree.root.children)
+        assert tree.last_line == 2
+
+        node = tree.category_nodes["category_1"]
+        node.expand()
+        await pilot.pause()
+        assert [str(leaf.label) for leaf in node.children][:3] == ["recipe_1", "recipe_10", "recipe_13"]
+        assert node.children[0].data == "category_1/recipe_1"
+        assert tree.last_line == 12
+
+        # Live changes and filtering update expanded groups in place.
+        tree.apply_changes([make_recipe("moved", category="category_1"), make_recipe("new", category="aaa")], ["category_1/recipe_4"])
+        assert str(node.label) == "category_1 (10)"
+        assert "category_1/moved" in {leaf.data for leaf in node.children}
+        assert next(iter(tree.root.children)).data == "aaa"
+        tree.filter_recipes({"category_1/recipe_1", "category_2/recipe_2"})
+        assert [node.data for node in tree.root.children] == ["category_1", "category_2"]
+        assert [leaf.data for leaf in node.children] == ["category_1/recipe_1"]
+        tree.filter_recipes(None)
+
+        node.collapse()
+        await pilot.pause()
+        assert not node.children and tree.materialized == set()
+
+        tree.reveal("category_2/recipe_5")
+        await pilot.pause()
+        assert tree.cursor_node is not None and tree.cursor_node.data == "category_2/recipe_5"
+
+
+async def test_sort_by_several_columns(fast_rows: bool) -> None:
+
+    recipes = [make_recipe("b", category="x"), make_recipe("a", category="y"), make_recipe("a", category="x")]
+    app = TableApp({f"{recipe['category']}/{recipe['name']}": recipe for recipe in recipes})
+    async with app.run_test() as pilot:
+        await pilot.pause()
+        table = app.query_one(CustomDataTable)
+
+        def plain(cells: tuple[RecipeCell, ...]) -> tuple[str, ...]:
+            return tuple(map(str, cells))
+
+        table.sort("category", "name", key=plain)
+        assert table.row_order == ["x/a", "x/b", "y/a"]
+        table.sort("name", "category", key=plain, reverse=True)
+        assert table.row_order == ["x/b", "y/a", "x/a"]
+        assert table.coordinate_to_cell_key(Coordinate(0, 0)).row_key.value == "x/b"
+
+
+async def test_public_api_layout_keeps_rows_in_place() -> None:
+    "Without FAST_ROWS, rows that stay where they are aren't removed and added again."
+
+    class RowApp(App[None]):
+        def compose(self) -> ComposeResult:
+            yield table_rows.RowViewTable()
+
+    app = RowApp()
+    async with app.run_test() as pilot:
+        table = app.query_one(table_rows.RowViewTable)
+        table.fast_rows = False
+        table.add_fixed_column(Text("name"), 10, "name")
+        keys = [f"row_{index}" for index in range(6)]
+        table.append_rows({key: {ColumnKey("name"): key} for key in keys})
+        await pilot.pause()
+        rows = dict(table.rows)
+
+        def shown() -> list[str]:
+            return [str(row.key.value) for row in table.ordered_rows]
+
+        table.discard_rows(["row_2"])
+        table.set_row_filter({"row_0", "row_1", "row_4", "row_5"})
+        assert shown() == ["row_0", "row_1", "row_4", "row_5"]
+        assert all(table.rows[row_key] is rows[row_key] for row_key in table.rows)
+
+        # row_3 goes back between row_1 and row_4, so only the rows after it are added again.
+        table.set_row_filter(None)
+        assert shown() == ["row_0", "row_1", "row_3", "row_4", "row_5"]
+        assert table.rows[RowKey("row_1")] is rows[RowKey("row_1")]
+        assert table.rows[RowKey("row_4")] is not rows[RowKey("row_4")]
+
+        table.row_cells["row_0"][ColumnKey("name")] = "first"
+        table.cells_changed()
+        assert table.get_row("row_0") == ["first"]
+        assert table.rows[RowKey("row_0")] is rows[RowKey("row_0")]
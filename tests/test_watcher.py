@@ -0,0 +1,60 @@
+"""Tests for the recipe watchers used by watch mode."""
+
+from __future__ import annotations
+from pathlib import Path
+import sys
+import threading
+import pytest
+
+from textual_cookbook.watcher import InotifyWatcher, PollingWatcher, RecipeWatcher
+
+
+def collect_first_change(watcher: RecipeWatcher, make_changes: threading.Timer) -> set[str]:
+
+    stop = threading.Event()
+    timeout = threading.Timer(5, stop.set)
+    timeout.start()
+    make_changes.start()
+    try:
+        for changed in watcher.watch(stop.is_set):
+            return changed
+        return set()
+    finally:
+        timeout.cancel()
+        watcher.close()
+
+
+def make_tree(tmp_path: Path) -> Path:
+
+    recipes = tmp_path / "recipes"
+    (recipes / "tips_and_tricks").mkdir(parents=True)
+    (recipes / "tips_and_tricks" / "old.py").write_text("# old\n")
+    return recipes
+
+
+def change_tree(recipes: Path) -> threading.Timer:
+
+    def change() -> None:
+        (recipes / "tips_and_tricks" / "old.py").unlink()
+        # Not recipes: only files in a category directory are.
+        (recipes / "helper.py").write_text("# helper\n")
+        (recipes / "tips_and_tricks" / "nested").mkdir()
+        (recipes / "tips_and_tricks" / "nested" / "deep.py").write_text("# deep\n")
+        (recipes / "tips_and_tricks" / "new.py").write_text("# new\n")
+
+    return threading.Timer(0.2, change)
+
+
+def test_polling_watcher(tmp_path: Path) -> None:
+
+    recipes = make_tree(tmp_path)
+    changed = collect_first_change(PollingWatcher(recipes, interval=0.1), change_tree(recipes))
+    assert changed == {"tips_and_tricks/old.py", "tips_and_tricks/new.py"}
+
+
+@pytest.mark.skipif(not sys.platform.startswith("linux"), reason="inotify is Linux only")
+def test_inotify_watcher(tmp_path: Path) -> None:
+
+    recipes = make_tree(tmp_path)
+    changed = collect_first_change(InotifyWatcher(recipes), change_tree(recipes))
+    assert changed == {"tips_and_tricks/old.py", "tips_and_tricks/new.py"}